@@ -86,6 +86,20 @@ else:
         }
     }
 
+# === CACHE ===
+# Local memory by default, which is per process. The worker and the cron commands
+# invalidate presence, schedules and list versions that the API serves, so any
+# deployment running them must point CACHE_BACKEND/CACHE_LOCATION at a shared cache
+# (the compose files use Redis); those commands refuse to start otherwise, unless
+# ALLOW_PROCESS_LOCAL_CACHE=True (e.g. a single-process development setup).
+CACHES = {
+    "default": {
+        "BACKEND": os.getenv("CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"),
+        "LOCATION": os.getenv("CACHE_LOCATION", "epitime"),
+    }
+}
+ALLOW_PROCESS_LOCAL_CACHE = os.getenv("ALLOW_PROCESS_LOCAL_CACHE", "False") == "True"
+
 # === PASSWORD VALIDATION ===
 AUTH_PASSWORD_VALIDATORS = [
     {
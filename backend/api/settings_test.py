@@ -12,3 +12,6 @@ DATABASES = {
         "NAME": ":memory:",  # Use in-memory database for faster tests
     }
 }
+
+# Tests call the worker commands in-process, so they share the local memory cache
+ALLOW_PROCESS_LOCAL_CACHE = True
@@ -1,2 +1,12 @@
 # This file can be used for pytest fixtures and configuration
 # Database configuration is handled by api/settings_test.py
+import pytest
+from django.core.cache import cache
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Cached data (e.g. weekly schedules) must not leak between tests that reuse primary keys."""
+    cache.clear()
+    yield
+    cache.clear()
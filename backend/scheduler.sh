@@ -0,0 +1,18 @@
+#!/bin/sh
+# Runs the periodic management commands at the top of every hour:
+#   - close_stale_sessions: auto-close sessions people forgot to clock out of
+#   - process_clock_events --sweep-absent: once a day, mark yesterday's absences.
+#     It runs in the 00:00 UTC slot, which is already the next day in Europe/Paris.
+
+echo "Waiting for MariaDB..."
+until nc -z db 3306; do
+  sleep 1
+done
+
+while true; do
+  sleep $((3600 - $(date +%s) % 3600))
+  python manage.py close_stale_sessions
+  if [ "$(date -u +%H)" = "00" ]; then
+    python manage.py process_clock_events --sweep-absent
+  fi
+done
@@ -0,0 +1,130 @@
+"""Off-request status evaluation.
+
+Clock-ins only enqueue a ClockEvent; the ``process_clock_events`` worker
+drains the queue in batches and marks late arrivals with bulk upserts, and an
+end-of-day sweep marks scheduled users who never clocked in as absent.
+"""
+
+from datetime import timedelta
+
+from django.db import models, transaction
+from django.utils import timezone
+
+from .models import ClockEvent, TeamStatus, TimeEntry, WorkingHours
+from .presence import forget_presence
+from .rollups import local_midnight, sync_late_flags
+from .schedules import get_weekly_schedules
+
+DEFAULT_BATCH_SIZE = 500
+
+
+def enqueue_clock_ins(clock_ins):
+    """Queue ``(user_id, timestamp)`` clock-ins for lateness evaluation, in one insert."""
+    ClockEvent.objects.bulk_create([ClockEvent(user_id=user_id, timestamp=ts) for user_id, ts in clock_ins])
+
+
+def late_statuses(first_ins):
+    """TeamStatus rows for ``{(user_id, local_date): clock_in}`` that start after the scheduled time."""
+    schedules = get_weekly_schedules({user_id for user_id, _ in first_ins})
+
+    statuses = []
+    for (user_id, day), clock_in in first_ins.items():
+        start_time = schedules[user_id].get(day.weekday())
+        if start_time is not None and timezone.localtime(clock_in).time() > start_time:
+            statuses.append(
+                TeamStatus(
+                    user_id=user_id,
+                    date=day,
+                    status="late",
+                    note=f"Late arrival (Expected: {start_time.strftime('%H:%M')})",
+                )
+            )
+    return statuses
+
+
+def _first_clock_ins(user_days):
+    """Earliest clock-in of each ``(user_id, local_date)``, read from TimeEntry in one query.
+
+    Lateness is judged on the first clock-in of the day, so a later clock-in after a
+    break does not mark an on-time user late.
+    """
+    entries = TimeEntry.objects.filter(
+        user_id__in={user_id for user_id, _ in user_days},
+        work_date__in={day for _, day in user_days},
+    ).values_list("user_id", "work_date", "clock_in")
+
+    first_ins = {}
+    for user_id, day, clock_in in entries:
+        key = (user_id, day)
+        if key in user_days and (key not in first_ins or clock_in < first_ins[key]):
+            first_ins[key] = clock_in
+    return first_ins
+
+
+def process_clock_events(batch_size=DEFAULT_BATCH_SIZE) -> int:
+    """Evaluate one batch of queued clock-ins and delete them. Returns the number of events processed.
+
+    Rows are claimed with SKIP LOCKED, so several workers can drain the queue concurrently.
+    """
+    with transaction.atomic():
+        events = list(
+            ClockEvent.objects.select_for_update(skip_locked=True)
+            .order_by("id")
+            .values_list("id", "user_id", "timestamp")[:batch_size]
+        )
+        if not events:
+            return 0
+
+        user_days = {(user_id, timezone.localtime(ts).date()) for _, user_id, ts in events}
+        statuses = late_statuses(_first_clock_ins(user_days))
+        if statuses:
+            TeamStatus.objects.bulk_create(
+                statuses,
+                update_conflicts=True,
+                unique_fields=["user", "date"],
+                update_fields=["status", "note", "updated_at"],
+            )
+            sync_late_flags({s.user_id for s in statuses}, {s.date for s in statuses})
+            transaction.on_commit(lambda: forget_presence(status.user_id for status in statuses))
+        ClockEvent.objects.filter(id__in=[event_id for event_id, _, _ in events]).delete()
+    return len(events)
+
+
+def drain_clock_events(batch_size=DEFAULT_BATCH_SIZE) -> int:
+    """Process batches until the queue is empty. Returns the total number of events processed."""
+    total = 0
+    while True:
+        processed = process_clock_events(batch_size)
+        total += processed
+        if processed < batch_size:
+            return total
+
+
+def sweep_absent(day) -> int:
+    """Mark active users scheduled on ``day`` with no session that day as absent.
+
+    Existing statuses for the day (PTO, late, manual fixes) are left untouched. Returns the
+    number of absent rows written.
+    """
+    # Sessions started that day, or the day before and still running after midnight
+    present = TimeEntry.objects.filter(
+        models.Q(work_date=day)
+        | models.Q(work_date=day - timedelta(days=1))
+        & (models.Q(clock_out__isnull=True) | models.Q(clock_out__gt=local_midnight(day)))
+    ).values("user_id")
+    already_marked = TeamStatus.objects.filter(date=day).values("user_id")
+
+    # scheduled - present - already marked, evaluated by the database as one query
+    absent_ids = (
+        WorkingHours.objects.filter(day_of_week=day.weekday(), user__is_active=True)
+        .exclude(user_id__in=present)
+        .exclude(user_id__in=already_marked)
+        .values_list("user_id", flat=True)
+    )
+    statuses = [
+        TeamStatus(user_id=user_id, date=day, status="absent", note="No clock-in on a scheduled day")
+        for user_id in absent_ids
+    ]
+    TeamStatus.objects.bulk_create(statuses, ignore_conflicts=True)
+    transaction.on_commit(lambda: forget_presence(status.user_id for status in statuses))
+    return len(statuses)
@@ -0,0 +1,74 @@
+"""Filtering and ordering of the paginated member directory.
+
+Search is a prefix match on the normalized name and email columns of User,
+so it is served by their indexes. The columns are already lowercase, so
+``istartswith`` is used: it compiles to a plain ``LIKE 'term%'`` that MariaDB
+runs as an index range scan, where ``startswith`` would use ``LIKE BINARY``; filters and ordering follow the
+(team, search_last_name, search_full_name, id) directory index.
+"""
+
+from django.db import models
+
+from .models import User, normalize_search
+from .pagination import InvalidPageParameter
+
+DIRECTORY_ORDERING = ("search_last_name", "search_full_name", "id")
+ROLES = {role for role, _ in User.ROLE_CHOICES}
+
+
+def parse_directory_params(params):
+    """Validate the ``q``, ``team_id`` (an id or ``none``) and ``role`` (comma-separated) query parameters.
+
+    Returns ``(term, team_id, roles)``: ``team_id`` is ``None`` when absent and ``"none"`` for unassigned users,
+    ``roles`` is ``None`` when absent.
+    """
+    term = normalize_search(params.get("q"))
+
+    team_id = params.get("team_id") or None
+    if team_id and team_id != "none":
+        try:
+            team_id = int(team_id)
+        except ValueError:
+            raise InvalidPageParameter("team_id must be an integer or 'none'.") from None
+
+    roles = None
+    if params.get("role"):
+        roles = set(params["role"].split(","))
+        if not roles <= ROLES:
+            raise InvalidPageParameter(f"role must be among {', '.join(sorted(ROLES))}.")
+    return term, team_id, roles
+
+
+def filter_directory(users, params):
+    """Apply the directory query parameters to a User queryset."""
+    term, team_id, roles = parse_directory_params(params)
+    if term:
+        users = users.filter(
+            models.Q(search_full_name__istartswith=term)
+            | models.Q(search_last_name__istartswith=term)
+            | models.Q(search_email__istartswith=term)
+        )
+    if team_id == "none":
+        users = users.filter(team__isnull=True)
+    elif team_id:
+        users = users.filter(team_id=team_id)
+    if roles:
+        users = users.filter(role__in=roles)
+    return users
+
+
+def filter_directory_rows(rows, params):
+    """In-memory counterpart of ``filter_directory`` for member dicts carrying the search columns."""
+    term, team_id, roles = parse_directory_params(params)
+    if term:
+        rows = [
+            row
+            for row in rows
+            if any(row[name].startswith(term) for name in ("search_full_name", "search_last_name", "search_email"))
+        ]
+    if team_id:
+        wanted = None if team_id == "none" else team_id
+        rows = [row for row in rows if row["team_id"] == wanted]
+    if roles:
+        rows = [row for row in rows if row["role"] in roles]
+    return rows
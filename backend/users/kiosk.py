@@ -0,0 +1,95 @@
+"""Set-based ingestion of kiosk punches.
+
+A replay of thousands of queued punches is applied in a fixed number of
+queries: the punches are inserted with ``ignore_conflicts`` on their unique
+idempotency key, the rows this batch actually inserted are read back, then
+each user's punches are paired in timestamp order with their open session into
+TimeEntry rows that are written with bulk operations. New clock-ins are queued
+for the process_clock_events worker, which marks late arrivals.
+"""
+
+import uuid
+from collections import defaultdict
+
+from django.db import transaction
+
+from .clock_events import enqueue_clock_ins
+from .models import PunchEvent, TimeEntry
+from .presence import forget_presence
+from .rollups import affected_dates, refresh_daily_summaries
+
+
+@transaction.atomic
+def ingest_punches(punches):
+    """Apply validated ``(user_id, timestamp, direction, idempotency_key)`` punches.
+
+    A key repeated within ``punches`` is stored once, from its first occurrence; the repeats are duplicates.
+
+    Returns a dict of counters: received, duplicates, applied and ignored.
+    """
+    batch_id = uuid.uuid4()
+    PunchEvent.objects.bulk_create(
+        [
+            PunchEvent(user_id=user_id, timestamp=ts, direction=direction, idempotency_key=key, batch_id=batch_id)
+            for user_id, ts, direction, key in punches
+        ],
+        ignore_conflicts=True,
+    )
+    new_punches = list(
+        PunchEvent.objects.filter(batch_id=batch_id)
+        .order_by("user_id", "timestamp", "id")
+        .only("id", "user_id", "timestamp", "direction")
+    )
+    stats = {"received": len(punches), "duplicates": len(punches) - len(new_punches), "applied": 0, "ignored": 0}
+    if not new_punches:
+        return stats
+
+    # Locked until commit so a concurrent clock-out cannot close them first. A clock-in racing the
+    # replay makes the insert below fail on the single open session constraint, rolling it all back.
+    open_entries = {
+        entry.user_id: entry
+        for entry in TimeEntry.objects.select_for_update().filter(
+            user_id__in={p.user_id for p in new_punches}, is_open=True
+        )
+    }
+
+    to_create, to_close, ignored_ids = [], [], []
+    for punch in new_punches:
+        current = open_entries.get(punch.user_id)
+        if punch.direction == "in":
+            if current is not None:
+                ignored_ids.append(punch.id)
+                continue
+            current = TimeEntry(user_id=punch.user_id, clock_in=punch.timestamp)
+            to_create.append(current)
+            open_entries[punch.user_id] = current
+        else:
+            if current is None or punch.timestamp < current.clock_in:
+                ignored_ids.append(punch.id)
+                continue
+            current.clock_out = punch.timestamp
+            current.compute_total_hours()
+            if current.pk:
+                to_close.append(current)
+            del open_entries[punch.user_id]
+
+    for entry in [*to_create, *to_close]:
+        entry.sync_derived_fields()
+    # Close before inserting so a user's old and new open sessions never coexist
+    TimeEntry.objects.bulk_update(to_close, ["clock_out", "total_hours", "is_open"])
+    TimeEntry.objects.bulk_create(to_create)
+    if ignored_ids:
+        PunchEvent.objects.filter(id__in=ignored_ids).update(outcome="ignored")
+
+    enqueue_clock_ins((entry.user_id, entry.clock_in) for entry in to_create)
+
+    user_dates = defaultdict(set)
+    for entry in [*to_create, *to_close]:
+        user_dates[entry.user_id] |= affected_dates(entry.clock_in, entry.clock_out)
+    refresh_daily_summaries(user_dates)
+    touched = {entry.user_id for entry in [*to_create, *to_close]}
+    transaction.on_commit(lambda: forget_presence(touched))
+
+    stats["ignored"] = len(ignored_ids)
+    stats["applied"] = len(new_punches) - len(ignored_ids)
+    return stats
@@ -0,0 +1,41 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+
+from users.shared_cache import require_shared_cache
+from users.stale_sessions import DEFAULT_BATCH_SIZE, DEFAULT_GRACE, DEFAULT_MAX_HOURS, close_stale_sessions
+
+
+class Command(BaseCommand):
+    help = "Close open time entries left running past the scheduled end of day or a maximum session length."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--max-hours",
+            type=float,
+            default=DEFAULT_MAX_HOURS,
+            help="Close sessions without a schedule after this many hours.",
+        )
+        parser.add_argument(
+            "--grace-minutes",
+            type=int,
+            default=int(DEFAULT_GRACE.total_seconds() // 60),
+            help="Minutes past the scheduled end before a session is closed.",
+        )
+        parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+        parser.add_argument("--dry-run", action="store_true", help="Report what would be closed without writing.")
+
+    def handle(self, *args, **options):
+        if options["max_hours"] <= 0 or options["grace_minutes"] < 0 or options["batch_size"] < 1:
+            raise CommandError("--max-hours and --batch-size must be positive, --grace-minutes not negative.")
+        if not options["dry_run"]:
+            require_shared_cache()
+
+        scanned, closed = close_stale_sessions(
+            max_hours=options["max_hours"],
+            grace=timedelta(minutes=options["grace_minutes"]),
+            batch_size=options["batch_size"],
+            dry_run=options["dry_run"],
+        )
+        verb = "Would close" if options["dry_run"] else "Closed"
+        self.stdout.write(f"{verb} {closed} of {scanned} open sessions checked.")
@@ -0,0 +1,34 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand
+
+from users.exports import DEFAULT_CHUNK_SIZE, EXPORT_FORMATS, export_queryset, iter_export
+
+
+class Command(BaseCommand):
+    help = "Stream time entries as CSV or NDJSON for payroll, filtered by team, user and local date range."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--format", dest="file_format", choices=EXPORT_FORMATS, default="csv")
+        parser.add_argument("--team", type=int, help="Only export members of this team id.")
+        parser.add_argument("--user", type=int, help="Only export this user id.")
+        parser.add_argument("--from", dest="date_from", type=date.fromisoformat, help="First day (YYYY-MM-DD).")
+        parser.add_argument("--to", dest="date_to", type=date.fromisoformat, help="Last day (YYYY-MM-DD).")
+        parser.add_argument("--output", help="File to write to (defaults to stdout).")
+        parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        entries = export_queryset(
+            team_id=options["team"],
+            user_id=options["user"],
+            date_from=options["date_from"],
+            date_to=options["date_to"],
+        )
+        chunks = iter_export(options["file_format"], entries, chunk_size=options["chunk_size"])
+
+        if options["output"]:
+            with open(options["output"], "w", newline="", encoding="utf-8") as out:
+                out.writelines(chunks)
+        else:
+            for chunk in chunks:
+                self.stdout.write(chunk, ending="")
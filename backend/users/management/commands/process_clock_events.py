@@ -0,0 +1,52 @@
+import time
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from users.clock_events import DEFAULT_BATCH_SIZE, drain_clock_events, sweep_absent
+from users.shared_cache import require_shared_cache
+
+
+class Command(BaseCommand):
+    help = "Evaluate queued clock-ins (lateness) and optionally mark scheduled-but-absent users."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+        parser.add_argument("--loop", action="store_true", help="Keep polling the queue instead of exiting.")
+        parser.add_argument("--interval", type=float, default=5.0, help="Seconds between polls with --loop.")
+        parser.add_argument(
+            "--sweep-absent",
+            action="store_true",
+            help="After draining the queue, mark scheduled users with no session on --date as absent.",
+        )
+        parser.add_argument("--date", help="Day to sweep (YYYY-MM-DD). Defaults to yesterday.")
+
+    def handle(self, *args, **options):
+        require_shared_cache()
+        batch_size = options["batch_size"]
+        if batch_size < 1:
+            raise CommandError("--batch-size must be positive.")
+
+        sweep_day = None
+        if options["sweep_absent"]:
+            if options["loop"]:
+                raise CommandError("--sweep-absent cannot be combined with --loop.")
+            try:
+                sweep_day = (
+                    date.fromisoformat(options["date"]) if options["date"] else timezone.localdate() - timedelta(days=1)
+                )
+            except ValueError:
+                raise CommandError("--date must be YYYY-MM-DD.") from None
+
+        while True:
+            processed = drain_clock_events(batch_size)
+            if processed:
+                self.stdout.write(f"Processed {processed} clock events.")
+            if not options["loop"]:
+                break
+            time.sleep(options["interval"])
+
+        if sweep_day is not None:
+            marked = sweep_absent(sweep_day)
+            self.stdout.write(f"Marked {marked} users absent on {sweep_day}.")
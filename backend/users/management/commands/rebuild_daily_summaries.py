@@ -0,0 +1,69 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from users.models import DailyTimeSummary
+from users.rollups import iter_all_summaries
+
+COMPARED_FIELDS = ("worked_seconds", "session_count", "first_clock_in", "is_late")
+
+
+class Command(BaseCommand):
+    help = "Rebuild the DailyTimeSummary rollup table from TimeEntry rows, then verify it."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--verify-only", action="store_true", help="Only compare the table with TimeEntry rows.")
+        parser.add_argument("--batch-size", type=int, default=2000)
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+
+        if not options["verify_only"]:
+            created = self.rebuild(batch_size)
+            self.stdout.write(f"Rebuilt {created} daily summaries.")
+
+        mismatches = self.verify(batch_size)
+        if mismatches:
+            raise CommandError(f"{mismatches} daily summaries do not match their time entries.")
+        self.stdout.write(self.style.SUCCESS("Daily summaries are consistent with time entries."))
+
+    def rebuild(self, batch_size):
+        created = 0
+        batch = []
+        with transaction.atomic():
+            DailyTimeSummary.objects.all().delete()
+            for summary in iter_all_summaries(chunk_size=batch_size):
+                batch.append(summary)
+                if len(batch) >= batch_size:
+                    DailyTimeSummary.objects.bulk_create(batch)
+                    created += len(batch)
+                    batch = []
+            DailyTimeSummary.objects.bulk_create(batch)
+            created += len(batch)
+        return created
+
+    def verify(self, batch_size):
+        """Merge-compare the expected and stored rows; both streams are ordered by (user, date)."""
+        stored = DailyTimeSummary.objects.order_by("user_id", "date").iterator(chunk_size=batch_size)
+        expected = iter_all_summaries(chunk_size=batch_size)
+
+        def key(summary):
+            return (summary.user_id, summary.date)
+
+        mismatches = 0
+        exp, got = next(expected, None), next(stored, None)
+        while exp is not None or got is not None:
+            if got is None or (exp is not None and key(exp) < key(got)):
+                self.stderr.write(f"Missing summary for user {exp.user_id} on {exp.date}")
+                exp = next(expected, None)
+            elif exp is None or key(got) < key(exp):
+                self.stderr.write(f"Unexpected summary for user {got.user_id} on {got.date}")
+                got = next(stored, None)
+            else:
+                diffs = [name for name in COMPARED_FIELDS if getattr(exp, name) != getattr(got, name)]
+                if diffs:
+                    self.stderr.write(f"Summary for user {got.user_id} on {got.date} differs on {', '.join(diffs)}")
+                exp, got = next(expected, None), next(stored, None)
+                if not diffs:
+                    continue
+            mismatches += 1
+        return mismatches
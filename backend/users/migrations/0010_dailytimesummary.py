@@ -0,0 +1,94 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:56
+
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def _split_by_local_day(start, end):
+    # Frozen copy of users.rollups.split_by_local_day
+    current = timezone.localtime(start)
+    end = timezone.localtime(end)
+    while current < end:
+        next_midnight = timezone.make_aware(datetime.combine(current.date() + timedelta(days=1), time.min))
+        yield current.date(), current, min(end, next_midnight)
+        current = next_midnight
+
+
+def _summaries(DailyTimeSummary, user_id, entries, late_dates):
+    # Frozen copy of users.rollups.summarize_entries
+    seconds, sessions, first_in = defaultdict(float), defaultdict(int), {}
+    for clock_in, clock_out in entries:
+        for day, start, end in _split_by_local_day(clock_in, clock_out):
+            seconds[day] += (end - start).total_seconds()
+            sessions[day] += 1
+            if start == clock_in and (day not in first_in or clock_in < first_in[day]):
+                first_in[day] = clock_in
+    return [
+        DailyTimeSummary(
+            user_id=user_id,
+            date=day,
+            worked_seconds=round(seconds[day]),
+            session_count=sessions[day],
+            first_clock_in=first_in.get(day),
+            is_late=(user_id, day) in late_dates,
+        )
+        for day in sorted(sessions)
+    ]
+
+
+def backfill_daily_summaries(apps, schema_editor):
+    TimeEntry = apps.get_model("users", "TimeEntry")
+    TeamStatus = apps.get_model("users", "TeamStatus")
+    DailyTimeSummary = apps.get_model("users", "DailyTimeSummary")
+    late_dates = set(TeamStatus.objects.filter(status="late").values_list("user_id", "date"))
+
+    rows = []
+    current_user, entries = None, []
+    for user_id, clock_in, clock_out in (
+        TimeEntry.objects.filter(clock_out__isnull=False)
+        .order_by("user_id", "clock_in")
+        .values_list("user_id", "clock_in", "clock_out")
+        .iterator(chunk_size=2000)
+    ):
+        if user_id != current_user:
+            rows += _summaries(DailyTimeSummary, current_user, entries, late_dates)
+            current_user, entries = user_id, []
+        entries.append((clock_in, clock_out))
+        if len(rows) >= 2000:
+            DailyTimeSummary.objects.bulk_create(rows)
+            rows = []
+    rows += _summaries(DailyTimeSummary, current_user, entries, late_dates)
+    DailyTimeSummary.objects.bulk_create(rows)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0009_conversation_message'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyTimeSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('worked_seconds', models.PositiveIntegerField(default=0)),
+                ('session_count', models.PositiveIntegerField(default=0)),
+                ('first_clock_in', models.DateTimeField(blank=True, null=True)),
+                ('is_late', models.BooleanField(default=False)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_summaries', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-date'],
+                'unique_together': {('user', 'date')},
+            },
+        ),
+        migrations.RunPython(backfill_daily_summaries, migrations.RunPython.noop),
+    ]
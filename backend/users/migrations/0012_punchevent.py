@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-17 00:02
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0011_timeentry_user_clock_in_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PunchEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('idempotency_key', models.CharField(max_length=64, unique=True)),
+                ('timestamp', models.DateTimeField()),
+                ('direction', models.CharField(choices=[('in', 'In'), ('out', 'Out')], max_length=3)),
+                ('outcome', models.CharField(choices=[('applied', 'Applied'), ('ignored', 'Ignored')], default='applied', max_length=10)),
+                ('batch_id', models.UUIDField(db_index=True)),
+                ('received_at', models.DateTimeField(auto_now_add=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='punch_events', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['user', 'timestamp'],
+            },
+        ),
+    ]
@@ -0,0 +1,133 @@
+# Generated by Django 5.2.18 on 2026-10-17 00:03
+
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def _split_by_local_day(start, end):
+    # Frozen copy of users.rollups.split_by_local_day
+    current = timezone.localtime(start)
+    end = timezone.localtime(end)
+    while current < end:
+        next_midnight = timezone.make_aware(datetime.combine(current.date() + timedelta(days=1), time.min))
+        yield current.date(), current, min(end, next_midnight)
+        current = next_midnight
+
+
+def _summaries(DailyTimeSummary, user_id, entries, late_dates, only_dates):
+    # Frozen copy of users.rollups.summarize_entries
+    seconds, sessions, first_in = defaultdict(float), defaultdict(int), {}
+    for clock_in, clock_out in entries:
+        for day, start, end in _split_by_local_day(clock_in, clock_out):
+            if day not in only_dates:
+                continue
+            seconds[day] += (end - start).total_seconds()
+            sessions[day] += 1
+            if start == clock_in and (day not in first_in or clock_in < first_in[day]):
+                first_in[day] = clock_in
+    return [
+        DailyTimeSummary(
+            user_id=user_id,
+            date=day,
+            worked_seconds=round(seconds[day]),
+            session_count=sessions[day],
+            first_clock_in=first_in.get(day),
+            is_late=day in late_dates,
+        )
+        for day in sorted(sessions)
+    ]
+
+
+def _refresh_daily_summaries(apps, user_dates):
+    TimeEntry = apps.get_model("users", "TimeEntry")
+    TeamStatus = apps.get_model("users", "TeamStatus")
+    DailyTimeSummary = apps.get_model("users", "DailyTimeSummary")
+    for user_id, dates in user_dates.items():
+        range_start = timezone.make_aware(datetime.combine(min(dates), time.min))
+        range_end = timezone.make_aware(datetime.combine(max(dates) + timedelta(days=1), time.min))
+        entries = TimeEntry.objects.filter(
+            user_id=user_id, clock_out__isnull=False, clock_in__lt=range_end, clock_out__gt=range_start
+        ).values_list("clock_in", "clock_out")
+        late_dates = set(
+            TeamStatus.objects.filter(user_id=user_id, date__in=dates, status="late").values_list("date", flat=True)
+        )
+        DailyTimeSummary.objects.filter(user_id=user_id, date__in=dates).delete()
+        DailyTimeSummary.objects.bulk_create(_summaries(DailyTimeSummary, user_id, entries, late_dates, dates))
+
+
+def _close_time(clock_in, end_time, next_clock_in):
+    # Frozen copy of users.stale_sessions.stale_close_time (12 hours at most), capped by the next clock-in.
+    # The session was superseded, so it is closed even if it would not be stale yet.
+    work_date = timezone.localtime(clock_in).date()
+    close_at = clock_in + timedelta(hours=12)
+    if end_time is not None:
+        scheduled_end = timezone.make_aware(datetime.combine(work_date, end_time))
+        if scheduled_end > clock_in:
+            close_at = scheduled_end
+    return min(close_at, next_clock_in)
+
+
+def flag_open_sessions(apps, schema_editor):
+    """Closed entries get NULL. If a user somehow has several open entries, only the latest stays open;
+    each older one is auto-closed as close_stale_sessions would have, and never after the next clock-in."""
+    TimeEntry = apps.get_model("users", "TimeEntry")
+    WorkingHours = apps.get_model("users", "WorkingHours")
+    TimeEntry.objects.filter(clock_out__isnull=False).update(is_open=None)
+
+    stale = []
+    next_clock_in = {}
+    for entry in TimeEntry.objects.filter(clock_out__isnull=True).order_by("user_id", "-clock_in", "-id"):
+        if entry.user_id in next_clock_in:
+            stale.append((entry, next_clock_in[entry.user_id]))
+        next_clock_in[entry.user_id] = entry.clock_in
+    if not stale:
+        return
+
+    end_times = {
+        (user_id, day): end_time
+        for user_id, day, end_time in WorkingHours.objects.filter(
+            user_id__in={entry.user_id for entry, _ in stale}
+        ).values_list("user_id", "day_of_week", "end_time")
+    }
+    closed = []
+    for entry, superseded_at in stale:
+        end_time = end_times.get((entry.user_id, timezone.localtime(entry.clock_in).weekday()))
+        entry.clock_out = _close_time(entry.clock_in, end_time, superseded_at)
+        entry.total_hours = round((entry.clock_out - entry.clock_in).total_seconds() / 3600, 2)
+        entry.is_open = None
+        entry.auto_closed = True
+        closed.append(entry)
+    TimeEntry.objects.bulk_update(closed, ["clock_out", "total_hours", "is_open", "auto_closed"], batch_size=1000)
+
+    user_dates = defaultdict(set)
+    for entry in closed:
+        user_dates[entry.user_id] |= {day for day, _, _ in _split_by_local_day(entry.clock_in, entry.clock_out)}
+    _refresh_daily_summaries(apps, {user_id: dates for user_id, dates in user_dates.items() if dates})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0012_punchevent'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='timeentry',
+            name='is_open',
+            field=models.BooleanField(default=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='timeentry',
+            name='auto_closed',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.RunPython(flag_open_sessions, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='timeentry',
+            constraint=models.UniqueConstraint(fields=('user', 'is_open'), name='timeentry_single_open_session'),
+        ),
+    ]
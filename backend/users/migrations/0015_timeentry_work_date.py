@@ -0,0 +1,47 @@
+# Generated by Django 5.2.18 on 2026-10-17 00:12
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def backfill_work_date(apps, schema_editor):
+    """Store the local day of clock_in, in id-ordered batches so memory stays bounded."""
+    TimeEntry = apps.get_model("users", "TimeEntry")
+    last_id = 0
+    while True:
+        batch = list(TimeEntry.objects.filter(id__gt=last_id).order_by("id").only("id", "clock_in")[:1000])
+        if not batch:
+            break
+        for entry in batch:
+            entry.work_date = timezone.localtime(entry.clock_in).date()
+        TimeEntry.objects.bulk_update(batch, ["work_date"])
+        last_id = batch[-1].id
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0014_clockevent_teamstatus_absent'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='timeentry',
+            name='work_date',
+            field=models.DateField(editable=False, null=True),
+        ),
+        migrations.RunPython(backfill_work_date, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='timeentry',
+            name='work_date',
+            field=models.DateField(editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='timeentry',
+            index=models.Index(fields=['user', 'work_date'], name='timeentry_user_work_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='timeentry',
+            index=models.Index(fields=['work_date'], name='timeentry_work_date_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-17 00:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0015_timeentry_work_date'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='timeentry',
+            index=models.Index(fields=['is_open', 'clock_in'], name='timeentry_open_clock_in_idx'),
+        ),
+    ]
@@ -0,0 +1,63 @@
+# Generated by Django 5.2.18 on 2026-10-17 00:19
+
+import unicodedata
+
+from django.db import migrations, models
+
+
+def _normalize(value):
+    # Frozen copy of users.models.normalize_search
+    decomposed = unicodedata.normalize("NFKD", value or "")
+    return "".join(c for c in decomposed if not unicodedata.combining(c)).lower().strip()
+
+
+def backfill_search_fields(apps, schema_editor):
+    User = apps.get_model("users", "User")
+    last_id = 0
+    while True:
+        batch = list(
+            User.objects.filter(id__gt=last_id).order_by("id").only("id", "first_name", "last_name", "email")[:1000]
+        )
+        if not batch:
+            break
+        for user in batch:
+            user.search_full_name = _normalize(f"{user.first_name} {user.last_name}")
+            user.search_last_name = _normalize(user.last_name)
+            user.search_email = _normalize(user.email)
+        User.objects.bulk_update(batch, ["search_full_name", "search_last_name", "search_email"])
+        last_id = batch[-1].id
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('users', '0016_timeentry_auto_closed'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='search_email',
+            field=models.CharField(db_index=True, default='', editable=False, max_length=254),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='search_full_name',
+            field=models.CharField(db_index=True, default='', editable=False, max_length=201),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='search_last_name',
+            field=models.CharField(default='', editable=False, max_length=100),
+        ),
+        migrations.RunPython(backfill_search_fields, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['search_last_name', 'search_full_name', 'id'], name='user_directory_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['team', 'search_last_name', 'search_full_name', 'id'], name='user_team_directory_idx'),
+        ),
+    ]
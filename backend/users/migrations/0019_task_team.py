@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-17 00:56
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_task_team(apps, schema_editor):
+    """Copy each assignee's team onto their tasks in a single UPDATE."""
+    Task = apps.get_model("users", "Task")
+    User = apps.get_model("users", "User")
+    Task.objects.update(team_id=models.Subquery(User.objects.filter(id=models.OuterRef("assigned_to_id")).values("team_id")[:1]))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0018_task_list_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='team',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='tasks', to='users.team'),
+        ),
+        migrations.RunPython(backfill_task_team, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['team', 'created_at', 'id'], name='task_team_created_idx'),
+        ),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:03
+
+import re
+import unicodedata
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def _tokens(value):
+    # Frozen copy of users.models.search_tokens
+    decomposed = unicodedata.normalize("NFKD", value or "")
+    normalized = "".join(c for c in decomposed if not unicodedata.combining(c)).lower().strip()
+    return {word[:64] for word in re.findall(r"\w+", normalized)}
+
+
+def backfill_search_tokens(apps, schema_editor):
+    Task = apps.get_model("users", "Task")
+    TaskSearchToken = apps.get_model("users", "TaskSearchToken")
+    last_id = 0
+    while True:
+        batch = list(Task.objects.filter(id__gt=last_id).order_by("id").only("id", "title", "description")[:1000])
+        if not batch:
+            break
+        rows = []
+        for task in batch:
+            title, description = _tokens(task.title), _tokens(task.description)
+            rows.extend(
+                TaskSearchToken(task_id=task.id, token=token, weight=2 * (token in title) + (token in description))
+                for token in title | description
+            )
+        TaskSearchToken.objects.bulk_create(rows, batch_size=1000)
+        last_id = batch[-1].id
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0019_task_team'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskSearchToken',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.CharField(max_length=64)),
+                ('weight', models.PositiveSmallIntegerField()),
+                ('task', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_tokens', to='users.task')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('token', 'task'), name='task_search_token_unique')],
+            },
+        ),
+        migrations.RunPython(backfill_search_tokens, migrations.RunPython.noop),
+    ]
@@ -1,7 +1,29 @@
+import re
+import unicodedata
+
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager, PermissionsMixin
-from django.db import models
+from django.db import models, transaction
 from django.utils import timezone
 
+# Denormalized columns (TimeEntry.is_open and work_date, Task.team, Task search tokens) are kept in
+# sync by save(). bulk_create, bulk_update and QuerySet.update() bypass it, so code writing these
+# models in bulk calls TimeEntry.sync_derived_fields, Task.sync_team or TaskSearchToken.objects.reindex
+# itself.
+
+
+def normalize_search(value) -> str:
+    """Lowercase ``value`` and strip accents, so "Élodie" is found by "elo"."""
+    decomposed = unicodedata.normalize("NFKD", value or "")
+    return "".join(c for c in decomposed if not unicodedata.combining(c)).lower().strip()
+
+
+SEARCH_TOKEN_LENGTH = 64
+
+
+def search_tokens(value) -> set[str]:
+    """Distinct normalized words of ``value`` (see normalize_search), cut to the token column length."""
+    return {word[:SEARCH_TOKEN_LENGTH] for word in re.findall(r"\w+", normalize_search(value))}
+
 
 # Custom User Manager
 class CustomUserManager(BaseUserManager):
@@ -72,14 +94,43 @@ class User(AbstractBaseUser, PermissionsMixin):
     is_active = models.BooleanField(default=True)
     is_staff = models.BooleanField(default=False)
 
+    # Normalized copies of the name and email (see normalize_search), indexed for the
+    # prefix search of the member directory. Maintained by save().
+    search_full_name = models.CharField(max_length=201, default="", editable=False, db_index=True)
+    search_last_name = models.CharField(max_length=100, default="", editable=False)
+    search_email = models.CharField(max_length=254, default="", editable=False, db_index=True)
+
     objects = CustomUserManager()
 
     USERNAME_FIELD = "email"
     REQUIRED_FIELDS = ["first_name", "last_name", "phone_number"]
 
+    SEARCH_SOURCE_FIELDS = {"first_name", "last_name", "email"}
+    SEARCH_FIELDS = {"search_full_name", "search_last_name", "search_email"}
+
+    class Meta:
+        indexes = [
+            # Directory pages are ordered by (search_last_name, search_full_name, id),
+            # globally or within a team; the first index also serves last-name prefix search.
+            models.Index(fields=["search_last_name", "search_full_name", "id"], name="user_directory_idx"),
+            models.Index(fields=["team", "search_last_name", "search_full_name", "id"], name="user_team_directory_idx"),
+        ]
+
     def __str__(self):
         return f"{self.first_name} {self.last_name} ({self.role})"
 
+    def save(self, *args, **kwargs):
+        self.sync_search_fields()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and self.SEARCH_SOURCE_FIELDS & set(update_fields):
+            kwargs["update_fields"] = {*update_fields, *self.SEARCH_FIELDS}
+        super().save(*args, **kwargs)
+
+    def sync_search_fields(self):
+        self.search_full_name = normalize_search(f"{self.first_name} {self.last_name}")
+        self.search_last_name = normalize_search(self.last_name)
+        self.search_email = normalize_search(self.email)
+
     @property
     def full_name(self):
         return f"{self.first_name} {self.last_name}".strip()
@@ -95,27 +146,144 @@ class TimeEntry(models.Model):
     clock_in = models.DateTimeField(default=timezone.now)
     clock_out = models.DateTimeField(null=True, blank=True)
     total_hours = models.FloatField(null=True, blank=True)
+    # True while the session is open, NULL once closed. Unique indexes treat NULLs as
+    # distinct, so (user, is_open) allows any number of closed sessions but a single
+    # open one, on MariaDB as well as SQLite (MariaDB ignores conditional constraints).
+    is_open = models.BooleanField(null=True, default=True, editable=False)
+    # Local calendar day of clock_in, stored so date filters hit an index instead of
+    # wrapping clock_in in a timezone conversion (which MariaDB cannot index).
+    work_date = models.DateField(editable=False)
+    # Set when a session the user forgot to clock out of was closed for them (by
+    # close_stale_sessions, or by migration 0013 for duplicate open sessions)
+    auto_closed = models.BooleanField(default=False)
 
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
         ordering = ["-clock_in", "-created_at"]
+        indexes = [
+            # Backs per-user history pages ordered by (clock_in, id)
+            models.Index(fields=["user", "clock_in"], name="timeentry_user_clock_in_idx"),
+            models.Index(fields=["user", "work_date"], name="timeentry_user_work_date_idx"),
+            # Team-wide day scans (exports, absence sweep)
+            models.Index(fields=["work_date"], name="timeentry_work_date_idx"),
+            # Open sessions by age, for close_stale_sessions
+            models.Index(fields=["is_open", "clock_in"], name="timeentry_open_clock_in_idx"),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=["user", "is_open"], name="timeentry_single_open_session"),
+        ]
 
     def __str__(self):
         return f"{self.user.email} - IN {self.clock_in} / OUT {self.clock_out}"
 
+    def save(self, *args, **kwargs):
+        self.sync_derived_fields()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            update_fields = set(update_fields)
+            if "clock_out" in update_fields:
+                update_fields.add("is_open")
+            if "clock_in" in update_fields:
+                update_fields.add("work_date")
+            kwargs["update_fields"] = update_fields
+        super().save(*args, **kwargs)
+
+    def sync_derived_fields(self):
+        """Derive is_open (from clock_out) and work_date (the local day of clock_in)."""
+        self.is_open = True if self.clock_out is None else None
+        # to_python: clock_in may still be an ISO string when assigned directly
+        self.clock_in = self._meta.get_field("clock_in").to_python(self.clock_in)
+        self.work_date = timezone.localtime(self.clock_in).date()
+
     def compute_total_hours(self):
         if self.clock_in and self.clock_out:
             delta = self.clock_out - self.clock_in
             self.total_hours = round(delta.total_seconds() / 3600, 2)
 
 
-# status marking (late / pto / normal) per day
+class PunchEvent(models.Model):
+    """A clock punch received from a badge kiosk, possibly replayed after the kiosk was offline.
+
+    The unique idempotency key makes replays safe: a punch that was already received is
+    dropped by the database instead of being applied twice.
+    """
+
+    DIRECTION_CHOICES = [
+        ("in", "In"),
+        ("out", "Out"),
+    ]
+    OUTCOME_CHOICES = [
+        ("applied", "Applied"),
+        ("ignored", "Ignored"),
+    ]
+
+    idempotency_key = models.CharField(max_length=64, unique=True)
+    user = models.ForeignKey("users.User", on_delete=models.CASCADE, related_name="punch_events")
+    timestamp = models.DateTimeField()
+    direction = models.CharField(max_length=3, choices=DIRECTION_CHOICES)
+    outcome = models.CharField(max_length=10, choices=OUTCOME_CHOICES, default="applied")
+    # Identifies the request that inserted the row, so it knows which punches are new
+    batch_id = models.UUIDField(db_index=True)
+
+    received_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["user", "timestamp"]
+
+    def __str__(self):
+        return f"{self.user.email} {self.direction} @ {self.timestamp}"
+
+
+class ClockEvent(models.Model):
+    """A clock-in waiting for status evaluation (lateness) by the process_clock_events worker.
+
+    Rows are deleted once processed, so the table only holds the pending backlog.
+    """
+
+    user = models.ForeignKey("users.User", on_delete=models.CASCADE, related_name="clock_events")
+    timestamp = models.DateTimeField()
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["id"]
+
+    def __str__(self):
+        return f"{self.user.email} clock-in @ {self.timestamp}"
+
+
+class DailyTimeSummary(models.Model):
+    """Per-user rollup of closed TimeEntry sessions for one local (Europe/Paris) day.
+
+    Sessions crossing midnight are split across the days they cover. Rows are
+    maintained by users.rollups whenever an entry is closed, edited or deleted.
+    """
+
+    user = models.ForeignKey("users.User", on_delete=models.CASCADE, related_name="daily_summaries")
+    date = models.DateField()
+    worked_seconds = models.PositiveIntegerField(default=0)
+    session_count = models.PositiveIntegerField(default=0)
+    first_clock_in = models.DateTimeField(null=True, blank=True)
+    is_late = models.BooleanField(default=False)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ("user", "date")
+        ordering = ["-date"]
+
+    def __str__(self):
+        return f"{self.user.email} {self.date} -> {self.worked_seconds}s"
+
+
+# status marking (late / pto / absent / normal) per day
 class TeamStatus(models.Model):
     STATUS_CHOICES = [
         ("normal", "Normal"),
         ("late", "Late"),
         ("pto", "PTO"),
+        ("absent", "Absent"),
     ]
 
     user = models.ForeignKey("users.User", on_delete=models.CASCADE, related_name="team_statuses")
@@ -157,16 +325,102 @@ class Task(models.Model):
         on_delete=models.CASCADE,
         related_name="assigned_tasks",
     )
+    # Team of the assignee, denormalized so manager lists and permission checks are a lookup on
+    # (team, created_at). Kept in sync by save() and by team_assignment when users change team.
+    team = models.ForeignKey(
+        Team,
+        null=True,
+        blank=True,
+        editable=False,
+        on_delete=models.SET_NULL,
+        related_name="tasks",
+    )
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            # Task list pages are ordered by (created_at, id) newest first, globally or per
+            # team/assignee/creator; due-date windows are range scans on due_date.
+            models.Index(fields=["created_at", "id"], name="task_created_idx"),
+            models.Index(fields=["team", "created_at", "id"], name="task_team_created_idx"),
+            models.Index(fields=["assigned_to", "created_at", "id"], name="task_assignee_created_idx"),
+            models.Index(fields=["created_by", "created_at", "id"], name="task_creator_created_idx"),
+            models.Index(fields=["due_date"], name="task_due_date_idx"),
+        ]
+
+    SEARCH_SOURCE_FIELDS = {"title", "description"}
 
     def __str__(self):
         return f"{self.title} ({self.priority}) - {self.assigned_to.full_name}"
 
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get("update_fields")
+        if update_fields is None or "assigned_to" in update_fields:
+            self.sync_team()
+            if update_fields is not None:
+                kwargs["update_fields"] = {*update_fields, "team"}
+        indexed_text = getattr(self, "_indexed_text", None)
+        reindex = (update_fields is None or self.SEARCH_SOURCE_FIELDS & set(update_fields)) and (
+            indexed_text is None or indexed_text != (self.title, self.description)
+        )
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if reindex:
+                TaskSearchToken.objects.reindex([self])
+                self._indexed_text = (self.title, self.description)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        task = super().from_db(db, field_names, values)
+        # The indexed text as loaded, so saves that leave it unchanged skip the reindex
+        if cls.SEARCH_SOURCE_FIELDS <= set(field_names):
+            task._indexed_text = (task.title, task.description)
+        return task
+
+    def sync_team(self):
+        """Derive team from the assignee's current team."""
+        self.team_id = self.assigned_to.team_id
+
+
+class TaskSearchTokenManager(models.Manager):
+    def reindex(self, tasks):
+        """Rebuild the search tokens of ``tasks`` from their titles and descriptions."""
+        tasks = list(tasks)
+        self.filter(task__in=tasks).delete()
+        rows = []
+        for task in tasks:
+            title, description = search_tokens(task.title), search_tokens(task.description)
+            rows.extend(
+                self.model(task=task, token=token, weight=2 * (token in title) + (token in description))
+                for token in title | description
+            )
+        self.bulk_create(rows, batch_size=1000)
+
+
+class TaskSearchToken(models.Model):
+    """One word of a task's title or description: the inverted index behind task search.
+
+    Kept by Task.save(). Words found in the title weigh 2, in the description 1, in both 3.
+    """
+
+    task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name="search_tokens")
+    token = models.CharField(max_length=SEARCH_TOKEN_LENGTH)
+    weight = models.PositiveSmallIntegerField()
+
+    objects = TaskSearchTokenManager()
+
+    class Meta:
+        constraints = [
+            # Also the index for exact and prefix lookups on token
+            models.UniqueConstraint(fields=["token", "task"], name="task_search_token_unique"),
+        ]
+
+    def __str__(self):
+        return f"{self.token} -> task {self.task_id}"
+
 
 class WorkingHours(models.Model):
     DAY_CHOICES = [
@@ -0,0 +1,126 @@
+"""Keyset (cursor) pagination.
+
+A page is fetched with a range condition on the ordering columns instead of an
+OFFSET, so page N costs the same as page 1 as long as an index covers the
+ordering. The cursor is an opaque, URL-safe encoding of the last row's values.
+"""
+
+import base64
+import binascii
+import json
+from datetime import datetime
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db import models
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+class InvalidPageParameter(ValueError):
+    pass
+
+
+def parse_limit(raw, default=DEFAULT_PAGE_SIZE, maximum=MAX_PAGE_SIZE) -> int:
+    if raw in (None, ""):
+        return default
+    try:
+        limit = int(raw)
+    except (TypeError, ValueError):
+        raise InvalidPageParameter("limit must be an integer.") from None
+    if limit < 1:
+        raise InvalidPageParameter("limit must be positive.")
+    return min(limit, maximum)
+
+
+def parse_date_param(value, name):
+    """Parse an optional YYYY-MM-DD query parameter."""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value).date()
+    except ValueError:
+        raise InvalidPageParameter(f"Invalid {name} date (use YYYY-MM-DD).") from None
+
+
+def _encode_cursor(values) -> str:
+    payload = json.dumps([v.isoformat() if hasattr(v, "isoformat") else v for v in values])
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def _field(model, name):
+    """The model field ``name``, or None for a numeric annotation such as a search rank."""
+    try:
+        return model._meta.get_field(name)
+    except FieldDoesNotExist:
+        return None
+
+
+def _decode_value(model, name, value):
+    field = _field(model, name)
+    if field is not None:
+        return field.to_python(value)
+    if isinstance(value, bool) or not isinstance(value, int | float):
+        raise ValidationError("Annotated cursor values must be numbers.")
+    return value
+
+
+def _decode_cursor(model, fields, cursor):
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise InvalidPageParameter("Invalid cursor.") from None
+    if not isinstance(values, list) or len(values) != len(fields):
+        raise InvalidPageParameter("Invalid cursor.")
+    try:
+        return [_decode_value(model, name, value) for name, value in zip(fields, values, strict=True)]
+    except ValidationError:
+        raise InvalidPageParameter("Invalid cursor.") from None
+
+
+def keyset_after(fields, descending, values):
+    """Rows strictly after ``values`` in the given ordering, as a lexicographic OR of range conditions."""
+    condition = models.Q()
+    for i, name in enumerate(fields):
+        step = models.Q(**{f"{name}__{'lt' if descending[i] else 'gt'}": values[i]})
+        for prev_name, prev_value in zip(fields[:i], values[:i], strict=True):
+            step &= models.Q(**{prev_name: prev_value})
+        condition |= step
+    return condition
+
+
+def keyset_paginate(queryset, ordering, cursor=None, limit=DEFAULT_PAGE_SIZE):
+    """Return ``(rows, next_cursor)`` for one page of ``queryset`` sorted by ``ordering``.
+
+    ``ordering`` must end with a unique column (usually ``"-id"``) so the sort is total. It may
+    start with numeric annotations of ``queryset`` (e.g. a search rank).
+    """
+    fields = [name.lstrip("-") for name in ordering]
+    descending = [name.startswith("-") for name in ordering]
+
+    queryset = queryset.order_by(*ordering)
+    if cursor:
+        queryset = queryset.filter(keyset_after(fields, descending, _decode_cursor(queryset.model, fields, cursor)))
+
+    rows = list(queryset[: limit + 1])
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    attnames = [field.attname if (field := _field(queryset.model, name)) else name for name in fields]
+    return rows, _encode_cursor([getattr(last, name) for name in attnames])
+
+
+def keyset_paginate_rows(rows, model, ordering, cursor=None, limit=DEFAULT_PAGE_SIZE):
+    """In-memory counterpart of ``keyset_paginate`` for dicts keyed by ``model``'s (ascending) ``ordering`` fields.
+
+    Cursors are interchangeable with the ones ``keyset_paginate`` returns for the same ordering.
+    """
+    rows = sorted(rows, key=lambda row: tuple(row[name] for name in ordering))
+    if cursor:
+        after = tuple(_decode_cursor(model, ordering, cursor))
+        rows = [row for row in rows if tuple(row[name] for name in ordering) > after]
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, _encode_cursor([rows[-1][name] for name in ordering])
@@ -0,0 +1,105 @@
+"""Cached live presence for team member listings.
+
+Each user has two cache entries: whether they are clocked in (and since when)
+and their status for the day. Clock-in, clock-out and status changes write the
+entry they affect directly; other writers (manager fixes, kiosk replays,
+background jobs) call ``forget_presence`` once their transaction commits.
+Entries missing from the cache are rebuilt from the database in two queries
+and stored with ``cache.add``, so a refill never replaces an entry that a
+writer stored after the refill's query ran.
+Every write also bumps the presence version of the user's team (see versions).
+"""
+
+from django.core.cache import cache
+from django.utils import timezone
+
+from .models import TeamStatus, TimeEntry, User
+from .versions import bump_presence
+
+PRESENCE_CACHE_TIMEOUT = 12 * 60 * 60
+_NOT_CLOCKED_IN = ""
+
+
+def _open_key(user_id) -> str:
+    return f"users:presence:open:{user_id}"
+
+
+def _status_key(user_id, day) -> str:
+    return f"users:presence:status:{day.isoformat()}:{user_id}"
+
+
+def _fill(keys, fresh):
+    """Cache ``fresh[user_id]`` under each ``keys`` entry unless a writer got there first; returns the cached values."""
+    values = {}
+    for key, user_id in keys.items():
+        if cache.add(key, fresh[user_id], PRESENCE_CACHE_TIMEOUT):
+            values[user_id] = fresh[user_id]
+        else:
+            values[user_id] = cache.get(key, fresh[user_id])
+    return values
+
+
+def get_presence(user_ids):
+    """Return ``{user_id: {"open_clock_in", "today_status", "today_status_note"}}`` for today."""
+    user_ids = set(user_ids)
+    today = timezone.localdate()
+    open_keys = {_open_key(user_id): user_id for user_id in user_ids}
+    status_keys = {_status_key(user_id, today): user_id for user_id in user_ids}
+    cached = cache.get_many([*open_keys, *status_keys])
+
+    open_since = {open_keys[key]: value for key, value in cached.items() if key in open_keys}
+    statuses = {status_keys[key]: value for key, value in cached.items() if key in status_keys}
+
+    missing_open = user_ids - open_since.keys()
+    if missing_open:
+        fresh = dict.fromkeys(missing_open, _NOT_CLOCKED_IN)
+        for user_id, clock_in in TimeEntry.objects.filter(user_id__in=missing_open, is_open=True).values_list(
+            "user_id", "clock_in"
+        ):
+            fresh[user_id] = clock_in.isoformat()
+        open_since.update(_fill({_open_key(user_id): user_id for user_id in fresh}, fresh))
+
+    missing_status = user_ids - statuses.keys()
+    if missing_status:
+        fresh = dict.fromkeys(missing_status, ("normal", ""))
+        for user_id, status, note in TeamStatus.objects.filter(user_id__in=missing_status, date=today).values_list(
+            "user_id", "status", "note"
+        ):
+            fresh[user_id] = (status, note)
+        statuses.update(_fill({_status_key(user_id, today): user_id for user_id in fresh}, fresh))
+
+    return {
+        user_id: {
+            "open_clock_in": open_since[user_id] or None,
+            "today_status": statuses[user_id][0],
+            "today_status_note": statuses[user_id][1],
+        }
+        for user_id in user_ids
+    }
+
+
+def record_clock_in(user, clock_in):
+    cache.set(_open_key(user.id), clock_in.isoformat(), PRESENCE_CACHE_TIMEOUT)
+    bump_presence([user.team_id])
+
+
+def record_clock_out(user):
+    cache.set(_open_key(user.id), _NOT_CLOCKED_IN, PRESENCE_CACHE_TIMEOUT)
+    bump_presence([user.team_id])
+
+
+def record_status(user, day, status, note):
+    cache.set(_status_key(user.id, day), (status, note), PRESENCE_CACHE_TIMEOUT)
+    bump_presence([user.team_id])
+
+
+def forget_presence(user_ids):
+    """Drop the cached presence of ``user_ids`` so the next read reloads it from the database."""
+    user_ids = set(user_ids)
+    today = timezone.localdate()
+    keys = []
+    for user_id in user_ids:
+        keys += [_open_key(user_id), _status_key(user_id, today)]
+    cache.delete_many(keys)
+    if user_ids:
+        bump_presence(set(User.objects.filter(id__in=user_ids).values_list("team_id", flat=True)))
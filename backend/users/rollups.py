@@ -0,0 +1,148 @@
+"""Maintenance of the DailyTimeSummary rollup table.
+
+Reports read per-day rollups instead of rescanning raw TimeEntry rows. Every
+code path that closes, edits or deletes an entry must call
+``refresh_daily_summaries`` inside the same transaction with the local dates
+the entry covered before and after the change.
+
+The late flag mirrors the day's TeamStatus ("late"), as written by the
+clock-in worker or a manager, rather than re-reading the current schedule, so
+schedule changes never rewrite past days. Code that writes TeamStatus calls
+``sync_late_flags`` for the days it touched.
+"""
+
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+
+from django.db import models, transaction
+from django.utils import timezone
+
+from .models import DailyTimeSummary, TeamStatus, TimeEntry
+
+
+def local_midnight(day):
+    """Aware datetime of the start of ``day`` in the local timezone."""
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def split_by_local_day(start, end):
+    """Yield (local_date, segment_start, segment_end) for each local day covered by [start, end)."""
+    current = timezone.localtime(start)
+    end = timezone.localtime(end)
+    while current < end:
+        next_midnight = local_midnight(current.date() + timedelta(days=1))
+        yield current.date(), current, min(end, next_midnight)
+        current = next_midnight
+
+
+def affected_dates(clock_in, clock_out) -> set:
+    """Local dates whose rollup depends on a session. Open sessions are not rolled up."""
+    if not clock_in or not clock_out:
+        return set()
+    return {day for day, _, _ in split_by_local_day(clock_in, clock_out)}
+
+
+def _late_statuses():
+    return TeamStatus.objects.filter(status="late")
+
+
+def summarize_entries(user_id, entries, late_dates, only_dates=None):
+    """Build unsaved DailyTimeSummary rows (sorted by date) for one user's closed entries.
+
+    ``late_dates`` are the days with a "late" TeamStatus for the user.
+    """
+    seconds = defaultdict(float)
+    sessions = defaultdict(int)
+    first_in = {}
+
+    for entry in entries:
+        for day, start, end in split_by_local_day(entry.clock_in, entry.clock_out):
+            if only_dates is not None and day not in only_dates:
+                continue
+            seconds[day] += (end - start).total_seconds()
+            sessions[day] += 1
+            # Only a real clock-in counts, not the midnight continuation of yesterday's session
+            if start == entry.clock_in and (day not in first_in or entry.clock_in < first_in[day]):
+                first_in[day] = entry.clock_in
+
+    return [
+        DailyTimeSummary(
+            user_id=user_id,
+            date=day,
+            worked_seconds=round(seconds[day]),
+            session_count=sessions[day],
+            first_clock_in=first_in.get(day),
+            is_late=day in late_dates,
+        )
+        for day in sorted(sessions)
+    ]
+
+
+def refresh_daily_summaries(user_dates):
+    """Recompute the rollup rows for ``{user_id: {date, ...}}`` in a fixed number of queries."""
+    user_dates = {user_id: set(dates) for user_id, dates in user_dates.items() if dates}
+    if not user_dates:
+        return
+
+    all_dates = set().union(*user_dates.values())
+    range_start = local_midnight(min(all_dates))
+    range_end = local_midnight(max(all_dates) + timedelta(days=1))
+
+    entries_by_user = defaultdict(list)
+    entries = TimeEntry.objects.filter(
+        user_id__in=user_dates,
+        clock_out__isnull=False,
+        clock_in__lt=range_end,
+        clock_out__gt=range_start,
+    ).only("id", "user_id", "clock_in", "clock_out")
+    for entry in entries:
+        entries_by_user[entry.user_id].append(entry)
+
+    late_dates = defaultdict(set)
+    for user_id, day in (
+        _late_statuses().filter(user_id__in=user_dates, date__in=all_dates).values_list("user_id", "date")
+    ):
+        late_dates[user_id].add(day)
+
+    rows = []
+    stale = models.Q()
+    for user_id, dates in user_dates.items():
+        rows.extend(summarize_entries(user_id, entries_by_user[user_id], late_dates[user_id], only_dates=dates))
+        stale |= models.Q(user_id=user_id, date__in=dates)
+
+    with transaction.atomic():
+        DailyTimeSummary.objects.filter(stale).delete()
+        DailyTimeSummary.objects.bulk_create(rows)
+
+
+def iter_all_summaries(chunk_size=2000):
+    """Stream the expected rollup rows for the whole TimeEntry table, ordered by (user, date)."""
+    late_dates = defaultdict(set)
+    for user_id, day in _late_statuses().values_list("user_id", "date").iterator(chunk_size=chunk_size):
+        late_dates[user_id].add(day)
+
+    entries = (
+        TimeEntry.objects.filter(clock_out__isnull=False)
+        .only("id", "user_id", "clock_in", "clock_out")
+        .order_by("user_id", "clock_in")
+        .iterator(chunk_size=chunk_size)
+    )
+
+    current_user, batch = None, []
+    for entry in entries:
+        if entry.user_id != current_user:
+            if batch:
+                yield from summarize_entries(current_user, batch, late_dates[current_user])
+            current_user, batch = entry.user_id, []
+        batch.append(entry)
+    if batch:
+        yield from summarize_entries(current_user, batch, late_dates[current_user])
+
+
+def sync_late_flags(user_ids, dates):
+    """Copy the "late" TeamStatus of ``user_ids`` on ``dates`` onto their existing rollup rows, in one UPDATE."""
+    if not user_ids or not dates:
+        return
+    DailyTimeSummary.objects.filter(user_id__in=set(user_ids), date__in=set(dates)).update(
+        is_late=models.Exists(_late_statuses().filter(user_id=models.OuterRef("user_id"), date=models.OuterRef("date")))
+    )
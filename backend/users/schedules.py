@@ -0,0 +1,49 @@
+"""Cached per-user weekly schedules.
+
+Lateness checks run on every clock-in, so each user's WorkingHours are cached
+as a ``{weekday: start_time}`` dict. Any code that writes WorkingHours must
+call ``invalidate_schedule`` for the affected user.
+"""
+
+from collections import defaultdict
+
+from django.core.cache import cache
+
+from .models import WorkingHours
+
+SCHEDULE_CACHE_TIMEOUT = 60 * 60
+
+
+def _cache_key(user_id) -> str:
+    return f"users:schedule:{user_id}"
+
+
+def get_weekly_schedules(user_ids):
+    """Return ``{user_id: {weekday: start_time}}``; only cache misses hit the database, in one query."""
+    user_ids = set(user_ids)
+    keys = {_cache_key(user_id): user_id for user_id in user_ids}
+    schedules = {keys[key]: schedule for key, schedule in cache.get_many(keys).items()}
+
+    missing = user_ids - schedules.keys()
+    if missing:
+        loaded = defaultdict(dict)
+        for user_id, day, start_time in WorkingHours.objects.filter(user_id__in=missing).values_list(
+            "user_id", "day_of_week", "start_time"
+        ):
+            loaded[user_id][day] = start_time
+        # Users without working hours are cached too, as an empty schedule. add, not set: a schedule
+        # stored by another reader since the query is kept rather than overwritten.
+        for user_id in missing:
+            if cache.add(_cache_key(user_id), loaded[user_id], SCHEDULE_CACHE_TIMEOUT):
+                schedules[user_id] = loaded[user_id]
+            else:
+                schedules[user_id] = cache.get(_cache_key(user_id), loaded[user_id])
+    return schedules
+
+
+def get_weekly_schedule(user_id):
+    return get_weekly_schedules([user_id])[user_id]
+
+
+def invalidate_schedule(user_id):
+    cache.delete(_cache_key(user_id))
@@ -10,6 +10,7 @@ from .models import (
     User,
     WorkingHours,
 )
+from .team_assignment import assign_users_to_team
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -51,6 +52,7 @@ class UserSerializer(serializers.ModelSerializer):
         return user
 
     def update(self, instance, validated_data):
+        old_team_id = instance.team_id
         for attr, value in validated_data.items():
             if attr == "password":
                 instance.set_password(value)
@@ -59,14 +61,17 @@ class UserSerializer(serializers.ModelSerializer):
             else:
                 setattr(instance, attr, value)
         instance.save()
+        if instance.team_id != old_team_id:
+            # Carry the move over to the user's tasks and team conversations
+            assign_users_to_team({instance.id: old_team_id}, instance.team_id)
         return instance
 
 
 class TimeEntrySerializer(serializers.ModelSerializer):
     class Meta:
         model = TimeEntry
-        fields = ["id", "clock_in", "clock_out", "total_hours"]
-        read_only_fields = ["total_hours"]
+        fields = ["id", "clock_in", "clock_out", "total_hours", "auto_closed"]
+        read_only_fields = ["total_hours", "auto_closed"]
 
 
 class TeamStatusSerializer(serializers.ModelSerializer):
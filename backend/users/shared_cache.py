@@ -0,0 +1,23 @@
+"""Guard for commands that invalidate cache entries the API process serves.
+
+The worker and the cron commands clear presence entries and bump list
+versions after their writes; with a per-process cache those calls would only
+reach their own process and the API would keep serving stale data.
+"""
+
+from django.conf import settings
+from django.core.management.base import CommandError
+
+PROCESS_LOCAL_BACKENDS = {
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+}
+
+
+def require_shared_cache():
+    backend = settings.CACHES["default"]["BACKEND"]
+    if backend in PROCESS_LOCAL_BACKENDS and not settings.ALLOW_PROCESS_LOCAL_CACHE:
+        raise CommandError(
+            f"{backend} is local to this process, so the API would not see this command's cache invalidations. "
+            "Point CACHE_BACKEND/CACHE_LOCATION at a shared cache, or set ALLOW_PROCESS_LOCAL_CACHE=True."
+        )
@@ -0,0 +1,99 @@
+"""Closing sessions people forgot to clock out of.
+
+An open session is stale once its user's scheduled end for that day (plus a
+grace period) has passed, or, without a schedule, once it is older than a
+maximum length. Candidates are read through the (is_open, clock_in) index in
+chunks keyed on (clock_in, id), so each chunk is one range read that starts
+where the last one stopped; each chunk is locked, closed with one bulk update
+and committed on its own, so no lock is held for more than one chunk.
+"""
+
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import TimeEntry, WorkingHours
+from .pagination import keyset_after
+from .presence import forget_presence
+from .rollups import affected_dates, refresh_daily_summaries
+
+DEFAULT_MAX_HOURS = 12
+DEFAULT_GRACE = timedelta(hours=1)
+DEFAULT_BATCH_SIZE = 1000
+
+
+def stale_close_time(entry, end_time, now, max_hours=DEFAULT_MAX_HOURS, grace=DEFAULT_GRACE):
+    """When ``entry`` should be closed, or None if it is not stale yet.
+
+    ``end_time`` is the user's scheduled end on the entry's work_date, if any.
+    """
+    if end_time is not None:
+        scheduled_end = timezone.make_aware(datetime.combine(entry.work_date, end_time))
+        if scheduled_end > entry.clock_in:
+            return scheduled_end if now >= scheduled_end + grace else None
+    close_at = entry.clock_in + timedelta(hours=max_hours)
+    return close_at if now >= close_at else None
+
+
+def _close_chunk(after, now, max_hours, grace, batch_size, dry_run):
+    """Close the stale sessions among the ``batch_size`` candidates after the ``(clock_in, id)`` key ``after``.
+
+    Returns (last key, scanned, closed); the key is None once there are no candidates left.
+    """
+    # Not stale before min(grace, max_hours) after clock-in, whatever the schedule says
+    oldest_clock_in = now - min(grace, timedelta(hours=max_hours))
+    candidates = TimeEntry.objects.filter(is_open=True, clock_in__lte=oldest_clock_in)
+    if after is not None:
+        candidates = candidates.filter(keyset_after(("clock_in", "id"), (False, False), after))
+    with transaction.atomic():
+        entries = list(
+            candidates.select_for_update(skip_locked=True)
+            .order_by("clock_in", "id")
+            .only("id", "user_id", "clock_in", "clock_out", "work_date")[:batch_size]
+        )
+        if not entries:
+            return None, 0, 0
+
+        end_times = {
+            (user_id, day): end_time
+            for user_id, day, end_time in WorkingHours.objects.filter(
+                user_id__in={entry.user_id for entry in entries}
+            ).values_list("user_id", "day_of_week", "end_time")
+        }
+
+        closed = []
+        for entry in entries:
+            end_time = end_times.get((entry.user_id, entry.work_date.weekday()))
+            close_at = stale_close_time(entry, end_time, now, max_hours=max_hours, grace=grace)
+            if close_at is None:
+                continue
+            entry.clock_out = close_at
+            entry.compute_total_hours()
+            entry.auto_closed = True
+            entry.sync_derived_fields()
+            closed.append(entry)
+
+        if closed and not dry_run:
+            TimeEntry.objects.bulk_update(closed, ["clock_out", "total_hours", "is_open", "auto_closed"])
+            user_dates = defaultdict(set)
+            for entry in closed:
+                user_dates[entry.user_id] |= affected_dates(entry.clock_in, entry.clock_out)
+            refresh_daily_summaries(user_dates)
+            transaction.on_commit(lambda: forget_presence(user_dates))
+    return (entries[-1].clock_in, entries[-1].id), len(entries), len(closed)
+
+
+def close_stale_sessions(
+    now=None, max_hours=DEFAULT_MAX_HOURS, grace=DEFAULT_GRACE, batch_size=DEFAULT_BATCH_SIZE, dry_run=False
+):
+    """Close every stale open session, one committed chunk at a time. Returns (scanned, closed)."""
+    now = now or timezone.now()
+    after, scanned, closed = None, 0, 0
+    while True:
+        after, chunk_scanned, chunk_closed = _close_chunk(after, now, max_hours, grace, batch_size, dry_run)
+        if after is None:
+            return scanned, closed
+        scanned += chunk_scanned
+        closed += chunk_closed
@@ -0,0 +1,167 @@
+"""Concrete task plans: open tasks placed into a user's working hours.
+
+Every open task is available now, so earliest-deadline-first reduces to one
+sort: tasks by due date (undated ones last), then priority, then age. They
+are laid end to end into the weekly WorkingHours windows starting from the
+plan's start, split across windows as needed; a task whose last slot ends
+after its due date is missed, and one that does not fit within the horizon
+is left unscheduled.
+
+Plans are cached per user, with the ordered task inputs they were built from
+and the position after each task. A task's slots depend only on the tasks
+before it, so when tasks change the plan is kept up to the first differing
+input and only the rest is replanned. Plans start on a quarter-hour boundary
+and are rebuilt from scratch when that boundary or the working hours change.
+"""
+
+from collections import defaultdict
+from datetime import UTC, datetime, timedelta
+
+from django.core.cache import cache
+from django.utils import timezone
+
+from .models import Task, WorkingHours
+from .versions import get_versions, working_hours_scope
+from .workload import REMAINING_HOURS, WeeklySchedule
+
+PLAN_STEP = timedelta(minutes=15)
+PLAN_HORIZON_DAYS = 366
+PLAN_CACHE_TIMEOUT = 60 * 60
+PRIORITY_RANKS = {"high": 0, "medium": 1, "low": 2}
+NO_DUE_DATE = datetime.min.replace(tzinfo=UTC)
+
+
+def _cache_key(user_id) -> str:
+    return f"users:task_plan:{user_id}"
+
+
+def plan_start(now=None):
+    """``now`` rounded down to the plan step, in the local timezone."""
+    now = timezone.localtime(now)
+    midnight = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    return midnight + (now - midnight) // PLAN_STEP * PLAN_STEP
+
+
+def _edf_key(task):
+    return (
+        task["due_date"] is None,
+        task["due_date"] or NO_DUE_DATE,
+        PRIORITY_RANKS.get(task["priority"], len(PRIORITY_RANKS)),
+        task["created_at"],
+        task["id"],
+    )
+
+
+def _signature(task):
+    return (task["id"], task["title"], task["priority"], task["due_date"], round(task["remaining_hours"], 4))
+
+
+def place(schedule, cursor, hours, horizon):
+    """Fill ``hours`` of work into ``schedule`` from ``cursor``.
+
+    Returns ``(slots, end)``; ``end`` is None when the work does not fit before the ``horizon`` day.
+    """
+    slots = []
+    if hours <= 0:
+        return slots, cursor
+    if not schedule.week_hours:
+        return slots, None
+    day = timezone.localtime(cursor).date()
+    while hours > 0:
+        if day > horizon:
+            return slots, None
+        window = schedule.windows.get(day.weekday())
+        if window:
+            start = max(cursor, timezone.make_aware(datetime.combine(day, window[0])))
+            end = timezone.make_aware(datetime.combine(day, window[1]))
+            if start < end:
+                used = min(hours, (end - start).total_seconds() / 3600)
+                cursor = start + timedelta(hours=used)
+                slots.append((start, cursor))
+                hours -= used
+        day += timedelta(days=1)
+    return slots, cursor
+
+
+def build_plan(tasks, schedule, start, reused=None):
+    """Plan ``tasks`` (EDF-ordered dicts) from ``start``, keeping the ``reused`` prefix ``(entries, cursors)``."""
+    entries, cursors = reused if reused else ([], [])
+    entries, cursors = list(entries), list(cursors)
+    cursor = cursors[-1] if cursors else start
+    horizon = start.date() + timedelta(days=PLAN_HORIZON_DAYS)
+    for task in tasks[len(entries) :]:
+        slots, end = place(schedule, cursor, task["remaining_hours"], horizon) if cursor is not None else ([], None)
+        entries.append(
+            {
+                "id": task["id"],
+                "title": task["title"],
+                "priority": task["priority"],
+                "due_date": task["due_date"],
+                "remaining_hours": round(task["remaining_hours"], 2),
+                "slots": [{"start": slot_start, "end": slot_end} for slot_start, slot_end in slots],
+                "finishes_at": end,
+                "scheduled": end is not None,
+                "missed": task["due_date"] is not None and (end is None or end > task["due_date"]),
+            }
+        )
+        cursors.append(end)
+        cursor = end
+    return entries, cursors
+
+
+def get_task_plans(user_ids, now=None):
+    """Return ``{user_id: {"planned_from", "tasks"}}`` for the open tasks assigned to each of ``user_ids``."""
+    user_ids = list(user_ids)
+    start = plan_start(now)
+
+    tasks = defaultdict(list)
+    for row in (
+        Task.objects.filter(assigned_to_id__in=user_ids, progress__lt=100)
+        .annotate(remaining_hours=REMAINING_HOURS)
+        .values("id", "assigned_to_id", "title", "priority", "due_date", "created_at", "remaining_hours")
+    ):
+        tasks[row["assigned_to_id"]].append(row)
+
+    keys = {_cache_key(user_id): user_id for user_id in user_ids}
+    cached = {keys[key]: plan for key, plan in cache.get_many(keys).items()}
+    hours_versions = dict(zip(user_ids, get_versions([working_hours_scope(u) for u in user_ids]), strict=True))
+
+    # Reuse the unchanged prefix of each cached plan; only users with changes need their working hours
+    pending = {}
+    plans = {}
+    for user_id in user_ids:
+        ordered = sorted(tasks[user_id], key=_edf_key)
+        signatures = [_signature(task) for task in ordered]
+        previous = cached.get(user_id)
+        kept = 0
+        if previous and previous["planned_from"] == start and previous["hours_version"] == hours_versions[user_id]:
+            for old, new in zip(previous["signatures"], signatures, strict=False):
+                if old != new:
+                    break
+                kept += 1
+            if kept == len(signatures) == len(previous["signatures"]):
+                plans[user_id] = previous
+                continue
+        reused = (previous["entries"][:kept], previous["cursors"][:kept]) if kept else None
+        pending[user_id] = (ordered, signatures, reused)
+
+    if pending:
+        windows = defaultdict(dict)
+        for user_id, day, start_time, end_time in WorkingHours.objects.filter(user_id__in=pending).values_list(
+            "user_id", "day_of_week", "start_time", "end_time"
+        ):
+            windows[user_id][day] = (start_time, end_time)
+        for user_id, (ordered, signatures, reused) in pending.items():
+            entries, cursors = build_plan(ordered, WeeklySchedule(windows[user_id]), start, reused)
+            plans[user_id] = {
+                "planned_from": start,
+                "hours_version": hours_versions[user_id],
+                "signatures": signatures,
+                "entries": entries,
+                "cursors": cursors,
+            }
+        cache.set_many({_cache_key(user_id): plans[user_id] for user_id in pending}, PLAN_CACHE_TIMEOUT)
+
+    return {
+        user_id: {"planned_from": plan["planned_from"], "tasks": plan["entries"]} for user_id, plan in plans.items()
+    }
@@ -0,0 +1,65 @@
+"""Batched task edits (progress drags, "mark all done").
+
+A batch is authorized with one query through TaskPolicy, each item is
+validated with TaskSerializer's rules, and the valid ones are written with
+``bulk_update`` (retitled tasks also get their search tokens rebuilt). Items
+are independent: a hidden, missing or invalid task is reported in its own
+outcome and does not stop the others.
+"""
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Task, TaskSearchToken
+from .serializers import TaskSerializer
+from .tasks import TaskPolicy
+from .versions import bump_tasks
+
+MAX_BULK_TASKS = 500
+TASK_BATCH_SIZE = 100
+
+
+@transaction.atomic
+def update_tasks(user, changes):
+    """Apply ``changes`` (a list of ``(task id, fields)``, ids unique) on behalf of ``user``.
+
+    Returns one outcome per item, in order: ``updated`` with the serialized
+    task, or ``not_found``, ``forbidden`` or ``invalid`` with the errors.
+    """
+    tasks = TaskPolicy(user).annotate(Task.objects.select_related("assigned_to", "created_by"))
+    tasks = tasks.in_bulk([task_id for task_id, _ in changes])
+
+    now = timezone.now()
+    outcomes, updated, fields, retitled = [], [], {"updated_at"}, set()
+    for task_id, data in changes:
+        task = tasks.get(task_id)
+        if task is None:
+            outcomes.append({"id": task_id, "status": "not_found"})
+            continue
+        if not task.visible_to_user:
+            outcomes.append({"id": task_id, "status": "forbidden"})
+            continue
+        serializer = TaskSerializer(task, data=data, partial=True)
+        if not serializer.is_valid():
+            outcomes.append({"id": task_id, "status": "invalid", "errors": serializer.errors})
+            continue
+        for field, value in serializer.validated_data.items():
+            setattr(task, field, value)
+            fields.add(field)
+        if Task.SEARCH_SOURCE_FIELDS & serializer.validated_data.keys():
+            retitled.add(task_id)
+        # bulk_update skips auto_now
+        task.updated_at = now
+        updated.append(task)
+        outcomes.append({"id": task_id, "status": "updated"})
+
+    if updated:
+        Task.objects.bulk_update(updated, sorted(fields), batch_size=TASK_BATCH_SIZE)
+        if retitled:
+            TaskSearchToken.objects.reindex(tasks[task_id] for task_id in retitled)
+        users = {u.id: u for task in updated for u in (task.created_by, task.assigned_to)}
+        transaction.on_commit(lambda: bump_tasks(users.values()))
+    for outcome in outcomes:
+        if outcome["status"] == "updated":
+            outcome["task"] = TaskSerializer(tasks[outcome["id"]]).data
+    return outcomes
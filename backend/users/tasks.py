@@ -0,0 +1,121 @@
+"""Task visibility, and filtering and ordering of the paginated task list.
+
+Pages are keyset-paginated newest first on (created_at, id). The per-user
+scopes (assigned to or created by someone) are served by the
+(assigned_to, created_at, id) and (created_by, created_at, id) indexes, the
+admin listing by (created_at, id), and due-date windows by the due_date index.
+
+Search goes through the TaskSearchToken inverted index: each query word is a
+prefix range on its (token, task) index, and tasks are ranked by the summed
+weights of their matching words, then newest first.
+"""
+
+from datetime import timedelta
+
+from django.db import models
+
+from .models import Task, search_tokens
+from .pagination import InvalidPageParameter, parse_date_param
+from .rollups import local_midnight
+
+TASK_ORDERING = ("-created_at", "-id")
+SEARCH_ORDERING = ("-search_rank", "-id")
+MIN_SEARCH_TERM_LENGTH = 2
+MAX_SEARCH_TERMS = 8
+PRIORITIES = {priority for priority, _ in Task.PRIORITY_CHOICES}
+# progress status -> condition on Task.progress
+PROGRESS_STATUSES = {
+    "not_started": models.Q(progress__lte=0),
+    "in_progress": models.Q(progress__gt=0, progress__lt=100),
+    "done": models.Q(progress__gte=100),
+}
+
+
+class TaskPolicy:
+    """Which tasks ``user`` may see, shared by the task list and the task detail views.
+
+    Admins see every task, managers their team's tasks (Task.team is the
+    assignee's team) plus the ones they created, everyone else the tasks
+    assigned to or created by them.
+    """
+
+    def __init__(self, user):
+        self.user = user
+
+    def condition(self):
+        """The visibility rule as a Q object, or None when every task is visible."""
+        user = self.user
+        if user.role == "admin":
+            return None
+        if user.role == "manager" and user.team_id:
+            return models.Q(team_id=user.team_id) | models.Q(created_by_id=user.id)
+        return models.Q(assigned_to_id=user.id) | models.Q(created_by_id=user.id)
+
+    def visible(self, tasks=None):
+        tasks = Task.objects.all() if tasks is None else tasks
+        condition = self.condition()
+        return tasks if condition is None else tasks.filter(condition)
+
+    def annotate(self, tasks=None):
+        """Annotate ``visible_to_user`` instead of filtering, so hidden tasks can be told apart from missing ones."""
+        tasks = Task.objects.all() if tasks is None else tasks
+        condition = self.condition()
+        allowed = (
+            models.Value(True)
+            if condition is None
+            else models.ExpressionWrapper(condition, output_field=models.BooleanField())
+        )
+        return tasks.annotate(visible_to_user=allowed)
+
+    def lookup(self, pk, tasks=None):
+        """Return ``(task, allowed)`` in one primary-key query; ``task`` is None when it does not exist."""
+        task = self.annotate(tasks).filter(pk=pk).first()
+        return task, bool(task and task.visible_to_user)
+
+
+def filter_tasks(tasks, params):
+    """Apply the ``priority`` (comma-separated), ``assigned_to``, ``due_from``/``due_to`` and ``status`` parameters."""
+    if params.get("priority"):
+        priorities = set(params["priority"].split(","))
+        if not priorities <= PRIORITIES:
+            raise InvalidPageParameter(f"priority must be among {', '.join(sorted(PRIORITIES))}.")
+        tasks = tasks.filter(priority__in=priorities)
+
+    if params.get("assigned_to"):
+        try:
+            tasks = tasks.filter(assigned_to_id=int(params["assigned_to"]))
+        except ValueError:
+            raise InvalidPageParameter("assigned_to must be an integer.") from None
+
+    # Local-day bounds as datetimes, so the window stays a range on the due_date index
+    due_from = parse_date_param(params.get("due_from"), "due_from")
+    due_to = parse_date_param(params.get("due_to"), "due_to")
+    if due_from:
+        tasks = tasks.filter(due_date__gte=local_midnight(due_from))
+    if due_to:
+        tasks = tasks.filter(due_date__lt=local_midnight(due_to + timedelta(days=1)))
+
+    if params.get("status"):
+        if params["status"] not in PROGRESS_STATUSES:
+            raise InvalidPageParameter(f"status must be among {', '.join(PROGRESS_STATUSES)}.")
+        tasks = tasks.filter(PROGRESS_STATUSES[params["status"]])
+    return tasks
+
+
+def search_tasks(tasks, query):
+    """Tasks matching any word of ``query``, annotated with ``search_rank``; order with SEARCH_ORDERING.
+
+    Every word matches as a prefix, so the last one can still be being typed.
+    """
+    terms = sorted(term for term in search_tokens(query) if len(term) >= MIN_SEARCH_TERM_LENGTH)
+    if not terms:
+        raise InvalidPageParameter(f"q must contain a word of at least {MIN_SEARCH_TERM_LENGTH} characters.")
+    if len(terms) > MAX_SEARCH_TERMS:
+        raise InvalidPageParameter(f"q may contain at most {MAX_SEARCH_TERMS} words.")
+
+    # Tokens are normalized lowercase: istartswith is a plain LIKE 'term%' on the token index
+    condition = models.Q()
+    for term in terms:
+        condition |= models.Q(search_tokens__token__istartswith=term)
+    # Filtering before annotating sums only the matching tokens of each task
+    return tasks.filter(condition).annotate(search_rank=models.Sum("search_tokens__weight"))
@@ -0,0 +1,63 @@
+"""Set-based moves of users between teams.
+
+A move is one ``UPDATE ... WHERE id IN`` on User and one on the moved users'
+assigned tasks (Task.team follows the assignee), followed by the matching
+membership changes of the team conversations: the moved users leave their old
+teams' conversations and join the new team's one, in one delete and one bulk
+insert on the participants table. Directory and conversation versions are
+bumped once the transaction commits.
+"""
+
+from collections import defaultdict
+
+from django.db import transaction
+
+from .models import Conversation, Task, User
+from .versions import DIRECTORY_SCOPE, bump, bump_conversation
+
+MAX_BULK_ASSIGN = 1000
+
+
+@transaction.atomic
+def assign_users_to_team(current_teams, team_id):
+    """Move users to ``team_id`` (``None`` to unassign them); ``current_teams`` maps user id -> current team id.
+
+    Returns the number of users whose team changed.
+    """
+    moving = [user_id for user_id, old_team_id in current_teams.items() if old_team_id != team_id]
+    if not moving:
+        return 0
+
+    User.objects.filter(id__in=moving).update(team_id=team_id)
+    Task.objects.filter(assigned_to_id__in=moving).update(team_id=team_id)
+
+    old_team_ids = {current_teams[user_id] for user_id in moving} - {None}
+    team_conversations = Conversation.objects.filter(team_id__in=old_team_ids | {team_id}, is_direct=False).values_list(
+        "id", "team_id"
+    )
+    leaving, joining = [], []
+    for conversation_id, conversation_team_id in team_conversations:
+        (joining if conversation_team_id == team_id else leaving).append(conversation_id)
+
+    Participant = Conversation.participants.through
+    if leaving:
+        Participant.objects.filter(conversation_id__in=leaving, user_id__in=moving).delete()
+    if joining:
+        Participant.objects.bulk_create(
+            [Participant(conversation_id=c, user_id=u) for c in joining for u in moving], ignore_conflicts=True
+        )
+
+    participants = defaultdict(set)
+    for conversation_id, user_id in Participant.objects.filter(conversation_id__in=leaving + joining).values_list(
+        "conversation_id", "user_id"
+    ):
+        participants[conversation_id].add(user_id)
+
+    def bump_versions():
+        bump(DIRECTORY_SCOPE)
+        for conversation_id in leaving + joining:
+            # Users who left no longer see the conversation, so their lists change too
+            bump_conversation(conversation_id, participants[conversation_id] | set(moving))
+
+    transaction.on_commit(bump_versions)
+    return len(moving)
@@ -0,0 +1,79 @@
+"""Cached per-team snapshots for the team member listings.
+
+A snapshot holds a team's members in directory order with their presence
+(open session and today's status). It is built in a fixed number of queries:
+one for the members (joined to the team) plus at most one per presence table
+on presence cache misses. Snapshots are cached under the current versions of
+the directory and of the team's presence scope, so membership, clock and
+status writes, which bump those versions, retire them without any explicit
+invalidation. Only real teams get snapshots: the unassigned users are an
+unbounded set, paged from the database instead.
+"""
+
+from django.core.cache import cache
+from django.utils import timezone
+
+from .directory import DIRECTORY_ORDERING
+from .models import Team, User
+from .presence import get_presence
+from .versions import DIRECTORY_SCOPE, get_versions, presence_scope
+
+SNAPSHOT_CACHE_TIMEOUT = 12 * 60 * 60
+SEARCH_COLUMNS = ("search_last_name", "search_full_name", "search_email")
+
+
+def _cache_key(team_id, versions) -> str:
+    return f"users:team_snapshot:{team_id}:{timezone.localdate().isoformat()}:{':'.join(map(str, versions))}"
+
+
+def _build_snapshot(team_id):
+    users = list(
+        User.objects.filter(team_id=team_id)
+        .select_related("team")
+        .order_by(*DIRECTORY_ORDERING)
+        .only("id", "first_name", "last_name", "email", "role", "team__name", *SEARCH_COLUMNS)
+    )
+    if users:
+        team_name = users[0].team.name
+    else:
+        team_name = Team.objects.filter(id=team_id).values_list("name", flat=True).first()
+
+    presence = get_presence(u.id for u in users)
+    members = [
+        {
+            "id": u.id,
+            "full_name": u.full_name,
+            "email": u.email,
+            "role": u.role,
+            "team_id": team_id,
+            "is_clocked_in": presence[u.id]["open_clock_in"] is not None,
+            **presence[u.id],
+            **{name: getattr(u, name) for name in SEARCH_COLUMNS},
+        }
+        for u in users
+    ]
+    return {
+        "team_id": team_id,
+        "team_name": team_name,
+        "manager_ids": sorted(m["id"] for m in members if m["role"] == "manager"),
+        "members": members,
+    }
+
+
+def get_team_snapshot(team_id):
+    """Return ``{"team_id", "team_name", "manager_ids", "members"}`` for the team ``team_id``.
+
+    ``members`` are dicts in directory order; besides the public member fields they carry ``team_id`` and the
+    search columns, which ``member_info`` drops.
+    """
+    key = _cache_key(team_id, get_versions([DIRECTORY_SCOPE, presence_scope(team_id)]))
+    snapshot = cache.get(key)
+    if snapshot is None:
+        snapshot = _build_snapshot(team_id)
+        cache.set(key, snapshot, SNAPSHOT_CACHE_TIMEOUT)
+    return snapshot
+
+
+def member_info(member):
+    """Public projection of a snapshot member, as listed by MyTeamView."""
+    return {name: value for name, value in member.items() if name not in SEARCH_COLUMNS and name != "team_id"}
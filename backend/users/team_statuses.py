@@ -0,0 +1,47 @@
+"""Bulk marking of TeamStatus over date ranges (team PTO, public holidays).
+
+Statuses stay one row per (user, date): the lateness worker, the absence
+sweep and the presence cache all upsert or look up that unique pair, and
+"status on date D" is a point lookup on its index. A range is written as
+one ``INSERT ... ON CONFLICT DO UPDATE`` per batch of rows.
+"""
+
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import TeamStatus
+from .presence import forget_presence
+from .rollups import sync_late_flags
+
+MAX_STATUS_DAYS = 366
+MAX_STATUS_ROWS = 50_000
+STATUS_BATCH_SIZE = 1000
+
+
+def date_span(date_from, date_to):
+    return [date_from + timedelta(days=offset) for offset in range((date_to - date_from).days + 1)]
+
+
+@transaction.atomic
+def mark_status_range(user_ids, date_from, date_to, status, note=""):
+    """Set ``status`` for every user in ``user_ids`` on every day from ``date_from`` to ``date_to`` inclusive.
+
+    Existing statuses on those days are overwritten. Returns the number of rows written.
+    """
+    user_ids = set(user_ids)
+    days = date_span(date_from, date_to)
+    rows = [TeamStatus(user_id=user_id, date=day, status=status, note=note) for user_id in user_ids for day in days]
+    TeamStatus.objects.bulk_create(
+        rows,
+        batch_size=STATUS_BATCH_SIZE,
+        update_conflicts=True,
+        unique_fields=["user", "date"],
+        update_fields=["status", "note", "updated_at"],
+    )
+    sync_late_flags(user_ids, days)
+    # Listings only show today's status
+    if date_from <= timezone.localdate() <= date_to:
+        transaction.on_commit(lambda: forget_presence(user_ids))
+    return len(rows)
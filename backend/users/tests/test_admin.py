@@ -44,16 +44,14 @@ class TestAdmin:
         url = reverse("user-list")
         response = api_client.get(url)
         assert response.status_code == status.HTTP_200_OK
-        assert len(response.data) >= 2  # At least admin and regular user
+        assert len(response.data["results"]) >= 2  # At least admin and regular user
 
     def test_user_cannot_list_all_users(self, api_client, regular_user):
-        """GET /api/users/ - Regular user might not have permission"""
-        # Note: This depends on your permission settings
-        # If UserListCreateView has no permission_classes, this will pass
-        # Adjust based on your actual implementation
+        """GET /api/users/ - The user directory is admin-only"""
         api_client.force_authenticate(user=regular_user)
         url = reverse("user-list")
         response = api_client.get(url)
-        # This test assumes the endpoint is accessible to all authenticated users
-        # If you want to restrict it, add IsAdmin permission to UserListCreateView
-        assert response.status_code in [status.HTTP_200_OK, status.HTTP_403_FORBIDDEN]
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+        api_client.force_authenticate(user=None)
+        assert api_client.get(url).status_code == status.HTTP_401_UNAUTHORIZED
@@ -1,10 +1,18 @@
+import threading
+import time
+from datetime import UTC, date, datetime, timedelta
+
 import pytest
 from django.contrib.auth import get_user_model
+from django.db import IntegrityError, OperationalError, connection, transaction
 from django.urls import reverse
+from django.utils import timezone
 from rest_framework import status
 from rest_framework.test import APIClient
 
-from users.models import TimeEntry
+from users.clock_events import drain_clock_events
+from users.exports import export_queryset
+from users.models import ClockEvent, TeamStatus, TimeEntry, WorkingHours
 
 User = get_user_model()
 
@@ -70,4 +78,141 @@ class TestClock:
         url = reverse("time-entries")
         response = api_client.get(url)
         assert response.status_code == status.HTTP_200_OK
-        assert len(response.data) >= 1
+        assert len(response.data["results"]) >= 1
+        assert response.data["next_cursor"] is None
+
+    def test_time_entries_keyset_pages(self, api_client, user):
+        api_client.force_authenticate(user=user)
+        start = timezone.now() - timedelta(days=10)
+        # Two entries share a clock_in so the id tie-breaker is exercised
+        clock_ins = [start, start, start + timedelta(days=1), start + timedelta(days=2), start + timedelta(days=3)]
+        created = [TimeEntry.objects.create(user=user, clock_in=c, clock_out=c + timedelta(hours=1)) for c in clock_ins]
+
+        url = reverse("time-entries")
+        seen = []
+        cursor = None
+        while True:
+            params = {"limit": 2}
+            if cursor:
+                params["cursor"] = cursor
+            response = api_client.get(url, params)
+            assert response.status_code == status.HTTP_200_OK
+            assert len(response.data["results"]) <= 2
+            seen.extend(e["id"] for e in response.data["results"])
+            cursor = response.data["next_cursor"]
+            if not cursor:
+                break
+
+        expected = sorted(created, key=lambda e: (e.clock_in, e.id), reverse=True)
+        assert seen == [e.id for e in expected]
+
+    def test_time_entries_date_filters(self, api_client, user):
+        api_client.force_authenticate(user=user)
+        day = timezone.make_aware(datetime(2024, 3, 4, 10, 0))
+        for offset in range(3):
+            clock_in = day + timedelta(days=offset)
+            TimeEntry.objects.create(user=user, clock_in=clock_in, clock_out=clock_in + timedelta(hours=1))
+
+        response = api_client.get(reverse("time-entries"), {"from": "2024-03-05", "to": "2024-03-05"})
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data["results"]) == 1
+
+        response = api_client.get(reverse("time-entries"), {"from": "not-a-date"})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_time_entries_invalid_cursor(self, api_client, user):
+        api_client.force_authenticate(user=user)
+        response = api_client.get(reverse("time-entries"), {"cursor": "garbage"})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_database_rejects_second_open_session(self, user):
+        TimeEntry.objects.create(user=user)
+        with pytest.raises(IntegrityError), transaction.atomic():
+            TimeEntry.objects.create(user=user)
+
+    def test_clock_out_then_in_again(self, api_client, user):
+        api_client.force_authenticate(user=user)
+        for _ in range(2):
+            assert api_client.post(reverse("clock-in")).status_code == status.HTTP_200_OK
+            assert api_client.post(reverse("clock-out")).status_code == status.HTTP_200_OK
+        assert TimeEntry.objects.filter(user=user, is_open=True).count() == 0
+        assert TimeEntry.objects.filter(user=user).count() == 2
+
+    def test_work_date_is_local_day_of_clock_in(self, user):
+        # 23:30 UTC is already the next day in Paris
+        entry = TimeEntry.objects.create(user=user, clock_in=datetime(2024, 3, 4, 23, 30, tzinfo=UTC))
+        assert entry.work_date == date(2024, 3, 5)
+
+        entry.clock_in = datetime(2024, 3, 6, 8, 0, tzinfo=UTC)
+        entry.save(update_fields=["clock_in"])
+        entry.refresh_from_db()
+        assert entry.work_date == date(2024, 3, 6)
+
+    def test_date_filters_use_work_date_indexes(self, user):
+        day_range = {"work_date__gte": date(2024, 3, 1), "work_date__lte": date(2024, 3, 31)}
+        plan = TimeEntry.objects.filter(user=user, **day_range).explain()
+        assert "timeentry_user_work_date_idx" in plan
+        plan = export_queryset(date_from=date(2024, 3, 1), date_to=date(2024, 3, 31)).explain()
+        assert "timeentry_work_date_idx" in plan
+
+    def test_late_clock_in_is_evaluated_off_request(self, api_client, user, django_assert_max_num_queries):
+        # Midnight starts make any clock-in late, whatever day the test runs
+        for day in range(7):
+            WorkingHours.objects.create(user=user, day_of_week=day, start_time="00:00", end_time="23:59")
+
+        api_client.force_authenticate(user=user)
+        # Savepoint + entry insert + event insert + release; no schedule or status query
+        with django_assert_max_num_queries(4):
+            response = api_client.post(reverse("clock-in"))
+        assert response.status_code == status.HTTP_200_OK
+        assert ClockEvent.objects.filter(user=user).count() == 1
+        assert not TeamStatus.objects.filter(user=user).exists()
+
+        drain_clock_events()
+        late = TeamStatus.objects.get(user=user, date=timezone.localdate())
+        assert late.status == "late"
+        assert late.note == "Late arrival (Expected: 00:00)"
+        assert not ClockEvent.objects.exists()
+
+    def test_clock_in_without_schedule_is_not_late(self, api_client, user):
+        api_client.force_authenticate(user=user)
+        api_client.post(reverse("clock-in"))
+        drain_clock_events()
+        assert not TeamStatus.objects.filter(user=user).exists()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_concurrent_clock_ins_open_a_single_session(user):
+    """Simultaneous clock-ins race on the unique (user, is_open) index: exactly one wins."""
+    attempts = 8
+    barrier = threading.Barrier(attempts)
+    codes = []
+
+    def clock_in():
+        client = APIClient()
+        client.force_authenticate(user=user)
+        barrier.wait()
+        try:
+            for _ in range(50):
+                try:
+                    codes.append(client.post(reverse("clock-in")).status_code)
+                    break
+                except OperationalError:
+                    # SQLite's shared in-memory test database reports "table is locked"
+                    # instead of waiting; retry like a client would.
+                    time.sleep(0.01)
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=clock_in) for _ in range(attempts)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert TimeEntry.objects.filter(user=user, clock_out__isnull=True).count() == 1
+    assert len(codes) == attempts
+    assert set(codes) <= {status.HTTP_200_OK, status.HTTP_400_BAD_REQUEST}
+    # Normally exactly one 200. On SQLite a COMMIT can itself fail with "table is locked"
+    # after the row was written, in which case the retry sees the session and gets a 400.
+    assert codes.count(status.HTTP_200_OK) <= 1
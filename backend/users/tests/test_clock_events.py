@@ -0,0 +1,107 @@
+from datetime import date, datetime, time, timedelta
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.utils import timezone
+
+from users.clock_events import drain_clock_events, enqueue_clock_ins, process_clock_events, sweep_absent
+from users.models import ClockEvent, TeamStatus, TimeEntry, WorkingHours
+
+User = get_user_model()
+
+MONDAY = date(2024, 3, 4)
+
+
+def make_users(count):
+    return [
+        User.objects.create_user(
+            email=f"scheduled{i}@example.com",
+            password="password",
+            first_name="Scheduled",
+            last_name=f"User{i}",
+            phone_number=f"+33600000{i:03d}",
+        )
+        for i in range(count)
+    ]
+
+
+def at(day, hour, minute=0):
+    return timezone.make_aware(datetime.combine(day, time(hour, minute)))
+
+
+def clock_in(user, when, hours=4):
+    TimeEntry.objects.create(user=user, clock_in=when, clock_out=when + timedelta(hours=hours))
+    enqueue_clock_ins([(user.id, when)])
+
+
+@pytest.mark.django_db
+class TestClockEventProcessing:
+    def test_batches_mark_late_arrivals(self, django_assert_max_num_queries):
+        users = make_users(6)
+        for user in users:
+            WorkingHours.objects.create(user=user, day_of_week=0, start_time=time(9), end_time=time(17))
+        for i, user in enumerate(users):
+            clock_in(user, at(MONDAY, 8 + i % 2, 30))  # even users on time, odd users late
+
+        # Claim, first clock-ins, schedules, status upsert, rollup late flags, delete, plus savepoint bookkeeping
+        with django_assert_max_num_queries(8):
+            assert process_clock_events(batch_size=4) == 4
+        assert drain_clock_events(batch_size=4) == 2
+
+        late = set(TeamStatus.objects.filter(date=MONDAY, status="late").values_list("user_id", flat=True))
+        assert late == {u.id for i, u in enumerate(users) if i % 2}
+        assert not ClockEvent.objects.exists()
+
+    def test_lateness_uses_first_clock_in_of_the_day(self):
+        (user,) = make_users(1)
+        WorkingHours.objects.create(user=user, day_of_week=0, start_time=time(9), end_time=time(17))
+        clock_in(user, at(MONDAY, 8, 45), hours=3)
+        clock_in(user, at(MONDAY, 13))  # back from lunch
+
+        drain_clock_events()
+        assert not TeamStatus.objects.filter(user=user).exists()
+
+    def test_sweep_marks_scheduled_users_without_sessions(self):
+        present, absent, on_pto, unscheduled, inactive = make_users(5)
+        for user in (present, absent, on_pto, inactive):
+            WorkingHours.objects.create(user=user, day_of_week=0, start_time=time(9), end_time=time(17))
+        inactive.is_active = False
+        inactive.save()
+        clock_in(present, at(MONDAY, 9))
+        TeamStatus.objects.create(user=on_pto, date=MONDAY, status="pto")
+
+        assert sweep_absent(MONDAY) == 1
+        assert TeamStatus.objects.get(user=absent, date=MONDAY).status == "absent"
+        assert TeamStatus.objects.get(user=on_pto, date=MONDAY).status == "pto"
+        assert not TeamStatus.objects.filter(user__in=[present, unscheduled, inactive]).exists()
+        # Running the sweep again is a no-op
+        assert sweep_absent(MONDAY) == 0
+
+    def test_overnight_session_counts_as_present(self):
+        (user,) = make_users(1)
+        WorkingHours.objects.create(user=user, day_of_week=0, start_time=time(0), end_time=time(6))
+        clock_in(user, at(MONDAY - timedelta(days=1), 22), hours=8)
+
+        assert sweep_absent(MONDAY) == 0
+
+    def test_command_drains_queue_and_sweeps(self):
+        late_user, absent_user = make_users(2)
+        for user in (late_user, absent_user):
+            WorkingHours.objects.create(user=user, day_of_week=0, start_time=time(9), end_time=time(17))
+        clock_in(late_user, at(MONDAY, 10))
+
+        call_command("process_clock_events", "--sweep-absent", "--date", MONDAY.isoformat())
+
+        assert TeamStatus.objects.get(user=late_user, date=MONDAY).status == "late"
+        assert TeamStatus.objects.get(user=absent_user, date=MONDAY).status == "absent"
+        assert not ClockEvent.objects.exists()
+
+    def test_command_requires_a_shared_cache(self, settings):
+        settings.ALLOW_PROCESS_LOCAL_CACHE = False
+        with pytest.raises(CommandError, match="shared cache"):
+            call_command("process_clock_events")
+        with pytest.raises(CommandError, match="shared cache"):
+            call_command("close_stale_sessions")
+        # Dry runs write nothing, so they have nothing to invalidate
+        call_command("close_stale_sessions", "--dry-run")
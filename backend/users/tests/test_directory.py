@@ -0,0 +1,121 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from users.models import Team
+
+User = get_user_model()
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture
+def admin_user():
+    return User.objects.create_user(
+        email="directory-admin@example.com",
+        password="password",
+        first_name="Ada",
+        last_name="Zed",
+        phone_number="+1234567850",
+        role="admin",
+    )
+
+
+def make_user(first_name, last_name, index, **extra):
+    return User.objects.create_user(
+        email=f"{first_name.lower()}.{index}@example.com",
+        password="password",
+        first_name=first_name,
+        last_name=last_name,
+        phone_number=f"+33622000{index:03d}",
+        **extra,
+    )
+
+
+def walk(client, url, params):
+    """Follow next_cursor through every page; returns the ids in order."""
+    ids, cursor = [], None
+    while True:
+        response = client.get(url, {**params, **({"cursor": cursor} if cursor else {})})
+        assert response.status_code == status.HTTP_200_OK
+        ids += [row["id"] for row in response.data["results"]]
+        cursor = response.data["next_cursor"]
+        if not cursor:
+            return ids
+
+
+@pytest.mark.django_db
+class TestMemberDirectory:
+    def test_search_fields_are_normalized(self):
+        user = make_user("Élodie", "Dupré", 1)
+        assert (user.search_full_name, user.search_last_name) == ("elodie dupre", "dupre")
+
+        user.last_name = "Martin"
+        user.save(update_fields=["last_name"])
+        user.refresh_from_db()
+        assert user.search_last_name == "martin"
+
+    def test_pages_are_ordered_by_last_name(self, api_client, admin_user):
+        users = [make_user("Sam", last, i) for i, last in enumerate(["Brown", "adams", "Clark", "Adams", "Baker"])]
+        api_client.force_authenticate(user=admin_user)
+
+        ids = walk(api_client, reverse("team-members"), {"limit": 2})
+        expected = sorted([*users, admin_user], key=lambda u: (u.search_last_name, u.search_full_name, u.id))
+        assert ids == [u.id for u in expected]
+
+    def test_prefix_search_and_filters(self, api_client, admin_user):
+        team = Team.objects.create(name="Directory Team")
+        elodie = make_user("Élodie", "Dupré", 1, team=team)
+        make_user("Marc", "Elo", 2, role="manager")
+        paul = make_user("Paul", "Durand", 3)
+        api_client.force_authenticate(user=admin_user)
+        url = reverse("team-members")
+
+        assert len(walk(api_client, url, {"q": "ELO"})) == 2  # first name and last name prefixes
+        assert walk(api_client, url, {"q": "paul.3@"}) == [paul.id]  # email prefix
+        assert walk(api_client, url, {"q": "elodie d"}) == [elodie.id]
+        assert walk(api_client, url, {"q": "elo", "team_id": team.id}) == [elodie.id]
+        assert len(walk(api_client, url, {"q": "elo", "team_id": "none"})) == 1
+        assert len(walk(api_client, url, {"role": "manager,admin"})) == 2
+        assert api_client.get(url, {"role": "boss"}).status_code == status.HTTP_400_BAD_REQUEST
+        assert api_client.get(url, {"team_id": "x"}).status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_manager_only_sees_team_and_unassigned(self, api_client):
+        team, other = Team.objects.create(name="Mine"), Team.objects.create(name="Other")
+        manager = make_user("Mia", "Manager", 1, role="manager", team=team)
+        teammate = make_user("Tom", "Mate", 2, team=team)
+        recruit = make_user("Rita", "Recruit", 3)
+        make_user("Otto", "Other", 4, team=other)
+        api_client.force_authenticate(user=manager)
+
+        assert set(walk(api_client, reverse("team-members"), {})) == {manager.id, teammate.id, recruit.id}
+        assert walk(api_client, reverse("team-members"), {"team_id": other.id}) == []
+
+    def test_manager_pages_merge_team_and_unassigned(self, api_client):
+        team = Team.objects.create(name="Mine")
+        manager = make_user("Mia", "Brown", 1, role="manager", team=team)
+        teammates = [make_user("Tom", last, 2 + i, team=team) for i, last in enumerate(["Adams", "Clark"])]
+        recruits = [make_user("Rita", last, 4 + i) for i, last in enumerate(["Baker", "Dunn", "Evans"])]
+        api_client.force_authenticate(user=manager)
+
+        expected = sorted([manager, *teammates, *recruits], key=lambda u: (u.search_last_name, u.search_full_name))
+        for limit in (1, 2, 3, 10):
+            assert walk(api_client, reverse("team-members"), {"limit": limit}) == [u.id for u in expected]
+        page = api_client.get(reverse("team-members"), {"limit": 2}).data["results"]
+        assert [(row["id"], row["team_name"]) for row in page] == [(teammates[0].id, "Mine"), (recruits[0].id, None)]
+        assert "search_last_name" not in page[0]
+
+    def test_admin_user_list_is_paginated(self, api_client, admin_user):
+        for i in range(3):
+            make_user("Page", f"User{i}", i)
+        api_client.force_authenticate(user=admin_user)
+
+        response = api_client.get(reverse("user-list"), {"limit": 2, "q": "page"})
+        assert len(response.data["results"]) == 2
+        assert "password" not in response.data["results"][0]
+        assert len(walk(api_client, reverse("user-list"), {"limit": 2, "q": "page"})) == 3
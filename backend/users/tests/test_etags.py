@@ -0,0 +1,187 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from users.models import Conversation, Team
+
+User = get_user_model()
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture
+def team():
+    return Team.objects.create(name="Etag Team")
+
+
+@pytest.fixture
+def manager(team):
+    return User.objects.create_user(
+        email="etag-manager@example.com",
+        password="password",
+        first_name="Etag",
+        last_name="Manager",
+        phone_number="+1234567850",
+        role="manager",
+        team=team,
+    )
+
+
+@pytest.fixture
+def member(team):
+    return User.objects.create_user(
+        email="etag-member@example.com",
+        password="password",
+        first_name="Etag",
+        last_name="Member",
+        phone_number="+1234567851",
+        role="user",
+        team=team,
+    )
+
+
+@pytest.fixture
+def outsider():
+    return User.objects.create_user(
+        email="etag-outsider@example.com",
+        password="password",
+        first_name="Etag",
+        last_name="Outsider",
+        phone_number="+1234567852",
+        role="user",
+    )
+
+
+def client_for(user):
+    client = APIClient()
+    client.force_authenticate(user=user)
+    return client
+
+
+def revalidate(client, url, etag, **params):
+    return client.get(url, params, HTTP_IF_NONE_MATCH=etag)
+
+
+@pytest.mark.django_db
+class TestConditionalGet:
+    def test_unchanged_team_members_answer_304_without_queries(self, manager, member):
+        client = client_for(manager)
+        url = reverse("team-members")
+        response = client.get(url)
+        assert response.status_code == status.HTTP_200_OK
+        etag = response["ETag"]
+        assert etag.startswith('W/"')
+        assert "no-cache" in response["Cache-Control"]
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = revalidate(client, url, etag)
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response["ETag"] == etag
+        assert not ctx.captured_queries
+
+        # Another page or filter is another representation
+        assert revalidate(client, url, etag, q="etag").status_code == status.HTTP_200_OK
+
+    def test_clock_in_changes_team_etags(self, manager, member, django_capture_on_commit_callbacks):
+        client = client_for(manager)
+        members_etag = client.get(reverse("team-members"))["ETag"]
+        my_team_etag = client.get(reverse("my-team"))["ETag"]
+
+        with django_capture_on_commit_callbacks(execute=True):
+            assert client_for(member).post(reverse("clock-in")).status_code == status.HTTP_200_OK
+
+        response = revalidate(client, reverse("team-members"), members_etag)
+        assert response.status_code == status.HTTP_200_OK
+        assert response["ETag"] != members_etag
+        assert revalidate(client, reverse("my-team"), my_team_etag).status_code == status.HTTP_200_OK
+
+    def test_other_team_activity_keeps_etag(self, manager, member, outsider, django_capture_on_commit_callbacks):
+        other = Team.objects.create(name="Other Team")
+        outsider.team = other
+        outsider.save()
+        client = client_for(manager)
+        etag = client.get(reverse("my-team"))["ETag"]
+
+        with django_capture_on_commit_callbacks(execute=True):
+            client_for(outsider).post(reverse("clock-in"))
+
+        assert revalidate(client, reverse("my-team"), etag).status_code == status.HTTP_304_NOT_MODIFIED
+
+    def test_task_writes_only_change_affected_lists(
+        self, manager, member, outsider, django_capture_on_commit_callbacks
+    ):
+        url = reverse("task-list-create")
+        member_client, outsider_client = client_for(member), client_for(outsider)
+        member_etag = member_client.get(url)["ETag"]
+        outsider_etag = outsider_client.get(url)["ETag"]
+
+        with django_capture_on_commit_callbacks(execute=True):
+            response = client_for(manager).post(url, {"title": "Write report", "assigned_to": member.id}, format="json")
+        assert response.status_code == status.HTTP_201_CREATED
+
+        response = revalidate(member_client, url, member_etag)
+        assert response.status_code == status.HTTP_200_OK
+        assert [t["title"] for t in response.data["results"]] == ["Write report"]
+        assert revalidate(outsider_client, url, outsider_etag).status_code == status.HTTP_304_NOT_MODIFIED
+
+    def test_new_message_changes_participants_conversation_lists(
+        self, member, outsider, django_capture_on_commit_callbacks
+    ):
+        conversation = Conversation.objects.create(name="Chat", is_direct=True)
+        conversation.participants.add(member, outsider)
+        url = reverse("conversation-list")
+        outsider_client = client_for(outsider)
+        etag = outsider_client.get(url)["ETag"]
+        assert revalidate(outsider_client, url, etag).status_code == status.HTTP_304_NOT_MODIFIED
+
+        with django_capture_on_commit_callbacks(execute=True):
+            response = client_for(member).post(
+                reverse("conversation-messages", args=[conversation.id]), {"content": "Hello"}, format="json"
+            )
+        assert response.status_code == status.HTTP_201_CREATED
+
+        response = revalidate(outsider_client, url, etag)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data[0]["last_message"]["content"] == "Hello"
+
+    def test_working_hours_put_changes_etag(self, manager, member, django_capture_on_commit_callbacks):
+        client = client_for(manager)
+        url = reverse("working-hours", args=[member.id])
+        etag = client.get(url)["ETag"]
+        assert revalidate(client, url, etag).status_code == status.HTTP_304_NOT_MODIFIED
+
+        schedules = [{"day_of_week": 0, "start_time": "09:00", "end_time": "17:00"}]
+        with django_capture_on_commit_callbacks(execute=True):
+            client.put(url, {"schedules": schedules}, format="json")
+
+        response = revalidate(client, url, etag)
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data) == 1
+
+    def test_profile_change_changes_directory_etags(self, manager, member, django_capture_on_commit_callbacks):
+        client = client_for(manager)
+        etag = client.get(reverse("team-members"))["ETag"]
+
+        with django_capture_on_commit_callbacks(execute=True):
+            client_for(member).put(reverse("update"), {"first_name": "Renamed"}, format="json")
+
+        assert revalidate(client, reverse("team-members"), etag).status_code == status.HTTP_200_OK
+
+    def test_cleared_cache_does_not_revalidate_old_etags(self, manager, member):
+        client = client_for(manager)
+        etag = client.get(reverse("my-team"))["ETag"]
+        cache.clear()
+        assert revalidate(client, reverse("my-team"), etag).status_code == status.HTTP_200_OK
+
+    def test_errors_carry_no_etag(self, manager):
+        response = client_for(manager).get(reverse("team-members"), {"cursor": "garbage"})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "ETag" not in response
@@ -0,0 +1,126 @@
+import csv
+import io
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from users.exports import export_queryset, iter_export_rows
+from users.models import Team, TimeEntry
+
+User = get_user_model()
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture
+def team():
+    return Team.objects.create(name="Payroll Team")
+
+
+@pytest.fixture
+def manager(team):
+    return User.objects.create_user(
+        email="payrollmanager@example.com",
+        password="password",
+        first_name="Payroll",
+        last_name="Manager",
+        phone_number="+1234567820",
+        role="manager",
+        team=team,
+    )
+
+
+@pytest.fixture
+def worker(team):
+    return User.objects.create_user(
+        email="payrollworker@example.com",
+        password="password",
+        first_name="Payroll",
+        last_name="Worker",
+        phone_number="+1234567821",
+        team=team,
+    )
+
+
+@pytest.fixture
+def outsider():
+    return User.objects.create_user(
+        email="outsider@example.com",
+        password="password",
+        first_name="Out",
+        last_name="Sider",
+        phone_number="+1234567822",
+    )
+
+
+def make_entries(user, count, start):
+    for i in range(count):
+        entry = TimeEntry(user=user, clock_in=start + timedelta(days=i), clock_out=start + timedelta(days=i, hours=8))
+        entry.compute_total_hours()
+        entry.save()
+
+
+def read_stream(response):
+    return b"".join(response.streaming_content).decode()
+
+
+@pytest.mark.django_db
+class TestTimeEntryExport:
+    def test_manager_exports_own_team_csv(self, api_client, manager, worker, outsider):
+        start = timezone.make_aware(datetime(2024, 3, 4, 9, 0))
+        make_entries(worker, 3, start)
+        make_entries(outsider, 2, start)
+
+        api_client.force_authenticate(user=manager)
+        response = api_client.get(reverse("time-entries-export"))
+        assert response.status_code == status.HTTP_200_OK
+        assert response["Content-Type"] == "text/csv"
+
+        rows = list(csv.DictReader(io.StringIO(read_stream(response))))
+        assert len(rows) == 3
+        assert {r["email"] for r in rows} == {worker.email}
+        assert rows[0]["total_hours"] == "8.0"
+
+    def test_manager_cannot_export_other_team(self, api_client, manager):
+        other = Team.objects.create(name="Other")
+        api_client.force_authenticate(user=manager)
+        response = api_client.get(reverse("time-entries-export"), {"team_id": other.id})
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_ndjson_with_date_range(self, api_client, manager, worker):
+        start = timezone.make_aware(datetime(2024, 3, 4, 9, 0))
+        make_entries(worker, 5, start)
+
+        api_client.force_authenticate(user=manager)
+        response = api_client.get(
+            reverse("time-entries-export"), {"file_format": "ndjson", "from": "2024-03-05", "to": "2024-03-06"}
+        )
+        records = [json.loads(line) for line in read_stream(response).splitlines()]
+        assert [r["clock_in"][:10] for r in records] == ["2024-03-05", "2024-03-06"]
+
+    def test_rows_are_fetched_in_bounded_batches(self, worker, django_assert_num_queries):
+        start = timezone.make_aware(datetime(2024, 3, 4, 9, 0))
+        make_entries(worker, 7, start)
+
+        with django_assert_num_queries(3):
+            rows = list(iter_export_rows(export_queryset(user_id=worker.id), chunk_size=3))
+        assert [r[0] for r in rows] == sorted(r[0] for r in rows)
+        assert len(rows) == 7
+
+    def test_export_command(self, worker, tmp_path):
+        start = timezone.make_aware(datetime(2024, 3, 4, 9, 0))
+        make_entries(worker, 2, start)
+
+        output = tmp_path / "export.csv"
+        call_command("export_time_entries", "--user", str(worker.id), "--output", str(output))
+        assert len(output.read_text().splitlines()) == 3
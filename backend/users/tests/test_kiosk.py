@@ -0,0 +1,151 @@
+from datetime import datetime, time, timedelta
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from users.clock_events import drain_clock_events
+from users.models import ClockEvent, PunchEvent, TeamStatus, TimeEntry, WorkingHours
+
+User = get_user_model()
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture
+def kiosk_admin():
+    return User.objects.create_user(
+        email="kiosk@example.com",
+        password="password",
+        first_name="Kiosk",
+        last_name="Device",
+        phone_number="+1234567830",
+        role="admin",
+    )
+
+
+def make_workers(count):
+    return [
+        User.objects.create_user(
+            email=f"badge{i}@example.com",
+            password="password",
+            first_name="Badge",
+            last_name=f"Holder{i}",
+            phone_number=f"+33700000{i:03d}",
+        )
+        for i in range(count)
+    ]
+
+
+def day_punches(user, day, key_prefix):
+    start = timezone.make_aware(datetime.combine(day, time(9, 30)))
+    return [
+        {"user_id": user.id, "timestamp": start.isoformat(), "direction": "in", "idempotency_key": f"{key_prefix}-in"},
+        {
+            "user_id": user.id,
+            "timestamp": (start + timedelta(hours=8)).isoformat(),
+            "direction": "out",
+            "idempotency_key": f"{key_prefix}-out",
+        },
+    ]
+
+
+@pytest.mark.django_db
+class TestKioskPunches:
+    def test_replay_pairs_punches_into_entries(self, api_client, kiosk_admin):
+        (worker,) = make_workers(1)
+        monday = datetime(2024, 3, 4).date()
+        WorkingHours.objects.create(user=worker, day_of_week=0, start_time=time(9), end_time=time(17))
+        # Out-of-order replay: the kiosk queue is not guaranteed to be sorted
+        punches = list(reversed(day_punches(worker, monday, "mon") + day_punches(worker, monday.replace(day=5), "tue")))
+
+        api_client.force_authenticate(user=kiosk_admin)
+        response = api_client.post(reverse("kiosk-punches"), {"punches": punches}, format="json")
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["applied"] == 4
+        assert response.data["duplicates"] == 0
+
+        entries = list(TimeEntry.objects.filter(user=worker).order_by("clock_in"))
+        assert [e.total_hours for e in entries] == [8.0, 8.0]
+        assert ClockEvent.objects.filter(user=worker).count() == 2
+
+        drain_clock_events()
+        assert TeamStatus.objects.get(user=worker, date=monday).status == "late"
+
+    def test_replay_is_idempotent(self, api_client, kiosk_admin):
+        (worker,) = make_workers(1)
+        punches = day_punches(worker, datetime(2024, 3, 4).date(), "k1")
+        api_client.force_authenticate(user=kiosk_admin)
+        api_client.post(reverse("kiosk-punches"), {"punches": punches}, format="json")
+
+        response = api_client.post(reverse("kiosk-punches"), {"punches": punches}, format="json")
+        assert response.data["duplicates"] == 2
+        assert response.data["applied"] == 0
+        assert TimeEntry.objects.filter(user=worker).count() == 1
+        assert PunchEvent.objects.count() == 2
+
+    def test_repeats_within_a_replay_are_duplicates(self, api_client, kiosk_admin):
+        (worker,) = make_workers(1)
+        punch_in, punch_out = day_punches(worker, datetime(2024, 3, 4).date(), "k1")
+        late_in = {**punch_in, "timestamp": punch_out["timestamp"]}
+        api_client.force_authenticate(user=kiosk_admin)
+
+        response = api_client.post(reverse("kiosk-punches"), {"punches": [punch_in, late_in, punch_out]}, format="json")
+        assert (response.data["received"], response.data["duplicates"], response.data["applied"]) == (3, 1, 2)
+        # The first occurrence of the key wins
+        assert TimeEntry.objects.get(user=worker).total_hours == 8.0
+
+    def test_unmatched_out_is_ignored_and_invalid_reported(self, api_client, kiosk_admin):
+        (worker,) = make_workers(1)
+        api_client.force_authenticate(user=kiosk_admin)
+        punches = [
+            {
+                "user_id": worker.id,
+                "timestamp": "2024-03-04T12:00:00+01:00",
+                "direction": "out",
+                "idempotency_key": "x",
+            },
+            {"user_id": worker.id, "timestamp": "2024-03-04T12:00:00+01:00", "direction": "sideways"},
+        ]
+        response = api_client.post(reverse("kiosk-punches"), {"punches": punches}, format="json")
+        assert response.data["ignored"] == 1
+        assert response.data["errors"][0]["index"] == 1
+        assert PunchEvent.objects.get().outcome == "ignored"
+
+    def test_replay_racing_a_clock_in_returns_409(self, api_client, kiosk_admin, monkeypatch):
+        (worker,) = make_workers(1)
+        bulk_update = TimeEntry.objects.bulk_update
+
+        def clock_in_then_update(*args, **kwargs):
+            TimeEntry.objects.create(user=worker)
+            return bulk_update(*args, **kwargs)
+
+        monkeypatch.setattr(TimeEntry.objects, "bulk_update", clock_in_then_update)
+        api_client.force_authenticate(user=kiosk_admin)
+        punches = day_punches(worker, datetime(2024, 3, 4).date(), "race")[:1]
+        response = api_client.post(reverse("kiosk-punches"), {"punches": punches}, format="json")
+        assert response.status_code == status.HTTP_409_CONFLICT
+        # Rolled back as a whole, so replaying the same punch applies it
+        assert not PunchEvent.objects.exists()
+        assert not TimeEntry.objects.exists()
+
+    def test_query_count_does_not_grow_with_replay_size(self, api_client, kiosk_admin, django_assert_max_num_queries):
+        workers = make_workers(30)
+        api_client.force_authenticate(user=kiosk_admin)
+        punches = []
+        for offset in range(5):
+            day = datetime(2024, 3, 4 + offset).date()
+            for worker in workers:
+                punches += day_punches(worker, day, f"{worker.id}-{offset}")
+
+        # SQLite splits the bulk inserts at its parameter limit, hence a few extra INSERTs
+        with django_assert_max_num_queries(20):
+            response = api_client.post(reverse("kiosk-punches"), {"punches": punches}, format="json")
+        assert response.data["applied"] == 300
+        assert TimeEntry.objects.count() == 150
@@ -0,0 +1,137 @@
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from users.models import Team, TeamStatus, TimeEntry
+
+User = get_user_model()
+
+PRESENCE_TABLES = ("users_timeentry", "users_teamstatus")
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture
+def team():
+    return Team.objects.create(name="Presence Team")
+
+
+@pytest.fixture
+def manager(team):
+    return User.objects.create_user(
+        email="presence-manager@example.com",
+        password="password",
+        first_name="Presence",
+        last_name="Manager",
+        phone_number="+1234567840",
+        role="manager",
+        team=team,
+    )
+
+
+@pytest.fixture
+def member(team):
+    return User.objects.create_user(
+        email="presence-member@example.com",
+        password="password",
+        first_name="Presence",
+        last_name="Member",
+        phone_number="+1234567841",
+        role="user",
+        team=team,
+    )
+
+
+def presence_queries(client, url):
+    """GET ``url`` and return (response, SQL statements that touched TimeEntry or TeamStatus)."""
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get(url)
+    assert response.status_code == status.HTTP_200_OK
+    return response, [q["sql"] for q in ctx.captured_queries if any(t in q["sql"] for t in PRESENCE_TABLES)]
+
+
+@pytest.mark.django_db
+class TestPresence:
+    def test_team_members_reads_presence_from_cache(self, api_client, manager, member):
+        entry = TimeEntry.objects.create(user=member, clock_in=timezone.now() - timedelta(hours=1))
+        TeamStatus.objects.create(user=member, date=timezone.localdate(), status="late", note="Bus")
+        api_client.force_authenticate(user=manager)
+
+        response, queries = presence_queries(api_client, reverse("team-members"))
+        assert len(queries) == 2  # cold cache: one query per table
+        row = next(r for r in response.data["results"] if r["id"] == member.id)
+        assert row["is_clocked_in"]
+        assert row["open_clock_in"] == entry.clock_in.isoformat()
+        assert (row["today_status"], row["today_status_note"]) == ("late", "Bus")
+
+        response, queries = presence_queries(api_client, reverse("team-members"))
+        assert queries == []
+        assert next(r for r in response.data["results"] if r["id"] == member.id)["is_clocked_in"]
+
+    def test_clock_and_status_events_write_presence(
+        self, api_client, manager, member, django_capture_on_commit_callbacks
+    ):
+        api_client.force_authenticate(user=manager)
+        presence_queries(api_client, reverse("my-team"))  # warm the cache
+
+        member_client = APIClient()
+        member_client.force_authenticate(user=member)
+        with django_capture_on_commit_callbacks(execute=True):
+            member_client.post(reverse("clock-in"))
+            api_client.post(reverse("team-status-set"), {"user_id": member.id, "status": "pto", "note": "Holiday"})
+
+        response, queries = presence_queries(api_client, reverse("my-team"))
+        assert queries == []
+        (row,) = response.data["members"]
+        assert row["is_clocked_in"]
+        assert (row["today_status"], row["today_status_note"]) == ("pto", "Holiday")
+
+        with django_capture_on_commit_callbacks(execute=True):
+            member_client.post(reverse("clock-out"))
+        response, queries = presence_queries(api_client, reverse("my-team"))
+        assert queries == []
+        assert not response.data["members"][0]["is_clocked_in"]
+
+    def test_manager_fix_invalidates_presence(self, api_client, manager, member, django_capture_on_commit_callbacks):
+        api_client.force_authenticate(user=manager)
+        presence_queries(api_client, reverse("team-members"))  # warm the cache: member not clocked in
+
+        with django_capture_on_commit_callbacks(execute=True):
+            response = api_client.post(
+                reverse("team-time-entry-upsert"),
+                {"user_id": member.id, "clock_in": timezone.now().isoformat()},
+                format="json",
+            )
+        assert response.status_code == status.HTTP_200_OK
+
+        response, queries = presence_queries(api_client, reverse("team-members"))
+        assert len(queries) == 2  # the member's entries were dropped and reloaded
+        assert next(r for r in response.data["results"] if r["id"] == member.id)["is_clocked_in"]
+
+    def test_refill_does_not_overwrite_a_concurrent_clock_in(self, member, monkeypatch):
+        from django.core.cache import cache
+
+        from users import presence
+
+        clock_in = timezone.now()
+        add = cache.add
+
+        def clock_in_before_the_refill(*args, **kwargs):
+            # The reader has loaded "not clocked in" when the clock-in commits and records itself
+            monkeypatch.setattr(cache, "add", add)
+            presence.record_clock_in(member, clock_in)
+            return add(*args, **kwargs)
+
+        monkeypatch.setattr(cache, "add", clock_in_before_the_refill)
+        assert presence.get_presence([member.id])[member.id]["open_clock_in"] == clock_in.isoformat()
+        assert presence.get_presence([member.id])[member.id]["open_clock_in"] == clock_in.isoformat()
@@ -0,0 +1,195 @@
+from datetime import date, datetime, time, timedelta
+from io import StringIO
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from users.clock_events import drain_clock_events, enqueue_clock_ins
+from users.models import DailyTimeSummary, Team, TeamStatus, TimeEntry, WorkingHours
+from users.rollups import affected_dates, refresh_daily_summaries
+
+User = get_user_model()
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture
+def admin_user():
+    return User.objects.create_user(
+        email="reportadmin@example.com",
+        password="password",
+        first_name="Report",
+        last_name="Admin",
+        phone_number="+1234567810",
+        role="admin",
+    )
+
+
+def make_users(count, team=None, start=0):
+    return [
+        User.objects.create_user(
+            email=f"reportuser{i}@example.com",
+            password="password",
+            first_name="Report",
+            last_name=f"User{i}",
+            phone_number=f"+33600000{i:03d}",
+            team=team,
+        )
+        for i in range(start, start + count)
+    ]
+
+
+@pytest.mark.django_db
+class TestTeamReports:
+    def test_report_sums_closed_and_live_hours(self, api_client, admin_user):
+        team = Team.objects.create(name="Reports Team", created_by=admin_user)
+        (worker,) = make_users(1, team=team)
+        now = timezone.now()
+        closed = TimeEntry(user=worker, clock_in=now - timedelta(minutes=21), clock_out=now - timedelta(minutes=9))
+        closed.compute_total_hours()
+        closed.save()
+        refresh_daily_summaries({worker.id: affected_dates(closed.clock_in, closed.clock_out)})
+        TimeEntry.objects.create(user=worker, clock_in=now - timedelta(minutes=6))
+        TeamStatus.objects.create(user=worker, date=timezone.localdate(), status="late")
+
+        api_client.force_authenticate(user=admin_user)
+        response = api_client.get(reverse("team-reports"))
+        assert response.status_code == status.HTTP_200_OK
+
+        row = next(r for r in response.data if r["id"] == worker.id)
+        assert row["hours_today"] == pytest.approx(0.3, abs=0.01)
+        assert row["hours_week"] == pytest.approx(0.3, abs=0.01)
+        assert row["lates_month"] == 1
+        assert row["team_name"] == "Reports Team"
+
+    def test_report_query_count_is_constant(self, api_client, admin_user, django_assert_max_num_queries):
+        api_client.force_authenticate(user=admin_user)
+        users = make_users(2)
+        for u in users:
+            TimeEntry.objects.create(user=u, clock_in=timezone.now())
+
+        with django_assert_max_num_queries(4):
+            response = api_client.get(reverse("team-reports"))
+        assert len(response.data) == 3
+
+        more = make_users(18, start=2)
+        for u in more:
+            TimeEntry.objects.create(user=u, clock_in=timezone.now())
+
+        with django_assert_max_num_queries(4):
+            response = api_client.get(reverse("team-reports"))
+        assert len(response.data) == 21
+
+
+def local_dt(day, hour, minute=0):
+    return timezone.make_aware(datetime.combine(day, time(hour, minute)))
+
+
+@pytest.mark.django_db
+class TestDailyTimeSummary:
+    def test_clock_out_updates_rollup(self, api_client):
+        (worker,) = make_users(1)
+        api_client.force_authenticate(user=worker)
+        api_client.post(reverse("clock-in"))
+        api_client.post(reverse("clock-out"))
+
+        summary = DailyTimeSummary.objects.get(user=worker)
+        entry = TimeEntry.objects.get(user=worker)
+        assert summary.session_count == 1
+        assert summary.first_clock_in == entry.clock_in
+
+    def test_session_crossing_midnight_is_split(self):
+        (worker,) = make_users(1)
+        day = date(2024, 3, 4)
+        entry = TimeEntry.objects.create(
+            user=worker, clock_in=local_dt(day, 22), clock_out=local_dt(day + timedelta(days=1), 2)
+        )
+        refresh_daily_summaries({worker.id: affected_dates(entry.clock_in, entry.clock_out)})
+
+        rows = {s.date: s for s in DailyTimeSummary.objects.filter(user=worker)}
+        assert rows[day].worked_seconds == 2 * 3600
+        assert rows[day + timedelta(days=1)].worked_seconds == 2 * 3600
+        assert rows[day + timedelta(days=1)].first_clock_in is None
+
+    def test_manager_edit_moves_rollup(self, api_client, admin_user):
+        (worker,) = make_users(1)
+        monday, tuesday = date(2024, 3, 4), date(2024, 3, 5)
+        TeamStatus.objects.create(user=worker, date=monday, status="late")
+        api_client.force_authenticate(user=admin_user)
+        url = reverse("team-time-entry-upsert")
+
+        response = api_client.post(
+            url,
+            {
+                "user_id": worker.id,
+                "clock_in": local_dt(monday, 9, 30).isoformat(),
+                "clock_out": local_dt(monday, 12).isoformat(),
+            },
+        )
+        summary = DailyTimeSummary.objects.get(user=worker)
+        assert summary.date == monday
+        assert summary.is_late is True
+
+        api_client.post(
+            url,
+            {
+                "user_id": worker.id,
+                "entry_id": response.data["id"],
+                "clock_in": local_dt(tuesday, 9).isoformat(),
+                "clock_out": local_dt(tuesday, 10).isoformat(),
+            },
+        )
+        summary = DailyTimeSummary.objects.get(user=worker)
+        assert summary.date == tuesday
+        assert summary.worked_seconds == 3600
+
+    def test_late_flag_follows_team_status_not_the_current_schedule(self, api_client, admin_user):
+        (worker,) = make_users(1)
+        WorkingHours.objects.create(user=worker, day_of_week=0, start_time=time(9), end_time=time(17))
+        monday = date(2024, 3, 4)
+        TimeEntry.objects.create(user=worker, clock_in=local_dt(monday, 9, 30), clock_out=local_dt(monday, 12))
+        enqueue_clock_ins([(worker.id, local_dt(monday, 9, 30))])
+        refresh_daily_summaries({worker.id: {monday}})
+        assert DailyTimeSummary.objects.get(user=worker).is_late is False
+
+        # The worker's late mark reaches the existing rollup row
+        drain_clock_events()
+        assert DailyTimeSummary.objects.get(user=worker).is_late is True
+
+        # A later schedule change does not rewrite past lateness
+        api_client.force_authenticate(user=admin_user)
+        api_client.put(
+            reverse("working-hours", kwargs={"user_id": worker.id}),
+            {"schedules": [{"day_of_week": 0, "start_time": "10:00", "end_time": "18:00"}]},
+            format="json",
+        )
+        call_command("rebuild_daily_summaries", "--verify-only", stdout=StringIO(), stderr=StringIO())
+
+        # A manager clearing the status clears the flag too
+        api_client.post(
+            reverse("team-status-set"), {"user_id": worker.id, "status": "normal", "date": monday.isoformat()}
+        )
+        assert DailyTimeSummary.objects.get(user=worker).is_late is False
+        call_command("rebuild_daily_summaries", "--verify-only", stdout=StringIO(), stderr=StringIO())
+
+    def test_rebuild_command_restores_and_verifies(self):
+        (worker,) = make_users(1)
+        day = date(2024, 3, 4)
+        TimeEntry.objects.create(user=worker, clock_in=local_dt(day, 8), clock_out=local_dt(day, 12))
+        TimeEntry.objects.create(user=worker, clock_in=local_dt(day, 13), clock_out=local_dt(day, 17))
+
+        with pytest.raises(CommandError):
+            call_command("rebuild_daily_summaries", "--verify-only", stderr=StringIO())
+
+        call_command("rebuild_daily_summaries", stdout=StringIO())
+        summary = DailyTimeSummary.objects.get(user=worker)
+        assert summary.worked_seconds == 8 * 3600
+        assert summary.session_count == 2
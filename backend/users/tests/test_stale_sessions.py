@@ -0,0 +1,93 @@
+from datetime import date, datetime, time, timedelta
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.utils import timezone
+
+from users.models import DailyTimeSummary, TimeEntry, WorkingHours
+from users.stale_sessions import close_stale_sessions
+
+User = get_user_model()
+
+MONDAY = date(2024, 3, 4)
+
+
+def make_users(count):
+    return [
+        User.objects.create_user(
+            email=f"forgetful{i}@example.com",
+            password="password",
+            first_name="Forgetful",
+            last_name=f"User{i}",
+            phone_number=f"+33611000{i:03d}",
+        )
+        for i in range(count)
+    ]
+
+
+def at(day, hour, minute=0):
+    return timezone.make_aware(datetime.combine(day, time(hour, minute)))
+
+
+@pytest.mark.django_db
+class TestCloseStaleSessions:
+    def test_closes_at_scheduled_end(self):
+        (user,) = make_users(1)
+        WorkingHours.objects.create(user=user, day_of_week=0, start_time=time(9), end_time=time(17))
+        entry = TimeEntry.objects.create(user=user, clock_in=at(MONDAY, 9))
+
+        # Within the grace period the session is left alone
+        assert close_stale_sessions(now=at(MONDAY, 17, 30)) == (1, 0)
+
+        assert close_stale_sessions(now=at(MONDAY + timedelta(days=2), 8)) == (1, 1)
+        entry.refresh_from_db()
+        assert entry.clock_out == at(MONDAY, 17)
+        assert entry.total_hours == 8.0
+        assert entry.auto_closed
+        assert entry.is_open is None
+        assert DailyTimeSummary.objects.get(user=user, date=MONDAY).worked_seconds == 8 * 3600
+
+    def test_closes_unscheduled_sessions_after_max_hours(self):
+        scheduled_overtime, unscheduled, recent = make_users(3)
+        # Clocked in after the scheduled end, so the maximum length applies
+        WorkingHours.objects.create(user=scheduled_overtime, day_of_week=0, start_time=time(9), end_time=time(17))
+        TimeEntry.objects.create(user=scheduled_overtime, clock_in=at(MONDAY, 18))
+        TimeEntry.objects.create(user=unscheduled, clock_in=at(MONDAY, 8))
+        TimeEntry.objects.create(user=recent, clock_in=at(MONDAY, 20))
+
+        scanned, closed = close_stale_sessions(now=at(MONDAY, 21), max_hours=3, batch_size=1)
+        assert (scanned, closed) == (3, 2)
+
+        entries = {e.user_id: e for e in TimeEntry.objects.all()}
+        assert entries[scheduled_overtime.id].clock_out == at(MONDAY, 21)
+        assert entries[unscheduled.id].clock_out == at(MONDAY, 11)
+        assert entries[recent.id].clock_out is None
+
+    def test_chunks_resume_after_the_last_clock_in_and_id(self):
+        users = make_users(5)
+        # Ties on clock_in straddle the chunk boundaries
+        for i, user in enumerate(users):
+            TimeEntry.objects.create(user=user, clock_in=at(MONDAY, 8 + i // 2))
+
+        assert close_stale_sessions(now=at(MONDAY, 19), max_hours=12, batch_size=2) == (5, 0)
+        assert close_stale_sessions(now=at(MONDAY + timedelta(days=1), 12), max_hours=12, batch_size=2) == (5, 5)
+        assert not TimeEntry.objects.filter(is_open=True).exists()
+
+    def test_user_can_clock_in_after_auto_close(self):
+        (user,) = make_users(1)
+        TimeEntry.objects.create(user=user, clock_in=timezone.now() - timedelta(days=3))
+        close_stale_sessions()
+        TimeEntry.objects.create(user=user)
+        assert TimeEntry.objects.filter(user=user, is_open=True).count() == 1
+
+    def test_command_dry_run_writes_nothing(self, capsys):
+        (user,) = make_users(1)
+        TimeEntry.objects.create(user=user, clock_in=timezone.now() - timedelta(days=3))
+
+        call_command("close_stale_sessions", "--dry-run")
+        assert "Would close 1 of 1" in capsys.readouterr().out
+        assert TimeEntry.objects.get(user=user).clock_out is None
+
+        call_command("close_stale_sessions", "--batch-size", "10")
+        assert TimeEntry.objects.get(user=user).auto_closed
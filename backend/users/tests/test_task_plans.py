@@ -0,0 +1,189 @@
+from datetime import datetime, time, timedelta
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from users import task_plans
+from users.models import Task, Team, WorkingHours
+from users.task_plans import get_task_plans
+
+User = get_user_model()
+
+# A Monday
+MONDAY = datetime(2024, 6, 3).date()
+
+
+def at(day, hour, minute=0):
+    return timezone.make_aware(datetime.combine(day, time(hour, minute)))
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture
+def team():
+    return Team.objects.create(name="Planning Team")
+
+
+@pytest.fixture
+def planner(team):
+    user = User.objects.create_user(
+        email="planner@example.com",
+        password="password",
+        first_name="Plan",
+        last_name="Ner",
+        phone_number="+1234567840",
+        role="user",
+        team=team,
+    )
+    WorkingHours.objects.bulk_create(
+        WorkingHours(user=user, day_of_week=day, start_time=time(9), end_time=time(17)) for day in range(5)
+    )
+    return user
+
+
+def make_task(user, title, estimate, due_date=None, priority="medium"):
+    return Task.objects.create(
+        title=title,
+        created_by=user,
+        assigned_to=user,
+        estimated_duration=estimate,
+        due_date=due_date,
+        priority=priority,
+    )
+
+
+@pytest.fixture
+def backlog(planner):
+    return {
+        "later": make_task(planner, "Later", 1, priority="low"),
+        "soon": make_task(planner, "Soon", 8, due_date=at(MONDAY + timedelta(days=1), 12)),
+        "next": make_task(planner, "Next", 8, due_date=at(MONDAY + timedelta(days=1), 17)),
+        "urgent": make_task(planner, "Urgent", 2, priority="high"),
+    }
+
+
+@pytest.mark.django_db
+class TestTaskPlans:
+    def test_earliest_deadline_first_into_working_hours(self, planner, backlog):
+        plan = get_task_plans([planner.id], now=at(MONDAY, 10, 7))[planner.id]
+        assert plan["planned_from"] == at(MONDAY, 10)
+        assert [t["title"] for t in plan["tasks"]] == ["Soon", "Next", "Urgent", "Later"]
+
+        soon, following, urgent, later = plan["tasks"]
+        assert soon["slots"] == [
+            {"start": at(MONDAY, 10), "end": at(MONDAY, 17)},
+            {"start": at(MONDAY + timedelta(days=1), 9), "end": at(MONDAY + timedelta(days=1), 10)},
+        ]
+        assert soon["missed"] is False
+        # Tuesday 10:00 + 8h of work ends Wednesday 10:00, after its deadline
+        assert following["finishes_at"] == at(MONDAY + timedelta(days=2), 10)
+        assert following["missed"] is True
+        assert urgent["finishes_at"] == at(MONDAY + timedelta(days=2), 12)
+        assert later["missed"] is False and later["scheduled"] is True
+
+    def test_changes_replan_from_the_first_affected_task(
+        self, planner, backlog, monkeypatch, django_assert_num_queries
+    ):
+        placed = []
+        original = task_plans.place
+
+        def counting_place(schedule, cursor, hours, horizon):
+            placed.append(hours)
+            return original(schedule, cursor, hours, horizon)
+
+        monkeypatch.setattr(task_plans, "place", counting_place)
+        now = at(MONDAY, 10)
+        get_task_plans([planner.id], now=now)
+        assert len(placed) == 4
+
+        # Only the tasks from "Next" onwards move
+        backlog["next"].progress = 50
+        backlog["next"].save()
+        placed.clear()
+        plan = get_task_plans([planner.id], now=now)[planner.id]
+        assert placed == [4, 2, 1]
+        assert plan["tasks"][1]["missed"] is False
+
+        # Nothing changed: the cached plan is returned after the task query alone
+        placed.clear()
+        with django_assert_num_queries(1):
+            get_task_plans([planner.id], now=now + timedelta(minutes=10))
+        assert placed == []
+
+        # A new quarter-hour starts from scratch
+        get_task_plans([planner.id], now=now + timedelta(minutes=15))
+        assert len(placed) == 4
+
+    def test_without_working_hours_nothing_is_scheduled(self, planner, backlog):
+        WorkingHours.objects.filter(user=planner).delete()
+        plan = get_task_plans([planner.id], now=at(MONDAY, 10))[planner.id]
+        assert not any(task["scheduled"] for task in plan["tasks"])
+        assert [task["missed"] for task in plan["tasks"]] == [True, True, False, False]
+
+    def test_team_scale_in_two_queries(self, planner, team, django_assert_max_num_queries):
+        users = User.objects.bulk_create(
+            User(
+                email=f"plan{i}@example.com", first_name="Plan", last_name=str(i), phone_number=f"+44{i:09d}", team=team
+            )
+            for i in range(200)
+        )
+        WorkingHours.objects.bulk_create(
+            WorkingHours(user=user, day_of_week=day, start_time=time(9), end_time=time(17))
+            for user in users
+            for day in range(5)
+        )
+        Task.objects.bulk_create(
+            Task(
+                title=f"Task {i}",
+                created_by=planner,
+                assigned_to=users[i % 200],
+                team=team,
+                estimated_duration=2,
+                due_date=at(MONDAY + timedelta(days=i % 10), 12),
+            )
+            for i in range(3000)
+        )
+
+        with django_assert_max_num_queries(2):
+            plans = get_task_plans([user.id for user in users], now=at(MONDAY, 9))
+        # 15 tasks of 2h each take three and three quarter days
+        assert plans[users[0].id]["tasks"][-1]["finishes_at"] == at(MONDAY + timedelta(days=3), 15)
+
+    def test_endpoint_permissions(self, api_client, planner, team, backlog):
+        manager = User.objects.create_user(
+            email="plan-manager@example.com",
+            password="password",
+            first_name="Plan",
+            last_name="Manager",
+            phone_number="+1234567841",
+            role="manager",
+            team=team,
+        )
+        outsider = User.objects.create_user(
+            email="plan-outsider@example.com",
+            password="password",
+            first_name="Plan",
+            last_name="Outsider",
+            phone_number="+1234567842",
+            role="user",
+        )
+        url = reverse("task-plan")
+
+        api_client.force_authenticate(user=planner)
+        response = api_client.get(url)
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data["tasks"]) == 4
+        assert api_client.get(url, {"user_id": outsider.id}).status_code == status.HTTP_403_FORBIDDEN
+
+        api_client.force_authenticate(user=manager)
+        assert api_client.get(url, {"user_id": planner.id}).data["user_id"] == planner.id
+        assert api_client.get(url, {"user_id": outsider.id}).status_code == status.HTTP_403_FORBIDDEN
+        assert api_client.get(url, {"user_id": 999999}).status_code == status.HTTP_404_NOT_FOUND
+        assert api_client.get(url, {"user_id": "me"}).status_code == status.HTTP_400_BAD_REQUEST
@@ -0,0 +1,124 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from users.models import Task, TaskSearchToken
+
+User = get_user_model()
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture
+def owner():
+    return User.objects.create_user(
+        email="search-owner@example.com",
+        password="password",
+        first_name="Search",
+        last_name="Owner",
+        phone_number="+1234567860",
+        role="user",
+    )
+
+
+@pytest.fixture
+def stranger():
+    return User.objects.create_user(
+        email="search-stranger@example.com",
+        password="password",
+        first_name="Search",
+        last_name="Stranger",
+        phone_number="+1234567861",
+        role="user",
+    )
+
+
+def make_task(user, title, description=""):
+    return Task.objects.create(title=title, description=description, created_by=user, assigned_to=user)
+
+
+def search(api_client, **params):
+    response = api_client.get(reverse("task-search"), params)
+    assert response.status_code == status.HTTP_200_OK
+    return response
+
+
+@pytest.mark.django_db
+class TestTaskSearch:
+    def test_tokens_follow_title_and_description(self, owner):
+        task = make_task(owner, "Quarterly Report", "Send the report to Élodie")
+        tokens = dict(TaskSearchToken.objects.filter(task=task).values_list("token", "weight"))
+        assert tokens["report"] == 3
+        assert tokens["quarterly"] == 2
+        assert tokens["elodie"] == 1
+
+        task.title = "Budget"
+        task.save(update_fields=["title"])
+        assert not TaskSearchToken.objects.filter(task=task, token="quarterly").exists()
+
+    def test_saves_reindex_only_when_the_text_changes(self, api_client, owner):
+        task = make_task(owner, "Quarterly Report")
+        api_client.force_authenticate(user=owner)
+        url = reverse("task-detail", args=[task.id])
+
+        with CaptureQueriesContext(connection) as queries:
+            assert api_client.put(url, {"progress": 50}, format="json").status_code == status.HTTP_200_OK
+        assert not any("tasksearchtoken" in query["sql"] for query in queries.captured_queries)
+
+        api_client.put(url, {"title": "Budget"}, format="json")
+        assert set(TaskSearchToken.objects.filter(task=task).values_list("token", flat=True)) == {"budget"}
+
+    def test_ranked_and_scoped(self, api_client, owner, stranger):
+        body_only = make_task(owner, "Prepare slides", "Numbers come from the budget report")
+        both = make_task(owner, "Budget report", "Review the budget with finance")
+        title_only = make_task(owner, "Budget report draft")
+        make_task(owner, "Team lunch")
+        make_task(stranger, "Budget report")
+        api_client.force_authenticate(user=owner)
+
+        results = search(api_client, q="budget report").data["results"]
+        assert [r["id"] for r in results] == [both.id, title_only.id, body_only.id]
+        assert results[0]["rank"] > results[1]["rank"] > results[2]["rank"]
+
+        # Prefixes and accents
+        assert [r["id"] for r in search(api_client, q="BUDG").data["results"]] == [both.id, title_only.id, body_only.id]
+        assert [r["id"] for r in search(api_client, q="lúnch").data["results"]] != []
+
+    def test_pages_follow_rank(self, api_client, owner):
+        tasks = [make_task(owner, f"Audit {i}", "audit" if i % 2 else "") for i in range(5)]
+        api_client.force_authenticate(user=owner)
+
+        seen, cursor = [], None
+        while True:
+            params = {"q": "audit", "limit": 2, **({"cursor": cursor} if cursor else {})}
+            data = search(api_client, **params).data
+            seen += [r["id"] for r in data["results"]]
+            cursor = data["next_cursor"]
+            if not cursor:
+                break
+        # Title and description matches first, then the newest
+        assert seen == [tasks[3].id, tasks[1].id, tasks[4].id, tasks[2].id, tasks[0].id]
+
+    def test_bulk_retitle_updates_the_index(self, api_client, owner):
+        task = make_task(owner, "Old title")
+        api_client.force_authenticate(user=owner)
+        api_client.patch(
+            reverse("task-bulk-update"), {"tasks": [{"id": task.id, "fields": {"title": "Renamed"}}]}, format="json"
+        )
+        assert [r["id"] for r in search(api_client, q="renamed").data["results"]] == [task.id]
+        assert search(api_client, q="old").data["results"] == []
+
+    def test_invalid_queries(self, api_client, owner):
+        api_client.force_authenticate(user=owner)
+        url = reverse("task-search")
+        assert api_client.get(url).status_code == status.HTTP_400_BAD_REQUEST
+        assert api_client.get(url, {"q": "a ?"}).status_code == status.HTTP_400_BAD_REQUEST
+        assert api_client.get(url, {"q": " ".join(f"w{i}" for i in range(9))}).status_code == 400
+        assert api_client.get(url, {"q": "audit", "cursor": "bm90LWpzb24"}).status_code == 400
@@ -0,0 +1,105 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from users.models import Task
+
+User = get_user_model()
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture
+def owner():
+    return User.objects.create_user(
+        email="bulk-owner@example.com",
+        password="password",
+        first_name="Bulk",
+        last_name="Owner",
+        phone_number="+1234567870",
+        role="user",
+    )
+
+
+@pytest.fixture
+def stranger():
+    return User.objects.create_user(
+        email="bulk-stranger@example.com",
+        password="password",
+        first_name="Bulk",
+        last_name="Stranger",
+        phone_number="+1234567871",
+        role="user",
+    )
+
+
+@pytest.fixture
+def tasks(owner):
+    return [Task.objects.create(title=f"Bulk {i}", created_by=owner, assigned_to=owner) for i in range(5)]
+
+
+@pytest.mark.django_db
+class TestTaskBulkUpdate:
+    def test_mark_all_done_in_one_update(self, api_client, owner, tasks):
+        api_client.force_authenticate(user=owner)
+        payload = {"tasks": [{"id": task.id, "fields": {"progress": 100}} for task in tasks]}
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = api_client.patch(reverse("task-bulk-update"), payload, format="json")
+        assert response.status_code == status.HTTP_200_OK
+        assert [r["status"] for r in response.data["results"]] == ["updated"] * 5
+        assert response.data["results"][0]["task"]["progress"] == 100
+        updates = [q["sql"] for q in ctx.captured_queries if q["sql"].startswith('UPDATE "users_task"')]
+        assert len(updates) == 1
+        selects = [q["sql"] for q in ctx.captured_queries if q["sql"].startswith("SELECT")]
+        assert len(selects) == 1
+        assert not Task.objects.exclude(progress=100).exists()
+
+    def test_outcomes_per_item(self, api_client, owner, stranger, tasks):
+        hidden = Task.objects.create(title="Hidden", created_by=stranger, assigned_to=stranger)
+        api_client.force_authenticate(user=owner)
+        payload = {
+            "tasks": [
+                {"id": tasks[0].id, "fields": {"title": "Renamed", "priority": "high"}},
+                {"id": hidden.id, "fields": {"progress": 100}},
+                {"id": 999999, "fields": {"progress": 100}},
+                {"id": tasks[1].id, "fields": {"priority": "urgent"}},
+                {"id": tasks[0].id, "fields": {"progress": 50}},
+                {"fields": {"progress": 50}},
+            ]
+        }
+        results = api_client.patch(reverse("task-bulk-update"), payload, format="json").data["results"]
+        assert [r["status"] for r in results] == ["updated", "forbidden", "not_found", "invalid", "invalid", "invalid"]
+        assert "priority" in results[3]["errors"]
+
+        tasks[0].refresh_from_db()
+        assert (tasks[0].title, tasks[0].priority, tasks[0].progress) == ("Renamed", "high", 0)
+        hidden.refresh_from_db()
+        assert hidden.progress == 0
+        tasks[1].refresh_from_db()
+        assert tasks[1].priority == "medium"
+
+    def test_updates_refresh_task_list_etag(self, api_client, owner, tasks, django_capture_on_commit_callbacks):
+        api_client.force_authenticate(user=owner)
+        etag = api_client.get(reverse("task-list-create"))["ETag"]
+        with django_capture_on_commit_callbacks(execute=True):
+            api_client.patch(
+                reverse("task-bulk-update"), {"tasks": [{"id": tasks[0].id, "fields": {"progress": 25}}]}, format="json"
+            )
+        response = api_client.get(reverse("task-list-create"), HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_invalid_requests(self, api_client, owner):
+        api_client.force_authenticate(user=owner)
+        url = reverse("task-bulk-update")
+        assert api_client.patch(url, {"tasks": []}, format="json").status_code == 400
+        assert api_client.patch(url, {"tasks": {"id": 1}}, format="json").status_code == 400
+        too_many = [{"id": i, "fields": {}} for i in range(501)]
+        assert api_client.patch(url, {"tasks": too_many}, format="json").status_code == 400
@@ -1,6 +1,9 @@
+from datetime import datetime
+
 import pytest
 from django.contrib.auth import get_user_model
 from django.urls import reverse
+from django.utils import timezone
 from rest_framework import status
 from rest_framework.test import APIClient
 
@@ -71,8 +74,9 @@ class TestTasks:
         url = reverse("task-list-create")
         response = api_client.get(url)
         assert response.status_code == status.HTTP_200_OK
-        assert len(response.data) == 1
-        assert response.data[0]["title"] == "Task 1"
+        assert len(response.data["results"]) == 1
+        assert response.data["results"][0]["title"] == "Task 1"
+        assert response.data["next_cursor"] is None
 
     def test_get_task_detail(self, api_client, user):
         """GET /api/users/tasks/<pk>/ - User can view their task"""
@@ -117,3 +121,126 @@ class TestTasks:
         url = reverse("task-detail", kwargs={"pk": other_task.pk})
         response = api_client.get(url)
         assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_task_list_pages_without_per_task_queries(self, api_client, user, manager, django_assert_max_num_queries):
+        api_client.force_authenticate(user=user)
+        created = [
+            Task.objects.create(title=f"Task {i}", created_by=manager if i % 2 else user, assigned_to=user)
+            for i in range(7)
+        ]
+
+        seen, cursor = [], None
+        while True:
+            params = {"limit": 3, **({"cursor": cursor} if cursor else {})}
+            # One query per page, however many tasks and users it shows
+            with django_assert_max_num_queries(1):
+                response = api_client.get(reverse("task-list-create"), params)
+            assert response.status_code == status.HTTP_200_OK
+            seen += [t["id"] for t in response.data["results"]]
+            cursor = response.data["next_cursor"]
+            if not cursor:
+                break
+
+        assert seen == [t.id for t in sorted(created, key=lambda t: (t.created_at, t.id), reverse=True)]
+        assert {t["created_by_name"] for t in response.data["results"]} <= {"Task User", "Task Manager"}
+
+    def test_task_list_filters(self, api_client, user):
+        api_client.force_authenticate(user=user)
+        due = timezone.make_aware(datetime(2024, 6, 10, 23, 30))
+        Task.objects.create(title="Urgent", created_by=user, assigned_to=user, priority="high", due_date=due)
+        Task.objects.create(title="Started", created_by=user, assigned_to=user, priority="low", progress=40)
+        Task.objects.create(title="Finished", created_by=user, assigned_to=user, priority="low", progress=100)
+
+        def titles(**params):
+            response = api_client.get(reverse("task-list-create"), params)
+            assert response.status_code == status.HTTP_200_OK
+            return {t["title"] for t in response.data["results"]}
+
+        assert titles(priority="high,medium") == {"Urgent"}
+        assert titles(status="in_progress") == {"Started"}
+        assert titles(status="done") == {"Finished"}
+        assert titles(status="not_started") == {"Urgent"}
+        assert titles(due_from="2024-06-10", due_to="2024-06-10") == {"Urgent"}
+        assert titles(due_from="2024-06-11") == set()
+        assert titles(assigned_to=user.id) == {"Urgent", "Started", "Finished"}
+
+        for params in ({"priority": "urgent"}, {"status": "blocked"}, {"due_to": "someday"}, {"assigned_to": "me"}):
+            assert api_client.get(reverse("task-list-create"), params).status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_task_list_uses_composite_indexes(self, user):
+        plan = Task.objects.filter(assigned_to=user).order_by("-created_at", "-id").explain()
+        assert "task_assignee_created_idx" in plan
+
+    def test_task_team_follows_the_assignee(self, api_client, user, manager):
+        team = Team.objects.create(name="Ownership Team")
+        other = Team.objects.create(name="Other Ownership Team")
+        manager.team = team
+        manager.save()
+        user.team = team
+        user.save()
+        task = Task.objects.create(title="Owned", created_by=user, assigned_to=user)
+        assert task.team == team
+
+        admin = User.objects.create_user(
+            email="taskadmin@example.com",
+            password="password",
+            first_name="Task",
+            last_name="Admin",
+            phone_number="+1234567895",
+            role="admin",
+        )
+        api_client.force_authenticate(user=admin)
+        api_client.put(reverse("admin-assign-team"), {"user_id": user.id, "team_id": other.id}, format="json")
+        task.refresh_from_db()
+        assert task.team == other
+
+        # The old team's manager loses access, in both the list and the detail view
+        api_client.force_authenticate(user=manager)
+        assert api_client.get(reverse("task-list-create")).data["results"] == []
+        response = api_client.get(reverse("task-detail", kwargs={"pk": task.pk}))
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_manager_task_list_uses_team_index(self, manager):
+        team = Team.objects.create(name="Indexed Team")
+        plan = Task.objects.filter(team=team).order_by("-created_at", "-id").explain()
+        assert "task_team_created_idx" in plan
+
+    def test_task_detail_is_one_scoped_query(self, api_client, user, manager, django_assert_num_queries):
+        team = Team.objects.create(name="Policy Team")
+        manager.team = team
+        manager.save()
+        user.team = team
+        user.save()
+        visible = Task.objects.create(title="Team task", created_by=user, assigned_to=user)
+        api_client.force_authenticate(user=manager)
+
+        with django_assert_num_queries(1):
+            response = api_client.get(reverse("task-detail", kwargs={"pk": visible.pk}))
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["assigned_to"] == user.id
+
+        # Missing tasks are still 404 and hidden ones 403
+        assert api_client.get(reverse("task-detail", kwargs={"pk": 999999})).status_code == status.HTTP_404_NOT_FOUND
+        user.team = None
+        user.save()
+        hidden = Task.objects.create(title="Private", created_by=user, assigned_to=user)
+        response = api_client.get(reverse("task-detail", kwargs={"pk": hidden.pk}))
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_task_list_and_detail_share_the_policy(self, api_client, user, manager):
+        team = Team.objects.create(name="Shared Policy Team")
+        manager.team = team
+        manager.save()
+        Task.objects.create(title="Own", created_by=user, assigned_to=user)
+        Task.objects.create(title="Delegated", created_by=manager, assigned_to=user)
+        Task.objects.create(title="Manager's", created_by=manager, assigned_to=manager)
+
+        for caller in (user, manager):
+            api_client.force_authenticate(user=caller)
+            listed = {task["id"] for task in api_client.get(reverse("task-list-create")).data["results"]}
+            readable = {
+                task.id
+                for task in Task.objects.all()
+                if api_client.get(reverse("task-detail", kwargs={"pk": task.pk})).status_code == status.HTTP_200_OK
+            }
+            assert listed == readable
@@ -106,7 +106,7 @@ class TestTeam:
         url = reverse("team-member-entries", kwargs={"user_id": employee.id})
         response = api_client.get(url)
         assert response.status_code == status.HTTP_200_OK
-        assert len(response.data) == 1
+        assert len(response.data["results"]) == 1
 
     def test_manager_fix_time_entry(self, api_client, manager, employee):
         """POST /api/users/team/time-entry/ - Manager creates/fixes time entry"""
@@ -174,6 +174,26 @@ class TestTeam:
 
         assert WorkingHours.objects.filter(user=employee).count() == 3
 
+    def test_set_working_hours_invalidates_cached_schedule(self, api_client, manager, employee):
+        from datetime import time
+
+        from users.schedules import get_weekly_schedule
+
+        team = Team.objects.create(name="Cache Team", created_by=manager)
+        employee.team = team
+        employee.save()
+        manager.team = team
+        manager.save()
+        assert get_weekly_schedule(employee.id) == {}
+
+        api_client.force_authenticate(user=manager)
+        url = reverse("working-hours", kwargs={"user_id": employee.id})
+        schedules = [{"day_of_week": 4, "start_time": "08:30", "end_time": "16:30"}]
+        response = api_client.put(url, {"schedules": schedules}, format="json")
+        assert response.status_code == status.HTTP_200_OK
+
+        assert get_weekly_schedule(employee.id) == {4: time(8, 30)}
+
     def test_manager_cannot_set_hours_for_non_team_member(self, api_client, manager, employee):
         """Manager cannot set working hours for user not in their team"""
         team1 = Team.objects.create(name="Manager Team", created_by=manager)
@@ -187,3 +207,133 @@ class TestTeam:
         url = reverse("working-hours", kwargs={"user_id": employee.id})
         response = api_client.put(url, {"schedules": []}, format="json")
         assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_manager_batch_fix_time_entries(self, api_client, manager, employee, django_assert_max_num_queries):
+        """POST /api/users/team/time-entries/batch/ - Manager fixes many entries at once"""
+        from users.models import DailyTimeSummary, TimeEntry
+
+        team = Team.objects.create(name="Batch Team", created_by=manager)
+        employee.team = team
+        employee.save()
+        manager.team = team
+        manager.save()
+        outsider = User.objects.create_user(
+            email="outsider@example.com",
+            password="password",
+            first_name="Out",
+            last_name="Sider",
+            phone_number="+1234567801",
+        )
+        existing = TimeEntry.objects.create(user=employee, clock_in="2024-03-04T09:00:00+01:00")
+
+        api_client.force_authenticate(user=manager)
+        payload = {
+            "entries": [
+                {
+                    "user_id": employee.id,
+                    "clock_in": "2024-03-05T09:00:00+01:00",
+                    "clock_out": "2024-03-05T17:00:00+01:00",
+                },
+                {
+                    "user_id": employee.id,
+                    "entry_id": existing.id,
+                    "clock_in": "2024-03-04T09:00:00+01:00",
+                    "clock_out": "2024-03-04T12:30:00+01:00",
+                },
+                {"user_id": outsider.id, "clock_in": "2024-03-05T09:00:00+01:00"},
+                {"user_id": employee.id, "clock_in": "not-a-date"},
+            ]
+        }
+        with django_assert_max_num_queries(13):
+            response = api_client.post(reverse("team-time-entry-batch-upsert"), payload, format="json")
+        assert response.status_code == status.HTTP_200_OK
+
+        results = response.data["results"]
+        assert [r.get("status") for r in results] == ["created", "updated", None, None]
+        assert results[2]["error"] == "Not allowed."
+        assert response.data["errors"] == 2
+        assert results[0]["entry"]["total_hours"] == 8.0
+        existing.refresh_from_db()
+        assert existing.total_hours == 3.5
+        assert TimeEntry.objects.filter(user=outsider).count() == 0
+        assert DailyTimeSummary.objects.filter(user=employee).count() == 2
+
+    @pytest.mark.parametrize("close_first", [True, False])
+    def test_batch_can_replace_an_open_session_in_any_order(self, api_client, manager, employee, close_first):
+        from users.models import TimeEntry
+
+        team = Team.objects.create(name="Order Team", created_by=manager)
+        User.objects.filter(id__in=[manager.id, employee.id]).update(team=team)
+        manager.refresh_from_db()
+        forgotten = TimeEntry.objects.create(user=employee, clock_in="2024-03-04T09:00:00+01:00")
+
+        close = {
+            "user_id": employee.id,
+            "entry_id": forgotten.id,
+            "clock_in": "2024-03-04T09:00:00+01:00",
+            "clock_out": "2024-03-04T17:00:00+01:00",
+        }
+        reopen = {"user_id": employee.id, "clock_in": "2024-03-05T09:00:00+01:00"}
+        second = {"user_id": employee.id, "clock_in": "2024-03-05T10:00:00+01:00"}
+        entries = [close, reopen, second] if close_first else [reopen, second, close]
+        api_client.force_authenticate(user=manager)
+        response = api_client.post(reverse("team-time-entry-batch-upsert"), {"entries": entries}, format="json")
+
+        outcomes = {r["index"]: r.get("status", r.get("error")) for r in response.data["results"]}
+        assert outcomes[entries.index(close)] == "updated"
+        assert outcomes[entries.index(reopen)] == "created"
+        assert outcomes[entries.index(second)] == "This user already has an open session."
+        created = response.data["results"][entries.index(reopen)]["entry"]["id"]
+        assert TimeEntry.objects.get(user=employee, is_open=True).id == created
+
+    def test_batch_racing_a_clock_in_returns_409(self, api_client, manager, employee, monkeypatch):
+        from users.models import TimeEntry
+
+        team = Team.objects.create(name="Race Team", created_by=manager)
+        User.objects.filter(id__in=[manager.id, employee.id]).update(team=team)
+        manager.refresh_from_db()
+
+        # The employee clocks in after the batch read their (absent) open session
+        bulk_update = TimeEntry.objects.bulk_update
+
+        def clock_in_then_update(*args, **kwargs):
+            TimeEntry.objects.create(user=employee)
+            return bulk_update(*args, **kwargs)
+
+        monkeypatch.setattr(TimeEntry.objects, "bulk_update", clock_in_then_update)
+        api_client.force_authenticate(user=manager)
+        payload = {"entries": [{"user_id": employee.id, "clock_in": "2024-03-05T09:00:00+01:00"}]}
+        response = api_client.post(reverse("team-time-entry-batch-upsert"), payload, format="json")
+        assert response.status_code == status.HTTP_409_CONFLICT
+        assert not TimeEntry.objects.filter(user=employee).exists()
+
+    def test_team_list_query_count_is_constant(self, api_client, manager, django_assert_num_queries):
+        admin = User.objects.create_user(
+            email="teams-admin@example.com",
+            password="password",
+            first_name="Teams",
+            last_name="Admin",
+            phone_number="+1234567870",
+            role="admin",
+        )
+        api_client.force_authenticate(user=admin)
+        for i in range(5):
+            team = Team.objects.create(name=f"Team {i}", created_by=admin)
+            for j in range(3):
+                User.objects.create_user(
+                    email=f"team{i}-user{j}@example.com",
+                    password="password",
+                    first_name="Team",
+                    last_name=f"User {i}{j}",
+                    phone_number=f"+12345671{i}{j}",
+                    role="manager" if j == 0 else "user",
+                    team=team,
+                )
+
+        # Teams with their member counts, then every team's managers in one prefetch
+        with django_assert_num_queries(2):
+            response = api_client.get(reverse("team-list-create"))
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data) == 5
+        assert {t["members_count"] for t in response.data} == {3}
+        assert all(len(t["managers"]) == 1 for t in response.data)
@@ -0,0 +1,149 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from users.models import Conversation, Team
+
+User = get_user_model()
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture
+def old_team():
+    return Team.objects.create(name="Old Team")
+
+
+@pytest.fixture
+def new_team():
+    return Team.objects.create(name="New Team")
+
+
+@pytest.fixture
+def admin():
+    return User.objects.create_user(
+        email="assign-admin@example.com",
+        password="password",
+        first_name="Assign",
+        last_name="Admin",
+        phone_number="+1234567880",
+        role="admin",
+    )
+
+
+@pytest.fixture
+def manager(new_team):
+    return User.objects.create_user(
+        email="assign-manager@example.com",
+        password="password",
+        first_name="Assign",
+        last_name="Manager",
+        phone_number="+1234567881",
+        role="manager",
+        team=new_team,
+    )
+
+
+@pytest.fixture
+def movers(old_team):
+    return [
+        User.objects.create_user(
+            email=f"mover{i}@example.com",
+            password="password",
+            first_name="Mover",
+            last_name=str(i),
+            phone_number=f"+123456788{i + 2}",
+            role="user",
+            team=old_team,
+        )
+        for i in range(3)
+    ]
+
+
+def team_chat(team, *participants):
+    conversation = Conversation.objects.create(name=team.name, team=team, is_direct=False)
+    conversation.participants.add(*participants)
+    return conversation
+
+
+@pytest.mark.django_db
+class TestBulkAssignTeam:
+    def test_admin_moves_users_in_one_update(self, api_client, admin, manager, movers, old_team, new_team):
+        old_chat = team_chat(old_team, *movers)
+        new_chat = team_chat(new_team, manager)
+        api_client.force_authenticate(user=admin)
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = api_client.put(
+                reverse("bulk-assign-team"), {"user_ids": [u.id for u in movers], "team_id": new_team.id}, format="json"
+            )
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["moved"] == 3
+        updates = [q["sql"] for q in ctx.captured_queries if q["sql"].startswith('UPDATE "users_user"')]
+        assert len(updates) == 1
+
+        expected = {manager.id, *(u.id for u in movers)}
+        assert set(User.objects.filter(team=new_team).values_list("id", flat=True)) == expected
+        assert not old_chat.participants.exists()
+        assert new_chat.participants.count() == 4
+
+    def test_users_already_in_the_team_are_left_alone(self, api_client, admin, movers, old_team):
+        api_client.force_authenticate(user=admin)
+        response = api_client.put(
+            reverse("bulk-assign-team"), {"user_ids": [movers[0].id], "team_id": old_team.id}, format="json"
+        )
+        assert response.data["moved"] == 0
+
+    def test_manager_removes_own_team_members(self, api_client, manager, new_team):
+        member = User.objects.create_user(
+            email="assign-member@example.com",
+            password="password",
+            first_name="Assign",
+            last_name="Member",
+            phone_number="+1234567889",
+            role="user",
+            team=new_team,
+        )
+        chat = team_chat(new_team, manager, member)
+        api_client.force_authenticate(user=manager)
+
+        response = api_client.put(
+            reverse("bulk-assign-team"), {"user_ids": [member.id], "team_id": None}, format="json"
+        )
+        assert response.status_code == status.HTTP_200_OK
+        member.refresh_from_db()
+        assert member.team is None
+        assert list(chat.participants.all()) == [manager]
+
+    def test_manager_rules_apply_to_the_whole_set(self, api_client, manager, movers, old_team, new_team):
+        api_client.force_authenticate(user=manager)
+        url = reverse("bulk-assign-team")
+
+        response = api_client.put(url, {"user_ids": [u.id for u in movers], "team_id": None}, format="json")
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+        assert response.data["user_ids"] == sorted(u.id for u in movers)
+
+        response = api_client.put(url, {"user_ids": [movers[0].id], "team_id": old_team.id}, format="json")
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+        assert User.objects.filter(team=old_team).count() == 3
+
+    def test_invalid_requests(self, api_client, admin, movers, new_team):
+        api_client.force_authenticate(user=admin)
+        url = reverse("bulk-assign-team")
+
+        assert api_client.put(url, {"user_ids": [], "team_id": new_team.id}, format="json").status_code == 400
+        assert api_client.put(url, {"user_ids": ["x"], "team_id": new_team.id}, format="json").status_code == 400
+
+        response = api_client.put(url, {"user_ids": [movers[0].id, 999999], "team_id": new_team.id}, format="json")
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+        assert response.data["user_ids"] == [999999]
+
+        response = api_client.put(url, {"user_ids": [movers[0].id], "team_id": 999999}, format="json")
+        assert response.status_code == status.HTTP_404_NOT_FOUND
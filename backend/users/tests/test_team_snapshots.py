@@ -0,0 +1,105 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from users.models import Team
+
+User = get_user_model()
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture
+def team():
+    return Team.objects.create(name="Snapshot Team")
+
+
+@pytest.fixture
+def manager(team):
+    return User.objects.create_user(
+        email="snapshot-manager@example.com",
+        password="password",
+        first_name="Snapshot",
+        last_name="Manager",
+        phone_number="+1234567860",
+        role="manager",
+        team=team,
+    )
+
+
+def make_members(team, count):
+    return [
+        User.objects.create_user(
+            email=f"snapshot-{i}@example.com",
+            password="password",
+            first_name="Member",
+            last_name=f"Number {i:02d}",
+            phone_number=f"+12345679{i:02d}",
+            role="user",
+            team=team,
+        )
+        for i in range(count)
+    ]
+
+
+@pytest.mark.django_db
+class TestTeamSnapshots:
+    def test_my_team_costs_a_fixed_number_of_queries(self, api_client, team, manager, django_assert_max_num_queries):
+        members = make_members(team, 12)
+        api_client.force_authenticate(user=members[0])
+
+        # Members + open sessions + statuses, however large the team
+        with django_assert_max_num_queries(3):
+            response = api_client.get(reverse("my-team"))
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["team_name"] == "Snapshot Team"
+        assert response.data["manager"]["id"] == manager.id
+        assert [m["id"] for m in response.data["members"]] == [m.id for m in members[1:]]
+
+        with django_assert_max_num_queries(0):
+            api_client.get(reverse("my-team"))
+
+    def test_manager_is_not_listed_as_their_own_manager(self, api_client, team, manager):
+        (member,) = make_members(team, 1)
+        api_client.force_authenticate(user=manager)
+        response = api_client.get(reverse("my-team"))
+        assert response.data["manager"] is None
+        assert [m["id"] for m in response.data["members"]] == [member.id]
+
+    def test_views_share_the_snapshot(self, api_client, team, manager, django_assert_max_num_queries):
+        make_members(team, 3)
+        api_client.force_authenticate(user=manager)
+        api_client.get(reverse("my-team"))
+
+        # Only the unassigned users are left to read
+        with django_assert_max_num_queries(1):
+            response = api_client.get(reverse("team-members"))
+        assert len(response.data["results"]) == 4
+        assert {r["team_name"] for r in response.data["results"]} == {"Snapshot Team"}
+
+    def test_membership_and_status_writes_refresh_the_snapshot(
+        self, api_client, team, manager, django_capture_on_commit_callbacks
+    ):
+        (member,) = make_members(team, 1)
+        recruit = User.objects.create_user(
+            email="snapshot-recruit@example.com",
+            password="password",
+            first_name="Snapshot",
+            last_name="Recruit",
+            phone_number="+1234567869",
+        )
+        api_client.force_authenticate(user=manager)
+        assert len(api_client.get(reverse("my-team")).data["members"]) == 1
+
+        with django_capture_on_commit_callbacks(execute=True):
+            api_client.put(reverse("admin-assign-team"), {"user_id": recruit.id, "team_id": team.id}, format="json")
+            api_client.post(reverse("team-status-set"), {"user_id": member.id, "status": "pto"})
+
+        members = {m["id"]: m for m in api_client.get(reverse("my-team")).data["members"]}
+        assert set(members) == {member.id, recruit.id}
+        assert members[member.id]["today_status"] == "pto"
@@ -0,0 +1,129 @@
+from datetime import date, timedelta
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from users.models import Team, TeamStatus
+
+User = get_user_model()
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture
+def team():
+    return Team.objects.create(name="Holiday Team")
+
+
+@pytest.fixture
+def manager(team):
+    return User.objects.create_user(
+        email="holiday-manager@example.com",
+        password="password",
+        first_name="Holiday",
+        last_name="Manager",
+        phone_number="+1234567890",
+        role="manager",
+        team=team,
+    )
+
+
+@pytest.fixture
+def members(team):
+    return [
+        User.objects.create_user(
+            email=f"holiday{i}@example.com",
+            password="password",
+            first_name="Holiday",
+            last_name=f"Member {i}",
+            phone_number=f"+12345678{i}0",
+            role="user",
+            team=team,
+        )
+        for i in range(3)
+    ]
+
+
+@pytest.mark.django_db
+class TestTeamStatusRange:
+    def test_team_holiday_is_one_bulk_upsert(self, api_client, manager, members, team):
+        # An existing status inside the range is overwritten
+        TeamStatus.objects.create(user=members[0], date=date(2024, 8, 5), status="late", note="Train")
+        api_client.force_authenticate(user=manager)
+
+        payload = {
+            "team_id": team.id,
+            "status": "pto",
+            "note": "Summer",
+            "date_from": "2024-08-05",
+            "date_to": "2024-08-18",
+        }
+        with CaptureQueriesContext(connection) as ctx:
+            response = api_client.post(reverse("team-status-range"), payload, format="json")
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data == {"users": 4, "days": 14, "written": 56}
+        inserts = [q["sql"] for q in ctx.captured_queries if q["sql"].startswith('INSERT INTO "users_teamstatus"')]
+        assert len(inserts) == 1
+
+        assert TeamStatus.objects.filter(status="pto", note="Summer").count() == 56
+        assert TeamStatus.objects.get(user=members[0], date=date(2024, 8, 5)).status == "pto"
+
+    def test_user_list_and_today_refresh_presence(
+        self, api_client, manager, members, django_capture_on_commit_callbacks
+    ):
+        api_client.force_authenticate(user=manager)
+        api_client.get(reverse("my-team"))  # warm the presence cache
+        today = timezone.localdate()
+
+        payload = {
+            "user_ids": [members[1].id],
+            "status": "absent",
+            "date_from": (today - timedelta(days=1)).isoformat(),
+            "date_to": (today + timedelta(days=1)).isoformat(),
+        }
+        with django_capture_on_commit_callbacks(execute=True):
+            response = api_client.post(reverse("team-status-range"), payload, format="json")
+        assert response.data["written"] == 3
+
+        rows = {m["id"]: m for m in api_client.get(reverse("my-team")).data["members"]}
+        assert rows[members[1].id]["today_status"] == "absent"
+        assert rows[members[0].id]["today_status"] == "normal"
+
+    def test_managers_cannot_mark_other_teams(self, api_client, manager, members):
+        outsider = User.objects.create_user(
+            email="holiday-outsider@example.com",
+            password="password",
+            first_name="Holiday",
+            last_name="Outsider",
+            phone_number="+1234567899",
+        )
+        other = Team.objects.create(name="Other Holiday Team")
+        api_client.force_authenticate(user=manager)
+        url = reverse("team-status-range")
+        days = {"date_from": "2024-12-24", "date_to": "2024-12-26", "status": "pto"}
+
+        response = api_client.post(url, {"user_ids": [members[0].id, outsider.id], **days}, format="json")
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+        assert response.data["user_ids"] == [outsider.id]
+        assert api_client.post(url, {"team_id": other.id, **days}, format="json").status_code == 403
+        assert not TeamStatus.objects.exists()
+
+    def test_invalid_requests(self, api_client, manager, members, team):
+        api_client.force_authenticate(user=manager)
+        url = reverse("team-status-range")
+        base = {"team_id": team.id, "status": "pto", "date_from": "2024-01-10", "date_to": "2024-01-12"}
+
+        assert api_client.post(url, {**base, "status": "holiday"}, format="json").status_code == 400
+        assert api_client.post(url, {**base, "date_to": "2024-01-01"}, format="json").status_code == 400
+        assert api_client.post(url, {**base, "date_to": "2026-01-01"}, format="json").status_code == 400
+        assert api_client.post(url, {**base, "user_ids": [members[0].id]}, format="json").status_code == 400
+        assert api_client.post(url, {**base, "date_from": "soon"}, format="json").status_code == 400
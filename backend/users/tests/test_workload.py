@@ -0,0 +1,188 @@
+from datetime import datetime, time, timedelta
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from users.models import Task, Team, WorkingHours
+from users.workload import WeeklySchedule, _build_workload
+
+User = get_user_model()
+
+OFFICE_HOURS = {day: (time(9), time(17)) for day in range(5)}
+
+
+def at(day, hour, minute=0):
+    return timezone.make_aware(datetime.combine(day, time(hour, minute)))
+
+
+# A Monday
+MONDAY = datetime(2024, 6, 3).date()
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture
+def team():
+    return Team.objects.create(name="Workload Team")
+
+
+@pytest.fixture
+def manager(team):
+    return User.objects.create_user(
+        email="workload-manager@example.com",
+        password="password",
+        first_name="Workload",
+        last_name="Manager",
+        phone_number="+1234567850",
+        role="manager",
+        team=team,
+    )
+
+
+@pytest.fixture
+def member(team):
+    user = User.objects.create_user(
+        email="workload-member@example.com",
+        password="password",
+        first_name="Workload",
+        last_name="Member",
+        phone_number="+1234567851",
+        role="user",
+        team=team,
+    )
+    WorkingHours.objects.bulk_create(
+        WorkingHours(user=user, day_of_week=day, start_time=start, end_time=end)
+        for day, (start, end) in OFFICE_HOURS.items()
+    )
+    return user
+
+
+def _member(user):
+    return {"id": user.id, "full_name": user.full_name, "role": user.role}
+
+
+def make_task(creator, assignee, estimate, progress=0, due_date=None):
+    return Task.objects.create(
+        title="Work",
+        created_by=creator,
+        assigned_to=assignee,
+        estimated_duration=estimate,
+        progress=progress,
+        due_date=due_date,
+    )
+
+
+class TestWeeklySchedule:
+    def test_hours_between_expands_whole_weeks(self):
+        schedule = WeeklySchedule(OFFICE_HOURS)
+        assert schedule.week_hours == 40
+        assert schedule.hours_between(at(MONDAY, 10), at(MONDAY, 12)) == 2
+        # Rest of Monday, Tuesday to Friday, then Monday 9-12
+        assert schedule.hours_between(at(MONDAY, 10), at(MONDAY + timedelta(days=7), 12)) == 7 + 32 + 3
+        assert schedule.hours_between(at(MONDAY, 10), at(MONDAY + timedelta(days=70), 10)) == 400
+        # Weekends and evenings add nothing
+        assert schedule.hours_between(at(MONDAY, 18), at(MONDAY + timedelta(days=6), 20)) == 32
+        assert schedule.hours_between(at(MONDAY, 12), at(MONDAY, 10)) == 0
+
+
+@pytest.mark.django_db
+class TestTeamWorkload:
+    def test_deadlines_are_checked_in_order(self, manager, member, team):
+        # 8h due Tuesday noon fits in Monday 10-17 plus Tuesday 9-12 (10h)...
+        make_task(manager, member, 8, due_date=at(MONDAY + timedelta(days=1), 12))
+        # ...but 8h more by Tuesday 17:00 (15h available) does not, even at 50% done
+        make_task(manager, member, 16, progress=50, due_date=at(MONDAY + timedelta(days=1), 17))
+        make_task(manager, member, 5)
+        make_task(manager, member, 100, progress=100, due_date=at(MONDAY, 11))
+        # No working hours at all: any dated work is an overload
+        make_task(manager, manager, 1, due_date=at(MONDAY + timedelta(days=30), 12))
+
+        rows = {row["id"]: row for row in _build_workload(team.id, [_member(member), _member(manager)], at(MONDAY, 10))}
+        assert rows[member.id]["remaining_hours"] == 21
+        assert rows[member.id]["undated_hours"] == 5
+        assert rows[member.id]["weekly_hours"] == 40
+        assert rows[member.id]["overloaded"] is True
+        assert rows[member.id]["shortfall_hours"] == 1
+        assert rows[member.id]["first_overloaded_due"] == at(MONDAY + timedelta(days=1), 17)
+        assert rows[manager.id]["overloaded"] is True
+        assert rows[manager.id]["shortfall_hours"] == 1
+
+    def test_manager_endpoint_is_cached_until_tasks_change(
+        self, api_client, manager, member, team, django_assert_num_queries, django_capture_on_commit_callbacks
+    ):
+        task = make_task(manager, member, 4, due_date=timezone.now() + timedelta(days=365))
+        api_client.force_authenticate(user=manager)
+        url = reverse("team-workload")
+
+        response = api_client.get(url)
+        assert response.status_code == status.HTTP_200_OK
+        rows = {row["id"]: row for row in response.data["members"]}
+        assert rows[member.id]["remaining_hours"] == 4
+        assert rows[member.id]["overloaded"] is False
+
+        with django_assert_num_queries(0):
+            api_client.get(url)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            api_client.put(reverse("task-detail", kwargs={"pk": task.pk}), {"progress": 50}, format="json")
+        rows = {row["id"]: row for row in api_client.get(url).data["members"]}
+        assert rows[member.id]["remaining_hours"] == 2
+
+    def test_large_team_in_a_fixed_number_of_queries(self, api_client, manager, team, django_assert_max_num_queries):
+        users = User.objects.bulk_create(
+            User(
+                email=f"load{i}@example.com",
+                first_name="Load",
+                last_name=str(i),
+                phone_number=f"+33{i:09d}",
+                team=team,
+            )
+            for i in range(200)
+        )
+        due = timezone.now() + timedelta(days=30)
+        Task.objects.bulk_create(
+            Task(
+                title=f"Task {i}",
+                created_by=manager,
+                assigned_to=users[i % 200],
+                team=team,
+                estimated_duration=1,
+                due_date=due + timedelta(hours=i % 7),
+            )
+            for i in range(3000)
+        )
+        api_client.force_authenticate(user=manager)
+
+        with django_assert_max_num_queries(5):
+            response = api_client.get(reverse("team-workload"))
+        rows = {row["id"]: row for row in response.data["members"]}
+        assert len(rows) == 201
+        assert rows[users[0].id]["remaining_hours"] == 15
+
+    def test_permissions(self, api_client, manager, member, team):
+        admin = User.objects.create_user(
+            email="workload-admin@example.com",
+            password="password",
+            first_name="Workload",
+            last_name="Admin",
+            phone_number="+1234567852",
+            role="admin",
+        )
+        other = Team.objects.create(name="Other Workload Team")
+        url = reverse("team-workload")
+
+        api_client.force_authenticate(user=member)
+        assert api_client.get(url).status_code == status.HTTP_403_FORBIDDEN
+        api_client.force_authenticate(user=manager)
+        assert api_client.get(url, {"team_id": other.id}).status_code == status.HTTP_403_FORBIDDEN
+        api_client.force_authenticate(user=admin)
+        assert api_client.get(url).status_code == status.HTTP_400_BAD_REQUEST
+        assert api_client.get(url, {"team_id": 999999}).status_code == status.HTTP_404_NOT_FOUND
+        assert api_client.get(url, {"team_id": team.id}).data["team_id"] == team.id
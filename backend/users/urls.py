@@ -3,6 +3,7 @@ from django.urls import path
 from .views import (
     AdminAssignTeamView,
     AdminResetPasswordView,
+    BulkAssignTeamView,
     ChangePasswordView,
     ClockInView,
     ClockOutView,
@@ -10,6 +11,7 @@ from .views import (
     ConversationListCreateView,
     ConversationMessagesView,
     DeleteAccountView,
+    KioskPunchIngestView,
     LoginView,
     MessageDetailView,
     MeView,
@@ -17,16 +19,23 @@ from .views import (
     MyTodayStatusView,
     RegisterView,
     StartDirectConversationView,
+    TaskBulkUpdateView,
     TaskDetailView,
     TaskListCreateView,
+    TaskPlanView,
+    TaskSearchView,
     TeamConversationView,
     TeamDetailView,
     TeamListCreateView,
     TeamMembersView,
     TeamMemberTimeEntriesView,
     TeamReportsView,
+    TeamStatusRangeView,
     TeamStatusSetView,
+    TeamTimeEntryBatchUpsertView,
     TeamTimeEntryUpsertView,
+    TeamWorkloadView,
+    TimeEntryExportView,
     TimeEntryListView,
     UpdateUserView,
     UserListCreateView,
@@ -45,19 +54,28 @@ urlpatterns = [
     path("clock-in/", ClockInView.as_view(), name="clock-in"),
     path("clock-out/", ClockOutView.as_view(), name="clock-out"),
     path("time-entries/", TimeEntryListView.as_view(), name="time-entries"),
+    path("kiosk/punches/", KioskPunchIngestView.as_view(), name="kiosk-punches"),
+    path("time-entries/export/", TimeEntryExportView.as_view(), name="time-entries-export"),
     path("teams/", TeamListCreateView.as_view(), name="team-list-create"),
     path("teams/<int:pk>/", TeamDetailView.as_view(), name="team-detail"),
     path("team/members/", TeamMembersView.as_view(), name="team-members"),
     path("team/assign/", AdminAssignTeamView.as_view(), name="admin-assign-team"),
+    path("team/assign/bulk/", BulkAssignTeamView.as_view(), name="bulk-assign-team"),
     path("team/members/<int:user_id>/time-entries/", TeamMemberTimeEntriesView.as_view(), name="team-member-entries"),
     path("team/members/<int:user_id>/working-hours/", WorkingHoursView.as_view(), name="working-hours"),
     path("team/status/", TeamStatusSetView.as_view(), name="team-status-set"),
+    path("team/status/range/", TeamStatusRangeView.as_view(), name="team-status-range"),
     path("team/time-entry/", TeamTimeEntryUpsertView.as_view(), name="team-time-entry-upsert"),
+    path("team/time-entries/batch/", TeamTimeEntryBatchUpsertView.as_view(), name="team-time-entry-batch-upsert"),
     path("team/reports/", TeamReportsView.as_view(), name="team-reports"),
+    path("team/workload/", TeamWorkloadView.as_view(), name="team-workload"),
     path("me/status/", MyTodayStatusView.as_view(), name="my-today-status"),
     path("me/team/", MyTeamView.as_view(), name="my-team"),
     path("tasks/", TaskListCreateView.as_view(), name="task-list-create"),
     path("tasks/<int:pk>/", TaskDetailView.as_view(), name="task-detail"),
+    path("tasks/bulk/", TaskBulkUpdateView.as_view(), name="task-bulk-update"),
+    path("tasks/search/", TaskSearchView.as_view(), name="task-search"),
+    path("tasks/plan/", TaskPlanView.as_view(), name="task-plan"),
     # Chat endpoints
     path("chat/conversations/", ConversationListCreateView.as_view(), name="conversation-list"),
     path("chat/conversations/<int:conversation_id>/", ConversationDetailView.as_view(), name="conversation-detail"),
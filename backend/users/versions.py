@@ -0,0 +1,141 @@
+"""Per-scope version counters backing ETags on frequently refetched lists.
+
+Each scope ("the presence of team 3", "user 7's tasks", "conversation 12") has a
+counter in the cache. Views answering a list compute their ETag from the
+counters of the scopes the list depends on, so a matching ``If-None-Match`` is
+answered with a 304 before any of the listed rows are loaded. Writers bump the
+scopes they touch once their transaction commits.
+
+Counters start at a random value, so a flushed or evicted counter never comes
+back at a value an old ETag was computed from.
+"""
+
+import hashlib
+import secrets
+
+from django.core.cache import cache
+from django.utils import timezone
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.response import Response
+
+# Users and teams: names, roles and team membership
+DIRECTORY_SCOPE = "directory"
+# Presence (clock state and day status) of every user
+PRESENCE_SCOPE = "presence"
+# Every task, for admins
+TASKS_SCOPE = "tasks"
+
+
+def presence_scope(team_id) -> str:
+    return f"presence:team:{team_id or 'none'}"
+
+
+def user_tasks_scope(user_id) -> str:
+    return f"tasks:user:{user_id}"
+
+
+def team_tasks_scope(team_id) -> str:
+    return f"tasks:team:{team_id}"
+
+
+def conversation_scope(conversation_id) -> str:
+    return f"conversation:{conversation_id}"
+
+
+def conversation_list_scope(user_id) -> str:
+    return f"conversations:user:{user_id}"
+
+
+def working_hours_scope(user_id) -> str:
+    return f"working_hours:{user_id}"
+
+
+def _key(scope) -> str:
+    return f"users:version:{scope}"
+
+
+def _seed() -> int:
+    return secrets.randbits(48)
+
+
+def get_versions(scopes):
+    """Return the current counter of each scope, in order, seeding missing ones."""
+    keys = [_key(scope) for scope in scopes]
+    found = cache.get_many(keys)
+    for key in keys:
+        if key not in found:
+            cache.add(key, _seed(), None)
+            found[key] = cache.get(key)
+    return [found[key] for key in keys]
+
+
+def bump(*scopes):
+    """Move each scope to a new version. Call after the write has committed."""
+    for scope in set(scopes):
+        try:
+            cache.incr(_key(scope))
+        except ValueError:
+            cache.set(_key(scope), _seed(), None)
+
+
+def bump_presence(team_ids):
+    bump(PRESENCE_SCOPE, *(presence_scope(team_id) for team_id in team_ids))
+
+
+def bump_tasks(users):
+    """Bump the task lists of ``users`` (assignees and creators), their teams' and the admins' one."""
+    scopes = [TASKS_SCOPE]
+    for user in users:
+        scopes.append(user_tasks_scope(user.id))
+        if user.team_id:
+            scopes.append(team_tasks_scope(user.team_id))
+    bump(*scopes)
+
+
+def bump_conversation(conversation_id, participant_ids):
+    bump(conversation_scope(conversation_id), *(conversation_list_scope(user_id) for user_id in participant_ids))
+
+
+def list_etag(request, scopes):
+    """Weak ETag of ``request`` for the current versions of ``scopes``.
+
+    The user, path and query string are part of the tag, as is today's date
+    since listings carry the day's status.
+    """
+    user = request.user
+    parts = [
+        request.path,
+        request.META.get("QUERY_STRING", ""),
+        str(user.id),
+        user.role,
+        str(user.team_id),
+        timezone.localdate().isoformat(),
+        *(f"{scope}={version}" for scope, version in zip(scopes, get_versions(scopes), strict=True)),
+    ]
+    digest = hashlib.sha1("\n".join(parts).encode()).hexdigest()
+    return f'W/"{digest}"'
+
+
+def _matches(etag, if_none_match) -> bool:
+    if not if_none_match:
+        return False
+    # If-None-Match uses the weak comparison
+    candidates = parse_etags(if_none_match)
+    return "*" in candidates or etag.removeprefix("W/") in {c.removeprefix("W/") for c in candidates}
+
+
+def conditional_list(request, scopes, build):
+    """Answer ``If-None-Match`` with a 304 when ``scopes`` did not change, else return ``build()`` tagged."""
+    etag = list_etag(request, scopes)
+    if _matches(etag, request.headers.get("If-None-Match")):
+        response = Response(status=status.HTTP_304_NOT_MODIFIED)
+    else:
+        response = build()
+        if response.status_code != status.HTTP_200_OK:
+            return response
+    response["ETag"] = etag
+    # Let browsers keep the body but revalidate it on every request
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
@@ -1,4 +1,6 @@
-from django.db import models
+from django.db import IntegrityError, models, transaction
+from django.db.models.functions import Greatest
+from django.http import Http404, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
 from rest_framework import generics, permissions, serializers, status
@@ -8,8 +10,13 @@ from rest_framework.views import APIView
 from rest_framework_simplejwt.authentication import JWTAuthentication
 from rest_framework_simplejwt.tokens import RefreshToken
 
+from .clock_events import enqueue_clock_ins
+from .directory import DIRECTORY_ORDERING, filter_directory, filter_directory_rows
+from .exports import EXPORT_FORMATS, export_queryset, iter_export
+from .kiosk import ingest_punches
 from .models import (
     Conversation,
+    DailyTimeSummary,
     Message,
     Task,
     Team,
@@ -18,6 +25,10 @@ from .models import (
     User,
     WorkingHours,
 )
+from .pagination import InvalidPageParameter, keyset_paginate, keyset_paginate_rows, parse_date_param, parse_limit
+from .presence import forget_presence, get_presence, record_clock_in, record_clock_out, record_status
+from .rollups import affected_dates, local_midnight, refresh_daily_summaries, sync_late_flags
+from .schedules import invalidate_schedule
 from .serializers import (
     ConversationSerializer,
     MessageSerializer,
@@ -27,28 +38,104 @@ from .serializers import (
     UserSerializer,
     WorkingHoursSerializer,
 )
+from .task_plans import get_task_plans
+from .task_updates import MAX_BULK_TASKS, update_tasks
+from .tasks import SEARCH_ORDERING, TASK_ORDERING, TaskPolicy, filter_tasks, search_tasks
+from .team_assignment import MAX_BULK_ASSIGN, assign_users_to_team
+from .team_snapshots import get_team_snapshot, member_info
+from .team_statuses import MAX_STATUS_DAYS, MAX_STATUS_ROWS, mark_status_range
+from .versions import (
+    DIRECTORY_SCOPE,
+    PRESENCE_SCOPE,
+    TASKS_SCOPE,
+    bump,
+    bump_conversation,
+    bump_tasks,
+    conditional_list,
+    conversation_list_scope,
+    conversation_scope,
+    presence_scope,
+    team_tasks_scope,
+    user_tasks_scope,
+    working_hours_scope,
+)
+from .workload import get_team_workload
+
+TEAM_MANAGER_ROLES = ["manager", "admin"]
+
+
+def _with_team_listing(teams):
+    """Annotate the member count and prefetch the managers so TeamSerializer lists T teams in two queries."""
+    return teams.annotate(annotated_members_count=models.Count("members")).prefetch_related(
+        models.Prefetch(
+            "members",
+            queryset=User.objects.filter(role__in=TEAM_MANAGER_ROLES).order_by("id"),
+            to_attr="prefetched_managers",
+        )
+    )
 
 
 class TeamSerializer(serializers.ModelSerializer):
-    members_count = serializers.IntegerField(source="members.count", read_only=True)
+    members_count = serializers.SerializerMethodField()
     managers = serializers.SerializerMethodField()
 
     class Meta:
         model = Team
         fields = ["id", "name", "description", "created_at", "members_count", "managers"]
 
+    def get_members_count(self, obj):
+        # Teams not loaded through _with_team_listing (e.g. just created) fall back to a query
+        if hasattr(obj, "annotated_members_count"):
+            return obj.annotated_members_count
+        return obj.members.count()
+
     def get_managers(self, obj):
-        return [
-            {"id": m.id, "full_name": m.full_name, "email": m.email}
-            for m in obj.members.filter(role__in=["manager", "admin"])
-        ]
+        if hasattr(obj, "prefetched_managers"):
+            managers = obj.prefetched_managers
+        else:
+            managers = obj.members.filter(role__in=TEAM_MANAGER_ROLES).order_by("id")
+        return [{"id": m.id, "full_name": m.full_name, "email": m.email} for m in managers]
+
+
+# ---- Permissions ----
+class IsManagerOrAdmin(BasePermission):
+    def has_permission(self, request, view):
+        return bool(request.user and request.user.is_authenticated and request.user.role in ["manager", "admin"])
+
+
+class IsAdmin(BasePermission):
+    def has_permission(self, request, view):
+        return bool(request.user and request.user.is_authenticated and request.user.role == "admin")
+
+
+def _directory_page(request, users, serialize):
+    """One keyset page of ``users`` in directory order, filtered by the q/team_id/role query parameters."""
+    try:
+        limit = parse_limit(request.query_params.get("limit"))
+        users = filter_directory(users, request.query_params)
+        rows, next_cursor = keyset_paginate(
+            users, DIRECTORY_ORDERING, cursor=request.query_params.get("cursor"), limit=limit
+        )
+    except InvalidPageParameter as exc:
+        return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
 
+    return Response({"results": serialize(rows), "next_cursor": next_cursor}, status=status.HTTP_200_OK)
 
-# === Liste et création des utilisateurs ===
+
+# === Liste et création des utilisateurs (admin) ===
 class UserListCreateView(generics.ListCreateAPIView):
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [permissions.IsAuthenticated, IsAdmin]
     queryset = User.objects.all()
     serializer_class = UserSerializer
 
+    def list(self, request, *args, **kwargs):
+        return _directory_page(request, self.get_queryset(), lambda rows: UserSerializer(rows, many=True).data)
+
+    def perform_create(self, serializer):
+        serializer.save()
+        transaction.on_commit(lambda: bump(DIRECTORY_SCOPE))
+
 
 # === Inscription ===
 class RegisterView(APIView):
@@ -56,6 +143,7 @@ class RegisterView(APIView):
         serializer = UserSerializer(data=request.data)
         if serializer.is_valid():
             serializer.save()
+            transaction.on_commit(lambda: bump(DIRECTORY_SCOPE))
             return Response({"message": "✅ User registered successfully!"}, status=status.HTTP_201_CREATED)
         print("REGISTER ERRORS:", serializer.errors)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -111,6 +199,7 @@ class UpdateUserView(APIView):
         serializer = UserSerializer(user, data=request.data, partial=True)
         if serializer.is_valid():
             serializer.save()
+            transaction.on_commit(lambda: bump(DIRECTORY_SCOPE))
             return Response(serializer.data)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -170,6 +259,7 @@ class DeleteAccountView(APIView):
     def delete(self, request):
         user = request.user
         user.delete()
+        transaction.on_commit(lambda: bump(DIRECTORY_SCOPE))
         return Response({"message": "✅ Account deleted successfully."}, status=200)
 
 
@@ -179,36 +269,22 @@ class ClockInView(APIView):
 
     def post(self, request):
         user = request.user
+        now = timezone.now()
 
-        # Prevent starting a new session if one is already open
-        open_entry = TimeEntry.objects.filter(user=user, clock_out__isnull=True).order_by("-clock_in").first()
-        if open_entry:
+        # A single insert: the (user, is_open) unique constraint rejects a second open session,
+        # even when two clock-ins race each other. Lateness is evaluated off-request by the
+        # process_clock_events worker.
+        try:
+            with transaction.atomic():
+                entry = TimeEntry.objects.create(user=user, clock_in=now)
+                enqueue_clock_ins([(user.id, now)])
+                transaction.on_commit(lambda: record_clock_in(user, now))
+        except IntegrityError:
             return Response(
                 {"error": "You are already clocked in. Clock out before clocking in again."},
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        now = timezone.now()
-        entry = TimeEntry.objects.create(user=user, clock_in=now)
-
-        # Check for lateness based on WorkingHours
-        local_now = timezone.localtime(now)
-        current_day = local_now.weekday()  # 0=Monday, 6=Sunday
-
-        try:
-            wh = WorkingHours.objects.get(user=user, day_of_week=current_day)
-            # Check if clock-in is strictly after start time
-            # We can add a small grace period if needed, but user asked for "required time"
-            if local_now.time() > wh.start_time:
-                # Mark as late
-                TeamStatus.objects.update_or_create(
-                    user=user,
-                    date=local_now.date(),
-                    defaults={"status": "late", "note": f"Late arrival (Expected: {wh.start_time.strftime('%H:%M')})"},
-                )
-        except WorkingHours.DoesNotExist:
-            pass
-
         return Response(
             {"message": "✅ Clocked in successfully.", "entry": TimeEntrySerializer(entry).data},
             status=status.HTTP_200_OK,
@@ -222,17 +298,21 @@ class ClockOutView(APIView):
     def post(self, request):
         user = request.user
 
-        # Close the latest open session
-        entry = TimeEntry.objects.filter(user=user, clock_out__isnull=True).order_by("-clock_in").first()
-        if not entry:
-            return Response(
-                {"error": "You are not clocked in."},
-                status=status.HTTP_400_BAD_REQUEST,
-            )
+        with transaction.atomic():
+            # The open session is found through the (user, is_open) unique index and locked,
+            # so two concurrent clock-outs cannot both close it.
+            entry = TimeEntry.objects.select_for_update().filter(user=user, is_open=True).first()
+            if not entry:
+                return Response(
+                    {"error": "You are not clocked in."},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
 
-        entry.clock_out = timezone.now()
-        entry.compute_total_hours()
-        entry.save()
+            entry.clock_out = timezone.now()
+            entry.compute_total_hours()
+            entry.save(update_fields=["clock_out", "total_hours"])
+            refresh_daily_summaries({user.id: affected_dates(entry.clock_in, entry.clock_out)})
+            transaction.on_commit(lambda: record_clock_out(user))
 
         return Response(
             {"message": "✅ Clocked out successfully.", "entry": TimeEntrySerializer(entry).data},
@@ -240,24 +320,36 @@ class ClockOutView(APIView):
         )
 
 
-class TimeEntryListView(APIView):
-    authentication_classes = [JWTAuthentication]
-    permission_classes = [permissions.IsAuthenticated]
+def _time_entry_page(request, entries):
+    """One keyset page of ``entries`` (newest first), filtered by the optional local from/to dates."""
+    try:
+        limit = parse_limit(request.query_params.get("limit"))
+        date_from = parse_date_param(request.query_params.get("from"), "from")
+        date_to = parse_date_param(request.query_params.get("to"), "to")
 
-    def get(self, request):
-        entries = TimeEntry.objects.filter(user=request.user).order_by("-clock_in")[:200]
-        return Response(TimeEntrySerializer(entries, many=True).data, status=status.HTTP_200_OK)
+        if date_from:
+            entries = entries.filter(work_date__gte=date_from)
+        if date_to:
+            entries = entries.filter(work_date__lte=date_to)
 
+        rows, next_cursor = keyset_paginate(
+            entries, ("-clock_in", "-id"), cursor=request.query_params.get("cursor"), limit=limit
+        )
+    except InvalidPageParameter as exc:
+        return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
 
-# ---- Permissions ----
-class IsManagerOrAdmin(BasePermission):
-    def has_permission(self, request, view):
-        return bool(request.user and request.user.is_authenticated and request.user.role in ["manager", "admin"])
+    return Response(
+        {"results": TimeEntrySerializer(rows, many=True).data, "next_cursor": next_cursor},
+        status=status.HTTP_200_OK,
+    )
 
 
-class IsAdmin(BasePermission):
-    def has_permission(self, request, view):
-        return bool(request.user and request.user.is_authenticated and request.user.role == "admin")
+class TimeEntryListView(APIView):
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        return _time_entry_page(request, TimeEntry.objects.filter(user=request.user))
 
 
 def _is_in_manager_team(manager_user, target_user) -> bool:
@@ -273,37 +365,80 @@ class TeamMembersView(APIView):
     permission_classes = [permissions.IsAuthenticated, IsManagerOrAdmin]
 
     def get(self, request):
-        today = timezone.localdate()
-
-        # Admin or Manager: return list of members in their team (or all appropriate context)
-        # For Admin: list all users? Or maybe list by team?
-        # The frontend expects a flat list for "Manage Team" view, but now we have explicit teams.
-        # Let's adapt: if Admin, return ALL users. If Manager, return ONLY team members.
+        # Admin: every user, paged from the database. Manager: their team, projected from its
+        # snapshot, plus unassigned users, paged from the database.
+        # Paginated, and filtered server-side with ?q=<prefix>&team_id=<id|none>&role=<role,...>.
+        # The ETag follows the directory and the presence of every listed team
         if request.user.role == "admin":
-            users_qs = User.objects.all().select_related("team").order_by("last_name", "first_name")
-        elif request.user.role == "manager":
-            if not request.user.team_id:
-                users_qs = User.objects.none()
-            else:
-                # Show team members AND unassigned users (potential recruits)
-                users_qs = User.objects.filter(
-                    models.Q(team_id=request.user.team_id) | models.Q(team_id__isnull=True)
-                ).order_by("last_name", "first_name")
-        else:
-            return Response({"error": "Unauthorized"}, status=403)
-
-        # open session info
-        open_entries = TimeEntry.objects.filter(user__in=users_qs, clock_out__isnull=True)
-        open_map = {e.user_id: e for e in open_entries}
+            return conditional_list(request, [DIRECTORY_SCOPE, PRESENCE_SCOPE], lambda: self._all_users_page(request))
+        if request.user.role == "manager":
+            scopes = [DIRECTORY_SCOPE, presence_scope(request.user.team_id), presence_scope(None)]
+            return conditional_list(request, scopes, lambda: self._team_page(request))
+        return Response({"error": "Unauthorized"}, status=403)
 
-        status_qs = TeamStatus.objects.filter(user__in=users_qs, date=today)
-        status_map = {s.user_id: s for s in status_qs}
+    def _team_page(self, request):
+        if not request.user.team_id:
+            return Response({"results": [], "next_cursor": None}, status=status.HTTP_200_OK)
+        # Show team members AND unassigned users (potential recruits): the team from its snapshot, the
+        # unassigned users, an unbounded set, from the directory index. Each source yields up to limit + 1
+        # rows after the cursor, enough to fill the merged page and tell whether another one follows.
+        params = request.query_params
+        snapshot = get_team_snapshot(request.user.team_id)
+        try:
+            limit = parse_limit(params.get("limit"))
+            members, _ = keyset_paginate_rows(
+                filter_directory_rows(snapshot["members"], params),
+                User,
+                DIRECTORY_ORDERING,
+                cursor=params.get("cursor"),
+                limit=limit + 1,
+            )
+            recruits, _ = keyset_paginate(
+                filter_directory(User.objects.filter(team__isnull=True), params).only(
+                    "id", "first_name", "last_name", "email", "role", *DIRECTORY_ORDERING
+                ),
+                DIRECTORY_ORDERING,
+                cursor=params.get("cursor"),
+                limit=limit + 1,
+            )
+        except InvalidPageParameter as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
 
-        data = []
-        for u in users_qs:
-            open_entry = open_map.get(u.id)
-            status_obj = status_map.get(u.id)
-            data.append(
+        # The rows keep their sort columns until the two sources are merged
+        sort_columns = [name for name in DIRECTORY_ORDERING if name != "id"]
+        presence = get_presence(u.id for u in recruits)
+        rows = [
+            {
+                **member_info(m),
+                "team_id": m["team_id"],
+                "team_name": snapshot["team_name"],
+                **{name: m[name] for name in sort_columns},
+            }
+            for m in members
+        ]
+        rows += [
+            {
+                "id": u.id,
+                "full_name": u.full_name,
+                "email": u.email,
+                "role": u.role,
+                "is_clocked_in": presence[u.id]["open_clock_in"] is not None,
+                **presence[u.id],
+                "team_id": None,
+                "team_name": None,
+                **{name: getattr(u, name) for name in sort_columns},
+            }
+            for u in recruits
+        ]
+        rows, next_cursor = keyset_paginate_rows(rows, User, DIRECTORY_ORDERING, limit=limit)
+        results = [{name: value for name, value in row.items() if name not in sort_columns} for row in rows]
+        return Response({"results": results, "next_cursor": next_cursor}, status=status.HTTP_200_OK)
+
+    def _all_users_page(self, request):
+        def serialize(users):
+            # open session + today's status, from the presence cache
+            presence = get_presence(u.id for u in users)
+            return [
                 {
                     "id": u.id,
                     "full_name": u.full_name,
@@ -311,14 +446,13 @@ class TeamMembersView(APIView):
                     "role": u.role,
                     "team_id": u.team_id,
                     "team_name": u.team.name if u.team else None,
-                    "is_clocked_in": bool(open_entry),
-                    "open_clock_in": open_entry.clock_in.isoformat() if open_entry else None,
-                    "today_status": status_obj.status if status_obj else "normal",
-                    "today_status_note": status_obj.note if status_obj else "",
+                    "is_clocked_in": presence[u.id]["open_clock_in"] is not None,
+                    **presence[u.id],
                 }
-            )
+                for u in users
+            ]
 
-        return Response(data, status=status.HTTP_200_OK)
+        return _directory_page(request, User.objects.select_related("team"), serialize)
 
 
 # ---- Team Manager: view a specific user's time history ----
@@ -332,8 +466,43 @@ class TeamMemberTimeEntriesView(APIView):
         if request.user.role != "admin" and not _is_in_manager_team(request.user, target):
             return Response({"error": "Not allowed."}, status=status.HTTP_403_FORBIDDEN)
 
-        entries = TimeEntry.objects.filter(user=target).order_by("-clock_in")[:300]
-        return Response(TimeEntrySerializer(entries, many=True).data, status=status.HTTP_200_OK)
+        return _time_entry_page(request, TimeEntry.objects.filter(user=target))
+
+
+# ---- Manager/Admin: stream time entries for payroll (CSV or NDJSON) ----
+class TimeEntryExportView(APIView):
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [permissions.IsAuthenticated, IsManagerOrAdmin]
+
+    def get(self, request):
+        # "format" is reserved by DRF for renderer negotiation
+        file_format = request.query_params.get("file_format", "csv")
+        if file_format not in EXPORT_FORMATS:
+            return Response({"error": "file_format must be csv or ndjson."}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            team_id = int(request.query_params["team_id"]) if request.query_params.get("team_id") else None
+            user_id = int(request.query_params["user_id"]) if request.query_params.get("user_id") else None
+        except ValueError:
+            return Response({"error": "team_id and user_id must be integers."}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            date_from = parse_date_param(request.query_params.get("from"), "from")
+            date_to = parse_date_param(request.query_params.get("to"), "to")
+        except InvalidPageParameter as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Managers can only export their own team
+        if request.user.role != "admin":
+            if not request.user.team_id or (team_id is not None and team_id != request.user.team_id):
+                return Response({"error": "Not allowed."}, status=status.HTTP_403_FORBIDDEN)
+            team_id = request.user.team_id
+
+        entries = export_queryset(team_id=team_id, user_id=user_id, date_from=date_from, date_to=date_to)
+        content_type = "text/csv" if file_format == "csv" else "application/x-ndjson"
+        response = StreamingHttpResponse(iter_export(file_format, entries), content_type=content_type)
+        response["Content-Disposition"] = f'attachment; filename="time-entries.{file_format}"'
+        return response
 
 
 # ---- Manager/Admin: view/set working hours for a team member ----
@@ -348,8 +517,11 @@ class WorkingHoursView(APIView):
         if request.user.role != "admin" and not _is_in_manager_team(request.user, target):
             return Response({"error": "Not allowed."}, status=status.HTTP_403_FORBIDDEN)
 
-        hours = WorkingHours.objects.filter(user=target)
-        return Response(WorkingHoursSerializer(hours, many=True).data, status=status.HTTP_200_OK)
+        def build():
+            hours = WorkingHours.objects.filter(user=target)
+            return Response(WorkingHoursSerializer(hours, many=True).data, status=status.HTTP_200_OK)
+
+        return conditional_list(request, [working_hours_scope(target.id)], build)
 
     def put(self, request, user_id: int):
         """Set working hours for a user. Expects array of day schedules."""
@@ -380,6 +552,8 @@ class WorkingHoursView(APIView):
             except Exception:
                 continue  # Skip invalid entries
 
+        invalidate_schedule(target.id)
+        transaction.on_commit(lambda: bump(working_hours_scope(target.id)))
         return Response(WorkingHoursSerializer(created, many=True).data, status=status.HTTP_200_OK)
 
 
@@ -397,7 +571,7 @@ class TeamStatusSetView(APIView):
         if not user_id or not status_value:
             return Response({"error": "user_id and status are required."}, status=400)
 
-        if status_value not in ["normal", "late", "pto"]:
+        if status_value not in ["normal", "late", "pto", "absent"]:
             return Response({"error": "Invalid status."}, status=400)
 
         target = get_object_or_404(User, id=user_id)
@@ -417,10 +591,72 @@ class TeamStatusSetView(APIView):
             date=date_obj,
             defaults={"status": status_value, "note": note},
         )
+        sync_late_flags([target.id], [date_obj])
+        transaction.on_commit(lambda: record_status(target, date_obj, status_value, note))
 
         return Response(TeamStatusSerializer(obj).data, status=200)
 
 
+# ---- Manager/Admin: set a status over a date range for many users (team PTO, holidays) ----
+class TeamStatusRangeView(APIView):
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [permissions.IsAuthenticated, IsManagerOrAdmin]
+
+    def post(self, request):
+        status_value = request.data.get("status")
+        note = request.data.get("note", "")
+        user_ids = request.data.get("user_ids")
+        team_id = request.data.get("team_id")
+
+        if status_value not in ["normal", "late", "pto", "absent"]:
+            return Response({"error": "Invalid status."}, status=400)
+        if (user_ids is None) == (team_id is None):
+            return Response({"error": "Provide either user_ids or team_id."}, status=400)
+
+        try:
+            date_from = parse_date_param(request.data.get("date_from"), "date_from")
+            date_to = parse_date_param(request.data.get("date_to"), "date_to")
+        except InvalidPageParameter as exc:
+            return Response({"error": str(exc)}, status=400)
+        if not date_from or not date_to or date_to < date_from:
+            return Response({"error": "date_from and date_to are required, with date_from <= date_to."}, status=400)
+        days = (date_to - date_from).days + 1
+        if days > MAX_STATUS_DAYS:
+            return Response({"error": f"At most {MAX_STATUS_DAYS} days per request."}, status=400)
+
+        try:
+            if team_id is not None:
+                team_id = int(team_id)
+                targets = dict(User.objects.filter(team_id=team_id).values_list("id", "team_id"))
+            elif isinstance(user_ids, list) and user_ids:
+                user_ids = {int(user_id) for user_id in user_ids}
+                targets = dict(User.objects.filter(id__in=user_ids).values_list("id", "team_id"))
+                missing = user_ids - targets.keys()
+                if missing:
+                    return Response({"error": "Unknown users.", "user_ids": sorted(missing)}, status=404)
+            else:
+                return Response({"error": "user_ids must be a non-empty list."}, status=400)
+        except (TypeError, ValueError):
+            return Response({"error": "user_ids and team_id must be integers."}, status=400)
+
+        if request.user.role != "admin":
+            outsiders = sorted(uid for uid, current in targets.items() if current != request.user.team_id)
+            if not request.user.team_id or outsiders or (team_id is not None and team_id != request.user.team_id):
+                return Response({"error": "Not allowed.", "user_ids": outsiders}, status=403)
+
+        if len(targets) * days > MAX_STATUS_ROWS:
+            return Response({"error": f"At most {MAX_STATUS_ROWS} user-days per request."}, status=400)
+
+        written = mark_status_range(targets, date_from, date_to, status_value, note)
+        return Response({"users": len(targets), "days": days, "written": written}, status=200)
+
+
+def _parse_iso_datetime(value):
+    parsed = timezone.datetime.fromisoformat(value.replace("Z", "+00:00"))
+    # Naive values are local wall-clock times, as Django would store them anyway
+    return timezone.make_aware(parsed) if timezone.is_naive(parsed) else parsed
+
+
 # ---- Manager/Admin: create or fix a time entry for a team member ----
 class TeamTimeEntryUpsertView(APIView):
     authentication_classes = [JWTAuthentication]
@@ -441,30 +677,240 @@ class TeamTimeEntryUpsertView(APIView):
             return Response({"error": "Not allowed."}, status=403)
 
         try:
-            dt_in = timezone.datetime.fromisoformat(clock_in.replace("Z", "+00:00"))
+            dt_in = _parse_iso_datetime(clock_in)
         except Exception:
             return Response({"error": "Invalid clock_in format (ISO datetime)."}, status=400)
 
         dt_out = None
         if clock_out:
             try:
-                dt_out = timezone.datetime.fromisoformat(clock_out.replace("Z", "+00:00"))
+                dt_out = _parse_iso_datetime(clock_out)
             except Exception:
                 return Response({"error": "Invalid clock_out format (ISO datetime)."}, status=400)
 
+        dates = set()
         if entry_id:
             entry = get_object_or_404(TimeEntry, id=entry_id, user=target)
+            # The rollups of the days the entry covered before the edit must be refreshed too
+            dates |= affected_dates(entry.clock_in, entry.clock_out)
             entry.clock_in = dt_in
             entry.clock_out = dt_out
         else:
             entry = TimeEntry(user=target, clock_in=dt_in, clock_out=dt_out)
 
         entry.compute_total_hours()
-        entry.save()
+        dates |= affected_dates(entry.clock_in, entry.clock_out)
+        try:
+            with transaction.atomic():
+                entry.save()
+                refresh_daily_summaries({target.id: dates})
+                transaction.on_commit(lambda: forget_presence([target.id]))
+        except IntegrityError:
+            return Response({"error": "This user already has an open session."}, status=400)
 
         return Response(TimeEntrySerializer(entry).data, status=200)
 
 
+# ---- Manager/Admin: create or fix many time entries in one request ----
+class TeamTimeEntryBatchUpsertView(APIView):
+    """Batch variant of TeamTimeEntryUpsertView.
+
+    Every item is validated up front; valid items are then written together in one
+    transaction and invalid ones are reported back by index without blocking the rest.
+    """
+
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [permissions.IsAuthenticated, IsManagerOrAdmin]
+
+    MAX_ITEMS = 500
+
+    def post(self, request):
+        items = request.data.get("entries")
+        if not isinstance(items, list) or not items:
+            return Response({"error": "entries must be a non-empty array."}, status=400)
+        if len(items) > self.MAX_ITEMS:
+            return Response({"error": f"At most {self.MAX_ITEMS} entries per batch."}, status=400)
+
+        errors = {}
+        parsed = {}
+        for index, item in enumerate(items):
+            if not isinstance(item, dict) or not item.get("user_id") or not item.get("clock_in"):
+                errors[index] = "user_id and clock_in are required."
+                continue
+            try:
+                user_id = int(item["user_id"])
+                entry_id = int(item["entry_id"]) if item.get("entry_id") else None
+            except (TypeError, ValueError):
+                errors[index] = "user_id and entry_id must be integers."
+                continue
+            try:
+                dt_in = _parse_iso_datetime(item["clock_in"])
+            except Exception:
+                errors[index] = "Invalid clock_in format (ISO datetime)."
+                continue
+            dt_out = None
+            if item.get("clock_out"):
+                try:
+                    dt_out = _parse_iso_datetime(item["clock_out"])
+                except Exception:
+                    errors[index] = "Invalid clock_out format (ISO datetime)."
+                    continue
+                if dt_out < dt_in:
+                    errors[index] = "clock_out must be after clock_in."
+                    continue
+            parsed[index] = (user_id, entry_id, dt_in, dt_out)
+
+        user_ids = {p[0] for p in parsed.values()}
+        is_admin = request.user.role == "admin"
+        try:
+            with transaction.atomic():
+                # One query each for the target users' teams, their open sessions and the entries being edited.
+                # The sessions are locked until the batch is written, so a concurrent clock-out or edit waits
+                # for it; a clock-in racing the batch trips the single open session constraint instead.
+                user_teams = dict(User.objects.filter(id__in=user_ids).values_list("id", "team_id"))
+                open_holders = dict(
+                    TimeEntry.objects.select_for_update()
+                    .filter(user_id__in=user_ids, is_open=True)
+                    .values_list("user_id", "id")
+                )
+                existing = TimeEntry.objects.select_for_update().in_bulk({p[1] for p in parsed.values() if p[1]})
+
+                accepted = {}
+                edited_ids = set()
+                for index, (user_id, entry_id, dt_in, dt_out) in parsed.items():
+                    if user_id not in user_teams:
+                        errors[index] = "User not found."
+                        continue
+                    if not is_admin and (not request.user.team_id or user_teams[user_id] != request.user.team_id):
+                        errors[index] = "Not allowed."
+                        continue
+                    if entry_id:
+                        entry = existing.get(entry_id)
+                        if entry is None or entry.user_id != user_id:
+                            errors[index] = "Time entry not found."
+                            continue
+                        if entry_id in edited_ids:
+                            errors[index] = "Duplicate entry_id in batch."
+                            continue
+                        edited_ids.add(entry_id)
+                    accepted[index] = (user_id, entry_id, dt_in, dt_out)
+
+                # At most one open session per user once the whole batch is applied, whatever the item
+                # order: the user's open session stays open unless an item closes it, otherwise the first
+                # item leaving a session open gets it.
+                closed_ids = {entry_id for _, entry_id, _, dt_out in accepted.values() if entry_id and dt_out}
+                open_users = {user_id for user_id, holder in open_holders.items() if holder not in closed_ids}
+                for index, (user_id, entry_id, _, dt_out) in list(accepted.items()):
+                    if dt_out is not None or (entry_id and entry_id == open_holders.get(user_id)):
+                        continue
+                    if user_id in open_users:
+                        errors[index] = "This user already has an open session."
+                        del accepted[index]
+                    open_users.add(user_id)
+
+                to_create, to_update, applied = [], [], {}
+                user_dates = {}
+                for index, (user_id, entry_id, dt_in, dt_out) in accepted.items():
+                    dates = user_dates.setdefault(user_id, set())
+                    if entry_id:
+                        entry = existing[entry_id]
+                        dates |= affected_dates(entry.clock_in, entry.clock_out)
+                        entry.clock_in = dt_in
+                        entry.clock_out = dt_out
+                        to_update.append(entry)
+                    else:
+                        entry = TimeEntry(user_id=user_id, clock_in=dt_in, clock_out=dt_out)
+                        to_create.append(entry)
+
+                    entry.compute_total_hours()
+                    entry.sync_derived_fields()
+                    dates |= affected_dates(entry.clock_in, entry.clock_out)
+                    applied[index] = ("updated" if entry_id else "created", entry)
+
+                # Closes first, then the edits and creations that may open the session a close replaces
+                fields = ["clock_in", "clock_out", "total_hours", "is_open", "work_date"]
+                TimeEntry.objects.bulk_update([entry for entry in to_update if entry.clock_out], fields)
+                TimeEntry.objects.bulk_update([entry for entry in to_update if not entry.clock_out], fields)
+                TimeEntry.objects.bulk_create(to_create)
+                refresh_daily_summaries(user_dates)
+                transaction.on_commit(lambda: forget_presence(user_dates))
+        except IntegrityError:
+            return Response({"error": "A session changed while the batch was applied; retry it."}, status=409)
+
+        results = []
+        for index in range(len(items)):
+            if index in errors:
+                results.append({"index": index, "error": errors[index]})
+            else:
+                outcome, entry = applied[index]
+                results.append({"index": index, "status": outcome, "entry": TimeEntrySerializer(entry).data})
+
+        return Response({"results": results, "errors": len(errors)}, status=200)
+
+
+# ---- Kiosk: ingest queued badge punches ----
+class KioskPunchIngestView(APIView):
+    """Accept many (user, timestamp, direction, idempotency_key) punches, e.g. an offline kiosk replay.
+
+    Punches already received (same idempotency key), by an earlier replay or earlier in this one, are counted
+    as duplicates and skipped.
+    """
+
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [permissions.IsAuthenticated, IsManagerOrAdmin]
+
+    MAX_PUNCHES = 10000
+
+    def post(self, request):
+        items = request.data.get("punches")
+        if not isinstance(items, list) or not items:
+            return Response({"error": "punches must be a non-empty array."}, status=400)
+        if len(items) > self.MAX_PUNCHES:
+            return Response({"error": f"At most {self.MAX_PUNCHES} punches per request."}, status=400)
+
+        errors = []
+        punches = []
+        for index, item in enumerate(items):
+            if not isinstance(item, dict):
+                errors.append({"index": index, "error": "Each punch must be an object."})
+                continue
+            key = item.get("idempotency_key")
+            direction = item.get("direction")
+            if not isinstance(key, str) or not key or len(key) > 64:
+                errors.append({"index": index, "error": "idempotency_key must be a string of 1-64 characters."})
+                continue
+            if direction not in ("in", "out"):
+                errors.append({"index": index, "error": "direction must be 'in' or 'out'."})
+                continue
+            try:
+                user_id = int(item.get("user_id"))
+                timestamp = _parse_iso_datetime(item.get("timestamp"))
+            except Exception:
+                errors.append({"index": index, "error": "user_id and an ISO timestamp are required."})
+                continue
+            punches.append((index, user_id, timestamp, direction, key))
+
+        # One query for existence and team scoping of every user in the replay
+        user_teams = dict(User.objects.filter(id__in={p[1] for p in punches}).values_list("id", "team_id"))
+        allowed = []
+        for index, user_id, timestamp, direction, key in punches:
+            if user_id not in user_teams:
+                errors.append({"index": index, "error": "User not found."})
+            elif request.user.role != "admin" and (
+                not request.user.team_id or user_teams[user_id] != request.user.team_id
+            ):
+                errors.append({"index": index, "error": "Not allowed."})
+            else:
+                allowed.append((user_id, timestamp, direction, key))
+
+        try:
+            stats = ingest_punches(allowed) if allowed else {"received": 0, "duplicates": 0, "applied": 0, "ignored": 0}
+        except IntegrityError:
+            # A clock-in raced the replay; nothing was stored, so the kiosk can send it again
+            return Response({"error": "A session changed while the punches were applied; retry them."}, status=409)
+        return Response({**stats, "errors": sorted(errors, key=lambda e: e["index"])}, status=200)
+
+
 # ---- Admin only: assign or remove user -> manager ----
 # ---- Admin: Create/List Teams ----
 class TeamListCreateView(generics.ListCreateAPIView):
@@ -477,10 +923,10 @@ class TeamListCreateView(generics.ListCreateAPIView):
         # Admin sees all, Managers see their own? For now let's let admins manage teams.
         # Helper: Admins check teams.
         if self.request.user.role == "admin":
-            return Team.objects.all().order_by("-created_at")
+            return _with_team_listing(Team.objects.all().order_by("-created_at"))
         # Managers can see their own team info
-        if self.request.user.team:
-            return Team.objects.filter(id=self.request.user.team.id)
+        if self.request.user.team_id:
+            return _with_team_listing(Team.objects.filter(id=self.request.user.team_id))
         return Team.objects.none()
 
     def create(self, request, *args, **kwargs):
@@ -490,15 +936,24 @@ class TeamListCreateView(generics.ListCreateAPIView):
 
     def perform_create(self, serializer):
         serializer.save(created_by=self.request.user)
+        transaction.on_commit(lambda: bump(DIRECTORY_SCOPE))
 
 
 # ---- Admin: Update/Delete Team ----
 class TeamDetailView(generics.RetrieveUpdateDestroyAPIView):
     authentication_classes = [JWTAuthentication]
     permission_classes = [permissions.IsAuthenticated, IsAdmin]
-    queryset = Team.objects.all()
+    queryset = _with_team_listing(Team.objects.all())
     serializer_class = TeamSerializer
 
+    def perform_update(self, serializer):
+        serializer.save()
+        transaction.on_commit(lambda: bump(DIRECTORY_SCOPE))
+
+    def perform_destroy(self, instance):
+        instance.delete()
+        transaction.on_commit(lambda: bump(DIRECTORY_SCOPE))
+
 
 # ---- Admin: Assign User to Team ----
 # ---- Admin/Manager: Assign User to Team ----
@@ -534,17 +989,59 @@ class AdminAssignTeamView(APIView):
                     return Response({"error": "Cannot assign user to another team."}, status=403)
 
         if team_id is None:
-            target.team = None
-            target.save()
+            assign_users_to_team({target.id: target.team_id}, None)
             return Response({"message": "User removed from team."}, status=200)
 
         team = get_object_or_404(Team, id=team_id)
-        target.team = team
-        target.save()
+        assign_users_to_team({target.id: target.team_id}, team.id)
 
         return Response({"message": f"User assigned to team {team.name}"}, status=200)
 
 
+# ---- Admin/Manager: Assign many users to a team at once ----
+class BulkAssignTeamView(APIView):
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [permissions.IsAuthenticated, IsManagerOrAdmin]
+
+    def put(self, request):
+        user_ids = request.data.get("user_ids")
+        team_id = request.data.get("team_id")  # Null to remove
+
+        if not isinstance(user_ids, list) or not user_ids:
+            return Response({"error": "user_ids must be a non-empty list."}, status=400)
+        if len(user_ids) > MAX_BULK_ASSIGN:
+            return Response({"error": f"At most {MAX_BULK_ASSIGN} users per request."}, status=400)
+        try:
+            user_ids = {int(user_id) for user_id in user_ids}
+            team_id = int(team_id) if team_id is not None else None
+        except (TypeError, ValueError):
+            return Response({"error": "user_ids and team_id must be integers."}, status=400)
+
+        current_teams = dict(User.objects.filter(id__in=user_ids).values_list("id", "team_id"))
+        missing = user_ids - current_teams.keys()
+        if missing:
+            return Response({"error": "Unknown users.", "user_ids": sorted(missing)}, status=404)
+
+        # Same rules as AdminAssignTeamView, checked for the whole set before anything moves
+        if request.user.role == "manager":
+            if not request.user.team_id:
+                return Response({"error": "You do not have a team to manage."}, status=403)
+            if team_id is None:
+                outsiders = sorted(uid for uid, current in current_teams.items() if current != request.user.team_id)
+                if outsiders:
+                    return Response(
+                        {"error": "Cannot remove users from another team.", "user_ids": outsiders}, status=403
+                    )
+            elif team_id != request.user.team_id:
+                return Response({"error": "Cannot assign users to another team."}, status=403)
+
+        if team_id is not None and not Team.objects.filter(id=team_id).exists():
+            return Response({"error": "Team not found."}, status=404)
+
+        moved = assign_users_to_team(current_teams, team_id)
+        return Response({"message": f"{moved} user(s) moved.", "moved": moved}, status=200)
+
+
 class MyTodayStatusView(APIView):
     authentication_classes = [JWTAuthentication]
     permission_classes = [IsAuthenticated]
@@ -569,97 +1066,74 @@ class MyTeamView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        today = timezone.localdate()
-
         # Check if user has a team
         if not request.user.team_id:
             return Response({"team_name": None, "team_id": None, "manager": None, "members": []})
 
-        team = request.user.team
-
-        # Get all team members except current user
-        all_team_users = User.objects.filter(team=team).exclude(id=request.user.id)
-
-        # Find the manager (user with role="manager" in this team)
-        manager_user = all_team_users.filter(role="manager").first()
-
-        # Get regular members (exclude manager)
-        if manager_user:
-            members_qs = all_team_users.exclude(id=manager_user.id).order_by("last_name", "first_name")
-        else:
-            members_qs = all_team_users.order_by("last_name", "first_name")
-
-        # open sessions = clocked in
-        all_users_to_check = list(members_qs)
-        if manager_user:
-            all_users_to_check.append(manager_user)
+        return conditional_list(
+            request, [DIRECTORY_SCOPE, presence_scope(request.user.team_id)], lambda: self._build_list(request)
+        )
 
-        open_entries = TimeEntry.objects.filter(user__in=all_users_to_check, clock_out__isnull=True)
-        open_map = {e.user_id: e for e in open_entries}
+    def _build_list(self, request):
+        snapshot = get_team_snapshot(request.user.team_id)
 
-        # today's status
-        status_qs = TeamStatus.objects.filter(user__in=all_users_to_check, date=today)
-        status_map = {s.user_id: s for s in status_qs}
+        # Everyone but the current user; the team's first manager is listed apart
+        manager_id = next((m for m in snapshot["manager_ids"] if m != request.user.id), None)
+        manager_info = None
+        members = []
+        for member in snapshot["members"]:
+            if member["id"] == manager_id:
+                manager_info = member_info(member)
+            elif member["id"] != request.user.id:
+                members.append(member_info(member))
 
-        def build_user_info(u):
-            open_entry = open_map.get(u.id)
-            status_obj = status_map.get(u.id)
-            return {
-                "id": u.id,
-                "full_name": u.full_name,
-                "email": u.email,
-                "role": u.role,
-                "is_clocked_in": bool(open_entry),
-                "open_clock_in": open_entry.clock_in.isoformat() if open_entry else None,
-                "today_status": status_obj.status if status_obj else "normal",
-                "today_status_note": status_obj.note if status_obj else "",
+        return Response(
+            {
+                "team_name": snapshot["team_name"],
+                "team_id": snapshot["team_id"],
+                "manager": manager_info,
+                "members": members,
             }
+        )
 
-        # Build manager info
-        manager_info = build_user_info(manager_user) if manager_user else None
-
-        # Build members list
-        members = [build_user_info(u) for u in members_qs]
 
-        return Response({"team_name": team.name, "team_id": team.id, "manager": manager_info, "members": members})
+# ---- Task Views for Users ----
+def _task_list_scopes(user):
+    """Version scopes of the tasks ``user`` can see, for task list and search ETags."""
+    # Names and team membership show through, so the directory is part of every task list's ETag
+    if user.role == "admin":
+        return [DIRECTORY_SCOPE, TASKS_SCOPE]
+    if user.role == "manager" and user.team_id:
+        return [DIRECTORY_SCOPE, user_tasks_scope(user.id), team_tasks_scope(user.team_id)]
+    return [DIRECTORY_SCOPE, user_tasks_scope(user.id)]
 
 
-# ---- Task Views for Users ----
 class TaskListCreateView(APIView):
     authentication_classes = [JWTAuthentication]
     permission_classes = [permissions.IsAuthenticated]
 
     def get(self, request):
         """List tasks based on user role"""
-        if request.user.role == "admin":
-            # Admins see all tasks
-            tasks = Task.objects.all().order_by("-created_at")
-        elif request.user.role == "manager":
-            # Managers see tasks of their team members
-            if request.user.team:
-                team_members = User.objects.filter(team=request.user.team)
-            else:
-                team_members = User.objects.none()
-
-            tasks = (
-                Task.objects.filter(
-                    models.Q(assigned_to=request.user)
-                    | models.Q(created_by=request.user)
-                    | models.Q(assigned_to__in=team_members)
-                    | models.Q(created_by__in=team_members)
-                )
-                .distinct()
-                .order_by("-created_at")
-            )
-        else:
-            # Regular users see only their own tasks
-            tasks = (
-                Task.objects.filter(models.Q(assigned_to=request.user) | models.Q(created_by=request.user))
-                .distinct()
-                .order_by("-created_at")
+        return conditional_list(request, _task_list_scopes(request.user), lambda: self._build_list(request))
+
+    def _build_list(self, request):
+        # Paginated, filtered with ?priority=&assigned_to=&due_from=&due_to=&status=
+        tasks = TaskPolicy(request.user).visible()
+        try:
+            limit = parse_limit(request.query_params.get("limit"))
+            tasks = filter_tasks(tasks, request.query_params)
+            rows, next_cursor = keyset_paginate(
+                tasks.select_related("assigned_to", "created_by"),
+                TASK_ORDERING,
+                cursor=request.query_params.get("cursor"),
+                limit=limit,
             )
+        except InvalidPageParameter as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
 
-        return Response(TaskSerializer(tasks, many=True).data, status=status.HTTP_200_OK)
+        return Response(
+            {"results": TaskSerializer(rows, many=True).data, "next_cursor": next_cursor}, status=status.HTTP_200_OK
+        )
 
     def post(self, request):
         """Create a new task with role-based assignment"""
@@ -698,37 +1172,82 @@ class TaskListCreateView(APIView):
                 )
 
             serializer.save(created_by=request.user, assigned_to=assigned_user)
+            transaction.on_commit(lambda: bump_tasks([request.user, assigned_user]))
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
-class TaskDetailView(APIView):
+class TaskSearchView(APIView):
+    """Search the caller's visible tasks by title and description, best matches first."""
+
     authentication_classes = [JWTAuthentication]
     permission_classes = [permissions.IsAuthenticated]
 
-    def get_task(self, pk, user):
-        """Get task only if user has access"""
-        task = get_object_or_404(Task, pk=pk)
+    def get(self, request):
+        return conditional_list(request, _task_list_scopes(request.user), lambda: self._build_list(request))
 
-        # Admin can access all tasks
-        if user.role == "admin":
-            return task
+    def _build_list(self, request):
+        # ?q= plus the task list filters and pagination
+        tasks = TaskPolicy(request.user).visible()
+        try:
+            limit = parse_limit(request.query_params.get("limit"))
+            tasks = search_tasks(filter_tasks(tasks, request.query_params), request.query_params.get("q"))
+            rows, next_cursor = keyset_paginate(
+                tasks.select_related("assigned_to", "created_by"),
+                SEARCH_ORDERING,
+                cursor=request.query_params.get("cursor"),
+                limit=limit,
+            )
+        except InvalidPageParameter as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
 
-        # User owns the task (assigned or created)
-        if task.assigned_to == user or task.created_by == user:
-            return task
+        results = [{**TaskSerializer(task).data, "rank": task.search_rank} for task in rows]
+        return Response({"results": results, "next_cursor": next_cursor}, status=status.HTTP_200_OK)
 
-        # Manager can access tasks of their team members
-        if user.role == "manager":
-            if user.team:
-                team_member_ids = User.objects.filter(team=user.team).values_list("id", flat=True)
-            else:
-                team_member_ids = []
 
-            if task.assigned_to_id in team_member_ids or task.created_by_id in team_member_ids:
-                return task
+class TaskPlanView(APIView):
+    """The caller's (or with ?user_id=, a team member's) open tasks placed into their working hours."""
 
-        return None
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        try:
+            user_id = int(request.query_params.get("user_id") or request.user.id)
+        except ValueError:
+            return Response({"error": "user_id must be an integer."}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Managers can plan for their team members, admins for anyone
+        if user_id != request.user.id:
+            target = get_object_or_404(User.objects.only("id", "team_id"), id=user_id)
+            if request.user.role == "user":
+                return Response({"error": "Not allowed."}, status=status.HTTP_403_FORBIDDEN)
+            if request.user.role == "manager" and (not request.user.team_id or target.team_id != request.user.team_id):
+                return Response({"error": "Not allowed."}, status=status.HTTP_403_FORBIDDEN)
+
+        plan = get_task_plans([user_id])[user_id]
+        return Response(
+            {
+                "user_id": user_id,
+                "planned_from": plan["planned_from"],
+                "missed": sum(task["missed"] for task in plan["tasks"]),
+                "unscheduled": sum(not task["scheduled"] for task in plan["tasks"]),
+                "tasks": plan["tasks"],
+            },
+            status=status.HTTP_200_OK,
+        )
+
+
+class TaskDetailView(APIView):
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_task(self, pk, user):
+        """Get task only if user has access: one query, 404 when missing, None when not visible"""
+        task, allowed = TaskPolicy(user).lookup(pk, Task.objects.select_related("assigned_to", "created_by"))
+        if task is None:
+            raise Http404
+        return task if allowed else None
 
     def get(self, request, pk):
         task = self.get_task(pk, request.user)
@@ -744,6 +1263,7 @@ class TaskDetailView(APIView):
         serializer = TaskSerializer(task, data=request.data, partial=True)
         if serializer.is_valid():
             serializer.save()
+            transaction.on_commit(lambda: bump_tasks([task.created_by, task.assigned_to]))
             return Response(serializer.data)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -751,10 +1271,52 @@ class TaskDetailView(APIView):
         task = self.get_task(pk, request.user)
         if not task:
             return Response({"error": "Not allowed."}, status=status.HTTP_403_FORBIDDEN)
+        users = [task.created_by, task.assigned_to]
         task.delete()
+        transaction.on_commit(lambda: bump_tasks(users))
         return Response({"message": "✅ Task deleted."}, status=status.HTTP_200_OK)
 
 
+class TaskBulkUpdateView(APIView):
+    """Batch variant of TaskDetailView.put: ``{"tasks": [{"id": ..., "fields": {...}}, ...]}``.
+
+    The batch is authorized in one query and applied with bulk_update; every item
+    gets its own outcome, in request order, and failed items do not block the rest.
+    """
+
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [permissions.IsAuthenticated]
+
+    def patch(self, request):
+        items = request.data.get("tasks")
+        if not isinstance(items, list) or not items:
+            return Response({"error": "tasks must be a non-empty array."}, status=400)
+        if len(items) > MAX_BULK_TASKS:
+            return Response({"error": f"At most {MAX_BULK_TASKS} tasks per batch."}, status=400)
+
+        outcomes = [None] * len(items)
+        changes, seen = [], set()
+        for index, item in enumerate(items):
+            if not isinstance(item, dict) or not isinstance(item.get("fields"), dict):
+                outcomes[index] = {"status": "invalid", "errors": "id and fields are required."}
+                continue
+            try:
+                task_id = int(item.get("id"))
+            except (TypeError, ValueError):
+                outcomes[index] = {"status": "invalid", "errors": "id must be an integer."}
+                continue
+            if task_id in seen:
+                outcomes[index] = {"id": task_id, "status": "invalid", "errors": "Duplicate id in batch."}
+                continue
+            changes.append((task_id, item["fields"]))
+            seen.add(task_id)
+
+        positions = [index for index, outcome in enumerate(outcomes) if outcome is None]
+        for index, outcome in zip(positions, update_tasks(request.user, changes) if changes else [], strict=True):
+            outcomes[index] = outcome
+        return Response({"results": outcomes}, status=status.HTTP_200_OK)
+
+
 # ---- Admin: Reset User Password ----
 class AdminResetPasswordView(APIView):
     authentication_classes = [JWTAuthentication]
@@ -774,6 +1336,32 @@ class AdminResetPasswordView(APIView):
         return Response({"message": f"✅ Password for {target_user.email} has been reset."}, status=status.HTTP_200_OK)
 
 
+# ---- Reports: team workload ----
+class TeamWorkloadView(APIView):
+    """Remaining task hours of each team member against their working hours until each deadline."""
+
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [permissions.IsAuthenticated, IsManagerOrAdmin]
+
+    def get(self, request):
+        try:
+            team_id = int(request.query_params["team_id"]) if request.query_params.get("team_id") else None
+        except ValueError:
+            return Response({"error": "team_id must be an integer."}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Managers only see their own team; admins pick one
+        if request.user.role != "admin":
+            if not request.user.team_id or (team_id is not None and team_id != request.user.team_id):
+                return Response({"error": "Not allowed."}, status=status.HTTP_403_FORBIDDEN)
+            team_id = request.user.team_id
+        elif team_id is None:
+            return Response({"error": "team_id is required."}, status=status.HTTP_400_BAD_REQUEST)
+        elif not Team.objects.filter(id=team_id).exists():
+            return Response({"error": "Team not found."}, status=status.HTTP_404_NOT_FOUND)
+
+        return Response({"team_id": team_id, "members": get_team_workload(team_id)}, status=status.HTTP_200_OK)
+
+
 # ---- Reports: KPIs ----
 class TeamReportsView(APIView):
     authentication_classes = [JWTAuthentication]
@@ -797,34 +1385,63 @@ class TeamReportsView(APIView):
         else:
             return Response({"error": "Unauthorized"}, status=403)
 
-        report_data = []
+        users_qs = users_qs.select_related("team")
+
+        # 2. Closed sessions come from the per-day rollups, already split at midnight
+        summary_rows = (
+            DailyTimeSummary.objects.filter(user__in=users_qs.values("id"), date__gte=start_of_week)
+            .order_by()
+            .values("user_id")
+            .annotate(
+                seconds_today=models.Sum("worked_seconds", filter=models.Q(date=today)),
+                seconds_week=models.Sum("worked_seconds"),
+            )
+        )
+        seconds_map = {row["user_id"]: row for row in summary_rows}
 
-        # Bulk fetch/optimization is possible but loop is fine for small teams
+        # Open sessions add their live duration since the start of the day/week, computed by the database
+        now = timezone.now()
+
+        def live_since(moment):
+            start = Greatest(models.F("clock_in"), models.Value(moment, output_field=models.DateTimeField()))
+            return models.ExpressionWrapper(
+                models.Value(now, output_field=models.DateTimeField()) - start,
+                output_field=models.DurationField(),
+            )
+
+        live_rows = (
+            TimeEntry.objects.filter(user__in=users_qs.values("id"), is_open=True, clock_in__lte=now)
+            .order_by()
+            .values("user_id")
+            .annotate(
+                live_today=models.Sum(live_since(local_midnight(today))),
+                live_week=models.Sum(live_since(local_midnight(start_of_week))),
+            )
+        )
+        live_map = {row["user_id"]: row for row in live_rows}
+
+        # 3. Count this month's late days per user in one grouped query
+        lates_map = dict(
+            TeamStatus.objects.filter(user__in=users_qs.values("id"), status="late", date__gte=start_of_month)
+            .order_by()
+            .values("user_id")
+            .annotate(count=models.Count("id"))
+            .values_list("user_id", "count")
+        )
+
+        def _hours(seconds, live):
+            total = seconds or 0
+            if live and live.total_seconds() > 0:
+                total += live.total_seconds()
+            return total / 3600
+
+        report_data = []
         for user in users_qs:
-            # Hours Today
-            daily_entries = TimeEntry.objects.filter(user=user, clock_in__date=today)
-            hours_today = 0.0
-            for e in daily_entries:
-                if e.total_hours:
-                    hours_today += e.total_hours
-                elif e.clock_out is None:
-                    # Add current duration for live tracking?
-                    # Let's keep it simple: only closed sessions or just add a simple diff
-                    delta = timezone.now() - e.clock_in
-                    hours_today += delta.total_seconds() / 3600
-
-            # Hours Week
-            weekly_entries = TimeEntry.objects.filter(user=user, clock_in__date__gte=start_of_week)
-            hours_week = 0.0
-            for e in weekly_entries:
-                if e.total_hours:
-                    hours_week += e.total_hours
-                elif e.clock_out is None:
-                    delta = timezone.now() - e.clock_in
-                    hours_week += delta.total_seconds() / 3600
-
-            # Lateness Month
-            lates_month = TeamStatus.objects.filter(user=user, status="late", date__gte=start_of_month).count()
+            summary = seconds_map.get(user.id, {})
+            live = live_map.get(user.id, {})
+            hours_today = _hours(summary.get("seconds_today"), live.get("live_today"))
+            hours_week = _hours(summary.get("seconds_week"), live.get("live_week"))
+            lates_month = lates_map.get(user.id, 0)
 
             report_data.append(
                 {
@@ -845,6 +1462,13 @@ class TeamReportsView(APIView):
 # ==== CHAT API ====
 
 
+def _conversation_changed(conversation):
+    """Bump the conversation's version and its participants' conversation lists once committed."""
+    conversation_id = conversation.id
+    participant_ids = list(conversation.participants.values_list("id", flat=True))
+    transaction.on_commit(lambda: bump_conversation(conversation_id, participant_ids))
+
+
 class ConversationListCreateView(APIView):
     """List user's conversations or create a new one"""
 
@@ -852,9 +1476,12 @@ class ConversationListCreateView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        conversations = request.user.conversations.all()
-        serializer = ConversationSerializer(conversations, many=True)
-        return Response(serializer.data)
+        def build():
+            conversations = request.user.conversations.all()
+            return Response(ConversationSerializer(conversations, many=True).data)
+
+        # Sender names show through, so the directory is part of the ETag
+        return conditional_list(request, [DIRECTORY_SCOPE, conversation_list_scope(request.user.id)], build)
 
     def post(self, request):
         name = request.data.get("name")
@@ -874,6 +1501,7 @@ class ConversationListCreateView(APIView):
         if participant_ids:
             users = User.objects.filter(id__in=participant_ids)
             conversation.participants.add(*users)
+        _conversation_changed(conversation)
 
         serializer = ConversationSerializer(conversation)
         return Response(serializer.data, status=status.HTTP_201_CREATED)
@@ -891,9 +1519,11 @@ class ConversationMessagesView(APIView):
         if not conversation.participants.filter(id=request.user.id).exists():
             return Response({"error": "Not a participant"}, status=status.HTTP_403_FORBIDDEN)
 
-        messages = conversation.messages.all()
-        serializer = MessageSerializer(messages, many=True)
-        return Response(serializer.data)
+        def build():
+            messages = conversation.messages.all()
+            return Response(MessageSerializer(messages, many=True).data)
+
+        return conditional_list(request, [DIRECTORY_SCOPE, conversation_scope(conversation.id)], build)
 
     def post(self, request, conversation_id):
         conversation = get_object_or_404(Conversation, id=conversation_id)
@@ -911,6 +1541,7 @@ class ConversationMessagesView(APIView):
             content=content,
         )
         conversation.save()
+        _conversation_changed(conversation)
 
         serializer = MessageSerializer(message)
         return Response(serializer.data, status=status.HTTP_201_CREATED)
@@ -937,9 +1568,11 @@ class TeamConversationView(APIView):
             )
             team_members = User.objects.filter(team=team)
             conversation.participants.add(*team_members)
+            _conversation_changed(conversation)
 
         if not conversation.participants.filter(id=request.user.id).exists():
             conversation.participants.add(request.user)
+            _conversation_changed(conversation)
 
         serializer = ConversationSerializer(conversation)
         return Response(serializer.data)
@@ -977,6 +1610,7 @@ class StartDirectConversationView(APIView):
             is_direct=True,
         )
         conversation.participants.add(request.user, target_user)
+        _conversation_changed(conversation)
 
         serializer = ConversationSerializer(conversation)
         return Response(serializer.data, status=status.HTTP_201_CREATED)
@@ -1000,6 +1634,7 @@ class MessageDetailView(APIView):
 
         message.content = content
         message.save()
+        _conversation_changed(message.conversation)
 
         serializer = MessageSerializer(message)
         return Response(serializer.data)
@@ -1011,6 +1646,7 @@ class MessageDetailView(APIView):
             return Response({"error": "Cannot delete others' messages"}, status=status.HTTP_403_FORBIDDEN)
 
         message.delete()
+        _conversation_changed(message.conversation)
         return Response({"message": "Message deleted"}, status=status.HTTP_200_OK)
 
 
@@ -1029,5 +1665,6 @@ class ConversationDetailView(APIView):
         if not conversation.is_direct:
             return Response({"error": "Cannot delete team conversations"}, status=status.HTTP_400_BAD_REQUEST)
 
+        _conversation_changed(conversation)
         conversation.delete()
         return Response({"message": "Conversation deleted"}, status=status.HTTP_200_OK)
@@ -0,0 +1,138 @@
+"""Per-member workload of a team: remaining task hours against scheduled hours.
+
+A task's remaining work is ``estimated_duration * (100 - progress) / 100``.
+Open tasks are summed in the database per (assignee, due date), so the query
+returns one row per distinct deadline rather than one per task. Each member's
+deadlines are then checked in order: the work due by a deadline must fit in
+the working hours between now and that deadline. Those hours come from the
+weekly WorkingHours in O(1) per deadline, whole weeks at once.
+
+Results are cached under the versions of the directory, the team's task lists
+and its members' working hours, so task, membership and schedule writes retire
+them; the timeout bounds how stale the "hours left until" side gets as time
+passes.
+"""
+
+import hashlib
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+
+from django.core.cache import cache
+from django.db import models
+from django.utils import timezone
+
+from .models import Task, WorkingHours
+from .team_snapshots import get_team_snapshot
+from .versions import DIRECTORY_SCOPE, get_versions, team_tasks_scope, working_hours_scope
+
+WORKLOAD_CACHE_TIMEOUT = 5 * 60
+
+REMAINING_HOURS = models.ExpressionWrapper(
+    models.F("estimated_duration") * (100 - models.F("progress")) / 100.0, output_field=models.FloatField()
+)
+
+
+def _hours_between(day, start_time, end_time, window):
+    """Working hours of ``day`` falling between ``start_time`` and ``end_time``; ``window`` is its (start, end)."""
+    if window is None:
+        return 0.0
+    start = max(window[0], start_time)
+    end = min(window[1], end_time)
+    if end <= start:
+        return 0.0
+    return (datetime.combine(day, end) - datetime.combine(day, start)).total_seconds() / 3600
+
+
+class WeeklySchedule:
+    """A user's working windows per weekday, with the hours they add up to."""
+
+    def __init__(self, windows):
+        self.windows = windows  # weekday -> (start_time, end_time)
+        self.day_hours = [_hours_between(date.min, time.min, time.max, windows.get(day)) for day in range(7)]
+        self.week_hours = sum(self.day_hours)
+
+    def _full_days(self, first, last):
+        """Hours of the whole days from ``first`` to ``last`` inclusive."""
+        days = (last - first).days + 1
+        if days <= 0:
+            return 0.0
+        weeks, rest = divmod(days, 7)
+        return weeks * self.week_hours + sum(self.day_hours[(first.weekday() + i) % 7] for i in range(rest))
+
+    def hours_between(self, start, end):
+        """Working hours between the aware datetimes ``start`` and ``end``."""
+        if end <= start:
+            return 0.0
+        start, end = timezone.localtime(start), timezone.localtime(end)
+        first, last = start.date(), end.date()
+        if first == last:
+            return _hours_between(first, start.time(), end.time(), self.windows.get(first.weekday()))
+        return (
+            _hours_between(first, start.time(), time.max, self.windows.get(first.weekday()))
+            + self._full_days(first + timedelta(days=1), last - timedelta(days=1))
+            + _hours_between(last, time.min, end.time(), self.windows.get(last.weekday()))
+        )
+
+
+def member_workload(schedule, dated, undated_hours, now):
+    """Workload of one member; ``dated`` is a list of ``(due_date, hours)`` sorted by due date."""
+    due, shortfall, first_overload = 0.0, 0.0, None
+    for due_date, hours in dated:
+        due += hours
+        missing = round(due - schedule.hours_between(now, due_date), 2)
+        if missing > 0:
+            shortfall = max(shortfall, missing)
+            first_overload = first_overload or due_date
+    return {
+        "remaining_hours": round(due + undated_hours, 2),
+        "undated_hours": round(undated_hours, 2),
+        "weekly_hours": round(schedule.week_hours, 2),
+        # Largest gap between the work due by a deadline and the working hours left until it
+        "shortfall_hours": shortfall,
+        "overloaded": first_overload is not None,
+        "first_overloaded_due": first_overload,
+    }
+
+
+def _build_workload(team_id, members, now):
+    member_ids = [member["id"] for member in members]
+    dated, undated = defaultdict(list), defaultdict(float)
+    # Task.team is the assignee's team, so this is a range on the (team, ...) index
+    rows = (
+        Task.objects.filter(team_id=team_id, progress__lt=100)
+        .values("assigned_to_id", "due_date")
+        .annotate(hours=models.Sum(REMAINING_HOURS))
+        .order_by()
+    )
+    for user_id, due_date, hours in rows.values_list("assigned_to_id", "due_date", "hours"):
+        if due_date is None:
+            undated[user_id] += hours
+        else:
+            dated[user_id].append((due_date, hours))
+
+    windows = defaultdict(dict)
+    for user_id, day, start_time, end_time in WorkingHours.objects.filter(user_id__in=member_ids).values_list(
+        "user_id", "day_of_week", "start_time", "end_time"
+    ):
+        windows[user_id][day] = (start_time, end_time)
+
+    results = []
+    for member in members:
+        user_id = member["id"]
+        workload = member_workload(WeeklySchedule(windows[user_id]), sorted(dated[user_id]), undated[user_id], now)
+        results.append({"id": user_id, "full_name": member["full_name"], "role": member["role"], **workload})
+    return results
+
+
+def get_team_workload(team_id):
+    """Return the workload of every member of ``team_id``, in directory order."""
+    members = get_team_snapshot(team_id)["members"]
+    scopes = [DIRECTORY_SCOPE, team_tasks_scope(team_id), *(working_hours_scope(m["id"]) for m in members)]
+    # One version per member: hashed to keep the key short
+    versions = hashlib.sha1(":".join(map(str, get_versions(scopes))).encode()).hexdigest()
+    key = f"users:workload:{team_id}:{versions}"
+    workload = cache.get(key)
+    if workload is None:
+        workload = _build_workload(team_id, members, timezone.now())
+        cache.set(key, workload, WORKLOAD_CACHE_TIMEOUT)
+    return workload
@@ -18,6 +18,7 @@ export function ClockDashboard() {
   const { user } = useAuth();
 
   const [records, setRecords] = useState<TimeRecord[]>([]);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
   const [today] = useState(new Date().toLocaleDateString());
   const [lastAction, setLastAction] = useState<string | null>(null);
   const [loading, setLoading] = useState(false);
@@ -38,51 +39,79 @@ export function ClockDashboard() {
     return fetch(url, options);
   };
 
-  // Load time entries from backend
+  const toRecord = (entry: any): TimeRecord => ({
+    date: entry.clock_in ? new Date(entry.clock_in).toLocaleDateString() : "-",
+    in: entry.clock_in ? new Date(entry.clock_in).toLocaleTimeString() : undefined,
+    out: entry.clock_out ? new Date(entry.clock_out).toLocaleTimeString() : undefined,
+    total: entry.total_hours ?? undefined,
+  });
+
+  // Load time entries from backend (first page, newest first)
   const loadRecords = async () => {
     setLoading(true);
     setErrorMessage(null);
 
     try {
       const res = await fetchWithAuth(`${API_URL}/api/users/time-entries/`);
-      let data: any = [];
+      let data: any = {};
       try {
         data = await res.json();
       } catch {
-        data = [];
+        data = {};
       }
 
       if (!res.ok) {
         setErrorMessage("Unable to load time entries.");
         setRecords([]);
+        setNextCursor(null);
         setIsClockedIn(false);
         return;
       }
 
-      // ✅ Each entry is a session: use clock_in for the displayed date
-      const mapped: TimeRecord[] = (Array.isArray(data) ? data : []).map((entry: any) => ({
-        date: entry.clock_in ? new Date(entry.clock_in).toLocaleDateString() : "-",
-        in: entry.clock_in ? new Date(entry.clock_in).toLocaleTimeString() : undefined,
-        out: entry.clock_out ? new Date(entry.clock_out).toLocaleTimeString() : undefined,
-        total: entry.total_hours ?? undefined,
-      }));
+      const entries: any[] = Array.isArray(data.results) ? data.results : [];
 
-      setRecords(mapped);
+      // ✅ Each entry is a session: use clock_in for the displayed date
+      setRecords(entries.map(toRecord));
+      setNextCursor(data.next_cursor ?? null);
 
-      // ✅ Clocked in = there exists an open session (clock_out is null)
-      const hasOpenSession =
-        Array.isArray(data) && data.some((e: any) => e.clock_in && !e.clock_out);
+      // ✅ Clocked in = there exists an open session (clock_out is null).
+      // The open session is always the newest one, so it is on the first page.
+      const hasOpenSession = entries.some((e: any) => e.clock_in && !e.clock_out);
 
       setIsClockedIn(hasOpenSession);
     } catch {
       setErrorMessage("⚠️ Server unreachable.");
       setRecords([]);
+      setNextCursor(null);
       setIsClockedIn(false);
     } finally {
       setLoading(false);
     }
   };
 
+  // Append the next page of older entries
+  const loadMoreRecords = async () => {
+    if (!nextCursor) return;
+    setLoading(true);
+    try {
+      const res = await fetchWithAuth(
+        `${API_URL}/api/users/time-entries/?cursor=${encodeURIComponent(nextCursor)}`
+      );
+      const data = await res.json();
+      if (!res.ok) {
+        setErrorMessage("Unable to load older time entries.");
+        return;
+      }
+      const entries: any[] = Array.isArray(data.results) ? data.results : [];
+      setRecords((prev) => [...prev, ...entries.map(toRecord)]);
+      setNextCursor(data.next_cursor ?? null);
+    } catch {
+      setErrorMessage("⚠️ Server unreachable.");
+    } finally {
+      setLoading(false);
+    }
+  };
+
   // ✅ Load once on mount
   useEffect(() => {
     loadRecords();
@@ -289,6 +318,16 @@ export function ClockDashboard() {
               ))}
             </tbody>
           </table>
+
+          {nextCursor && (
+            <button
+              onClick={loadMoreRecords}
+              disabled={loading}
+              className="mt-4 px-4 py-2 rounded-lg bg-slate-800 hover:bg-slate-700 text-sm text-slate-200 transition disabled:opacity-50"
+            >
+              {loading ? "Loading..." : "Load older entries"}
+            </button>
+          )}
         </motion.div>
       )}
 
@@ -44,7 +44,7 @@ export default function EpitimeDashboard() {
     role: string;
     is_clocked_in: boolean;
     open_clock_in: string | null;
-    today_status: "normal" | "late" | "pto";
+    today_status: "normal" | "late" | "pto" | "absent";
     today_status_note: string;
   };
 
@@ -64,6 +64,22 @@ export default function EpitimeDashboard() {
     });
   };
 
+  // The task list is paginated: follow next_cursor for a bounded number of pages
+  const fetchTaskPages = async (params: string, maxPages = 5): Promise<TaskType[]> => {
+    const all: TaskType[] = [];
+    let cursor: string | null = null;
+    for (let page = 0; page < maxPages; page++) {
+      const query = `limit=200${params ? `&${params}` : ""}${cursor ? `&cursor=${encodeURIComponent(cursor)}` : ""}`;
+      const res = await fetchWithAuth(`${API_URL}/api/users/tasks/?${query}`);
+      if (!res.ok) break;
+      const data = await res.json();
+      all.push(...(Array.isArray(data.results) ? data.results : []));
+      cursor = data.next_cursor;
+      if (!cursor) break;
+    }
+    return all;
+  };
+
   useEffect(() => {
     const loadTeam = async () => {
       if (!user) return;
@@ -95,13 +111,22 @@ export default function EpitimeDashboard() {
       if (!user) return;
       setLoadingEntries(true);
       try {
-        const res = await fetchWithAuth(`${API_URL}/api/users/time-entries/`);
-        const data = await res.json();
-        if (res.ok && Array.isArray(data)) {
-          setTimeEntries(data);
-        } else {
-          setTimeEntries([]);
-        }
+        // The charts only cover the current week, so fetch it page by page
+        const monday = new Date();
+        monday.setDate(monday.getDate() - ((monday.getDay() + 6) % 7));
+        const from = `${monday.getFullYear()}-${String(monday.getMonth() + 1).padStart(2, "0")}-${String(monday.getDate()).padStart(2, "0")}`;
+
+        const entries: any[] = [];
+        let cursor: string | null = null;
+        do {
+          const query: string = cursor ? `&cursor=${encodeURIComponent(cursor)}` : "";
+          const res = await fetchWithAuth(`${API_URL}/api/users/time-entries/?from=${from}&limit=200${query}`);
+          const data = await res.json();
+          if (!res.ok || !Array.isArray(data.results)) break;
+          entries.push(...data.results);
+          cursor = data.next_cursor ?? null;
+        } while (cursor);
+        setTimeEntries(entries);
       } catch {
         setTimeEntries([]);
       } finally {
@@ -129,11 +154,7 @@ export default function EpitimeDashboard() {
     const loadTasks = async () => {
       if (!user) return;
       try {
-        const res = await fetchWithAuth(`${API_URL}/api/users/tasks/`);
-        const data = await res.json();
-        if (res.ok) {
-          setTasks(Array.isArray(data) ? data : []);
-        }
+        setTasks(await fetchTaskPages(""));
       } catch {
         setTasks([]);
       }
@@ -297,15 +318,8 @@ export default function EpitimeDashboard() {
       }
       setLoadingMateTasks(true);
       try {
-        const res = await fetchWithAuth(`${API_URL}/api/users/tasks/`);
-        const data = await res.json();
-        if (res.ok && Array.isArray(data)) {
-          // Filter tasks assigned to or created by the selected teammate
-          const mateTasks = data.filter((task: any) =>
-            task.assigned_to === selectedMate.id || task.created_by === selectedMate.id
-          );
-          setSelectedMateTasks(mateTasks);
-        }
+        // Tasks assigned to the selected teammate, filtered server-side
+        setSelectedMateTasks(await fetchTaskPages(`assigned_to=${selectedMate.id}`));
       } catch {
         setSelectedMateTasks([]);
       } finally {
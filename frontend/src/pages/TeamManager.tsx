@@ -18,7 +18,7 @@ type TeamMember = {
   team_name: string | null;
   is_clocked_in: boolean;
   open_clock_in: string | null;
-  today_status: "normal" | "late" | "pto";
+  today_status: "normal" | "late" | "pto" | "absent";
   today_status_note: string;
 };
 
@@ -86,6 +86,7 @@ export default function TeamManagerPage() {
   const [newTeamDesc, setNewTeamDesc] = useState("");
 
   const [userSearchTerm, setUserSearchTerm] = useState("");
+  const [debouncedSearch, setDebouncedSearch] = useState("");
 
   // Admin Stats & Actions State
   const [selectedMember, setSelectedMember] = useState<TeamMember | null>(null);
@@ -115,15 +116,35 @@ export default function TeamManagerPage() {
     return fetch(url, options);
   };
 
+  // The member directory is paginated: follow next_cursor for at most `maxPages` pages
+  const fetchMemberPages = async (params: string, maxPages = 50) => {
+    const rows: TeamMember[] = [];
+    let cursor: string | null = null;
+    for (let page = 0; page < maxPages; page++) {
+      const query = cursor ? `${params}&cursor=${encodeURIComponent(cursor)}` : params;
+      const res = await fetchWithAuth(`${API_URL}/api/users/team/members/?${query}`);
+      const data = await res.json();
+      if (!res.ok) throw new Error(data?.error || "Failed to load members");
+      rows.push(...data.results);
+      cursor = data.next_cursor;
+      if (!cursor) break;
+    }
+    return rows;
+  };
+
   const loadData = React.useCallback(async () => {
     setLoading(true);
     setMsg(null);
     try {
-      // Load Members
-      const resMembers = await fetchWithAuth(`${API_URL}/api/users/team/members/`);
-      const dataMembers = await resMembers.json();
-      if (!resMembers.ok) throw new Error(dataMembers?.error || "Failed to load members");
-      setMembers(Array.isArray(dataMembers) ? dataMembers : []);
+      // Load Members: the selected team, plus the first page of unassigned candidates
+      // (server-side prefix search) instead of the whole user table
+      const search = debouncedSearch ? `&q=${encodeURIComponent(debouncedSearch)}` : "";
+      const [teamMembers, unassignedUsers, unassignedManagers] = await Promise.all([
+        selectedTeamId ? fetchMemberPages(`team_id=${selectedTeamId}&limit=200`) : Promise.resolve([]),
+        fetchMemberPages(`team_id=none&role=user&limit=50${search}`, 1),
+        fetchMemberPages("team_id=none&role=manager,admin&limit=50", 1),
+      ]);
+      setMembers([...teamMembers, ...unassignedUsers, ...unassignedManagers]);
 
       // Load Teams
       // Admin sees all, Managers see their own (backend handles filtering)
@@ -135,7 +156,7 @@ export default function TeamManagerPage() {
     } finally {
       setLoading(false);
     }
-  }, [API_URL]);
+  }, [API_URL, selectedTeamId, debouncedSearch]);
 
   const loadReports = async () => {
     setLoading(true);
@@ -198,11 +219,24 @@ export default function TeamManagerPage() {
     try {
       // We'll reset entries for a clean state
       setMemberEntries([]);
-      const res = await fetchWithAuth(`${API_URL}/api/users/team/members/${userId}/time-entries/`);
-      const data = await res.json();
-      if (res.ok && Array.isArray(data)) {
-        setMemberEntries(data);
-      }
+      // The stats below only cover the last 4 weeks, so fetch that window page by page
+      const since = new Date();
+      since.setDate(since.getDate() - 35);
+      const from = `${since.getFullYear()}-${String(since.getMonth() + 1).padStart(2, "0")}-${String(since.getDate()).padStart(2, "0")}`;
+
+      const entries: TimeEntry[] = [];
+      let cursor: string | null = null;
+      do {
+        const query: string = cursor ? `&cursor=${encodeURIComponent(cursor)}` : "";
+        const res = await fetchWithAuth(
+          `${API_URL}/api/users/team/members/${userId}/time-entries/?from=${from}&limit=200${query}`
+        );
+        const data = await res.json();
+        if (!res.ok || !Array.isArray(data.results)) break;
+        entries.push(...data.results);
+        cursor = data.next_cursor ?? null;
+      } while (cursor);
+      setMemberEntries(entries);
     } catch (e) {
       setMsg({ type: "error", text: "Failed to load time entries" });
     } finally {
@@ -318,10 +352,14 @@ export default function TeamManagerPage() {
   }, [members]);
 
   const unassignedUsers = useMemo(() => {
-    return members.filter(m => m.team_id === null && m.role === 'user' &&
-      (userSearchTerm === "" || m.full_name.toLowerCase().includes(userSearchTerm.toLowerCase()))
-    );
-  }, [members, userSearchTerm]);
+    // Already filtered by the server-side search
+    return members.filter(m => m.team_id === null && m.role === 'user');
+  }, [members]);
+
+  useEffect(() => {
+    const timer = setTimeout(() => setDebouncedSearch(userSearchTerm.trim()), 300);
+    return () => clearTimeout(timer);
+  }, [userSearchTerm]);
 
 
   useEffect(() => {